@@ -6,6 +6,37 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import cache
+from time import perf_counter
+
+import psutil
+
+
+@cache
+def get_chrome_driver_path() -> str:
+    """Путь к драйверу Chrome (определяется один раз на процесс)"""
+    return ChromeDriverManager().install()
+
+
+def get_chrome_options() -> Options:
+    options = Options()
+    # options.set_preference('dom.webdriver.enabled', False) # деактивация вебдрайвера
+    # options.set_preference('media.volume_scale', '0.0')
+    options.add_argument('--headless') # не запускать GUI браузера
+    options.add_argument('--disable-gpu')
+    options.add_argument('--enable-unsafe-swiftshader')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    # options.set_preference('general.useragent.override', 'useragent1')
+    return options
+
+
+def start_chrome() -> webdriver.Chrome:
+    """Запуск браузера Chrome с тайм-аутом загрузки страницы 30 секунд"""
+    browser = webdriver.Chrome(service=Service(get_chrome_driver_path()), options=get_chrome_options())
+    browser.set_page_load_timeout(30)
+    return browser
 
 
 class BrowserConnection:
@@ -49,31 +80,10 @@ class AsyncBrowserConnection:
     async def __aenter__(self):
         
         self.display = Display(visible=0, size=(1024, 768))
-        self.display.start()
-        
-        options = Options()
-        # options.set_preference('dom.webdriver.enabled', False) # деактивация вебдрайвера
-        # options.set_preference('media.volume_scale', '0.0')
-        options.add_argument('--headless') # не запускать GUI браузера
-        options.add_argument('--disable-gpu')
-        options.add_argument('--enable-unsafe-swiftshader')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        # options.set_preference('general.useragent.override', 'useragent1')
-        
-        # service = Service(executable_path='/usr/local/bin/geckodriver')
-        self.browser = await self.loop.run_in_executor(
-            self.executor,
-            lambda: webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options))
-        
-        # Устанавливаем тайм-аут для поиска элементов
-        # self.browser.implicitly_wait(10)  # 10 секунд
-        
-        # Устанавливаем тайм-аут для загрузки страницы
-        self.browser.set_page_load_timeout(30)  # 30 секунд
+        await self.loop.run_in_executor(self.executor, self.display.start)
         
-        # Устанавливаем тайм-аут для выполнения скриптов
-        #self.browser.set_script_timeout(30)  # 30 секунд
+        # путь к драйверу определяется один раз на процесс (get_chrome_driver_path)
+        self.browser = await self.loop.run_in_executor(self.executor, start_chrome)
         
         return self.browser
     
@@ -81,5 +91,168 @@ class AsyncBrowserConnection:
         await self.loop.run_in_executor(
             self.executor,
             self.browser.quit)
-        self.display.stop()
-    
\ No newline at end of file
+        await self.loop.run_in_executor(self.executor, self.display.stop)
+        self.executor.shutdown(wait=False)
+
+
+class PooledBrowser:
+    """Браузер пула и счетчики его использования"""
+    def __init__(self, browser: webdriver.Chrome):
+        self.browser = browser
+        self.pages = 0
+        self.created_at = perf_counter()
+
+    def memory_bytes(self) -> int:
+        """Память процессов браузера (драйвер и все дочерние процессы Chrome)"""
+        try:
+            process = psutil.Process(self.browser.service.process.pid)
+            return sum(p.memory_info().rss for p in [process, *process.children(recursive=True)])
+        except (psutil.Error, AttributeError):
+            return 0
+
+
+class AsyncBrowserPool:
+    """Пул запущенных браузеров, общий для всех циклов опроса
+
+    Браузер выдается на время обработки страницы (lease) и возвращается в пул. Виртуальный дисплей
+    запускается и драйвер определяется один раз, браузеры создаются по мере необходимости (не больше size).
+    Перед выдачей браузер проверяется, после возврата заменяется новым при достижении max_pages страниц,
+    превышении max_memory_mb или ошибке во время использования.
+    """
+
+    def __init__(self, size: int, max_pages: int, max_memory_mb: float, health_check_timeout: float = 5):
+        """
+        Args:
+            size (int): Максимальное количество браузеров
+            max_pages (int): Количество выдач, после которого браузер перезапускается
+            max_memory_mb (float): Предел памяти процессов браузера, МБ
+            health_check_timeout (float, optional): Тайм-аут проверки браузера перед выдачей, с
+        """
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.health_check_timeout = health_check_timeout
+        self._idle: list[PooledBrowser] = []
+        self._semaphore = None
+        self._executor = None
+        self._display = None
+        self.started = self.recycled = self.failed_health_checks = 0
+        self.leases = 0
+        self.in_use = 0
+        self.total_wait_s = 0.0
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def start(self):
+        """Запуск виртуального дисплея и определение пути к драйверу (выполняется один раз)"""
+        if self._semaphore is not None: return
+        self._semaphore = asyncio.Semaphore(self.size)
+        self._executor = ThreadPoolExecutor(max_workers=self.size + 1, thread_name_prefix='browser-pool')
+        self._display = Display(visible=0, size=(1024, 768))
+        await self._run(self._display.start)
+        await self._run(get_chrome_driver_path)
+
+    async def _new_browser(self) -> PooledBrowser:
+        browser = PooledBrowser(await self._run(start_chrome))
+        self.started += 1
+        return browser
+
+    async def _quit(self, pooled: PooledBrowser):
+        try:
+            await self._run(pooled.browser.quit)
+        except Exception as e:
+            print(f'Ошибка закрытия браузера пула: {e}')
+
+    async def _is_healthy(self, pooled: PooledBrowser) -> bool:
+        try:
+            await asyncio.wait_for(self._run(pooled.browser.execute_script, 'return 1'), timeout=self.health_check_timeout)
+            return True
+        except Exception:
+            return False
+
+    async def _acquire(self) -> PooledBrowser:
+        while self._idle:
+            pooled = self._idle.pop()
+            if await self._is_healthy(pooled):
+                return pooled
+            self.failed_health_checks += 1
+            await self._quit(pooled)
+        return await self._new_browser()
+
+    async def _release(self, pooled: PooledBrowser, failed: bool):
+        pooled.pages += 1
+        reason = None
+        if failed:
+            reason = 'ошибка во время использования'
+        elif pooled.pages >= self.max_pages:
+            reason = f'обработано {pooled.pages} страниц'
+        elif self.max_memory_mb and pooled.memory_bytes() > self.max_memory_mb * 2**20:
+            reason = f'память больше {self.max_memory_mb} МБ'
+        if reason is None:
+            self._idle.append(pooled)
+            return
+        self.recycled += 1
+        print(f'Браузер пула перезапускается: {reason}')
+        await self._quit(pooled)
+
+    async def checkout(self) -> PooledBrowser:
+        """Браузер пула до явного возврата checkin (например, для постоянно открытых вкладок)"""
+        await self.start()
+        start = perf_counter()
+        await self._semaphore.acquire()
+        self.total_wait_s += perf_counter() - start
+        self.leases += 1
+        try:
+            pooled = await self._acquire()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        self.in_use += 1
+        return pooled
+
+    async def checkin(self, pooled: PooledBrowser, failed: bool = False):
+        """Возврат браузера, выданного checkout"""
+        self.in_use -= 1
+        try:
+            await self._release(pooled, failed=failed)
+        finally:
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def lease(self):
+        """Браузер пула на время обработки страницы: async with browser_pool.lease() as br"""
+        pooled = await self.checkout()
+        failed = True
+        try:
+            yield pooled.browser
+            failed = False
+        finally:
+            # при отмене (тайм-аут игры) браузер закрывается: страница могла остаться в неизвестном состоянии
+            await asyncio.shield(self.checkin(pooled, failed=failed))
+
+    async def close(self):
+        """Закрытие всех свободных браузеров и виртуального дисплея"""
+        if self._semaphore is None: return
+        idle, self._idle = self._idle, []
+        for pooled in idle:
+            await self._quit(pooled)
+        if self._display is not None:
+            await self._run(self._display.stop)
+            self._display = None
+        self._semaphore = None
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        return {
+            'size': self.size,
+            'idle': len(self._idle),
+            'in_use': self.in_use,
+            'started': self.started,
+            'recycled': self.recycled,
+            'failed_health_checks': self.failed_health_checks,
+            'leases': self.leases,
+            'avg_wait_ms': self.total_wait_s / max(self.leases, 1) * 1000,
+            'memory_mb': [pooled.memory_bytes() / 2**20 for pooled in self._idle],
+        }
+
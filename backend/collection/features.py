@@ -0,0 +1,97 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Feature(NamedTuple):
+    """Признак состояния матча"""
+    name: str # имя столбца prediction_draw_left_right и поля массива состояний
+    dtype: type # тип поля массива состояний (np.int64 или np.float64)
+    description: str
+    model: bool = False # входит в набор признаков модели по умолчанию
+
+
+# Единая схема признаков состояния матча: по ней строятся столбцы SQL-запросов,
+# поля структурированных массивов и входные данные модели.
+# Порядок совпадает с порядком столбцов таблицы prediction_draw_left_right.
+FEATURES = (
+    Feature('left_coach_id', np.int64, 'тренер левой команды'),
+    Feature('right_coach_id', np.int64, 'тренер правой команды'),
+    Feature('referee_id', np.int64, 'главный судья'),
+    Feature('left_num_v', np.int64, 'вратари левой команды на поле'),
+    Feature('left_num_z', np.int64, 'защитники левой команды на поле', model=True),
+    Feature('left_num_p', np.int64, 'полузащитники левой команды на поле', model=True),
+    Feature('left_num_n', np.int64, 'нападающие левой команды на поле', model=True),
+    Feature('left_num_u', np.int64, 'игроки левой команды с неизвестным амплуа на поле'),
+    Feature('right_num_v', np.int64, 'вратари правой команды на поле'),
+    Feature('right_num_z', np.int64, 'защитники правой команды на поле', model=True),
+    Feature('right_num_p', np.int64, 'полузащитники правой команды на поле', model=True),
+    Feature('right_num_n', np.int64, 'нападающие правой команды на поле', model=True),
+    Feature('right_num_u', np.int64, 'игроки правой команды с неизвестным амплуа на поле'),
+    Feature('left_num_y', np.int64, 'желтые карточки левой команды', model=True),
+    Feature('left_num_y2r', np.int64, 'удаления левой команды', model=True),
+    Feature('right_num_y', np.int64, 'желтые карточки правой команды', model=True),
+    Feature('right_num_y2r', np.int64, 'удаления правой команды', model=True),
+    Feature('right_num_goal_g', np.int64, 'голы правой команды с игры'),
+    Feature('right_num_goal_p', np.int64, 'голы правой команды с пенальти'),
+    Feature('right_num_goal_a', np.int64, 'автоголы в пользу правой команды'),
+    Feature('left_num_goal_g', np.int64, 'голы левой команды с игры'),
+    Feature('left_num_goal_p', np.int64, 'голы левой команды с пенальти'),
+    Feature('left_num_goal_a', np.int64, 'автоголы в пользу левой команды'),
+    Feature('left_total_transfer_value', np.float64, 'суммарная стоимость игроков левой команды на поле', model=True),
+    Feature('right_total_transfer_value', np.float64, 'суммарная стоимость игроков правой команды на поле', model=True),
+    Feature('left_avg_transfer_value', np.float64, 'средняя стоимость игрока левой команды на поле', model=True),
+    Feature('right_avg_transfer_value', np.float64, 'средняя стоимость игрока правой команды на поле', model=True),
+    Feature('left_goal_score', np.int64, 'счет левой команды'),
+    Feature('right_goal_score', np.int64, 'счет правой команды'),
+    Feature('left_avg_time_player_in_game', np.float64, 'среднее время игрока левой команды на поле', model=True),
+    Feature('right_avg_time_player_in_game', np.float64, 'среднее время игрока правой команды на поле', model=True),
+    Feature('left_right_transfer_value_div', np.float64, 'отношение стоимости левой команды к правой', model=True),
+    Feature('right_left_transfer_value_div', np.float64, 'отношение стоимости правой команды к левой', model=True),
+    Feature('res_event', np.int64, 'исход матча по счету на момент события'),
+)
+
+FEATURE_COLUMNS = [feature.name for feature in FEATURES]
+FLOAT_FEATURE_COLUMNS = tuple(feature.name for feature in FEATURES if feature.dtype == np.float64)
+# Признаки модели по умолчанию (порядок столбцов обучающей выборки model_cbc_without_goals),
+# используются, если имена признаков не сохранены в файле модели
+MODEL_FEATURE_COLUMNS = [feature.name for feature in FEATURES if feature.model]
+
+FEATURE_DTYPE = np.dtype([(feature.name, feature.dtype) for feature in FEATURES])
+
+# Типы PostgreSQL для полей массива (массивы передаются в unnest)
+SQL_TYPES = {
+    np.dtype(np.int64): 'INTEGER',
+    np.dtype(np.float64): 'DOUBLE PRECISION',
+}
+
+
+def sql_columns(columns: list[str], prefix: str = '', separator: str = ',\n') -> str:
+    """Список столбцов для SQL-запроса (prefix - например ':' для параметров или 'batch.' для псевдонима)"""
+    return separator.join(f'{prefix}{name}' for name in columns)
+
+
+def sql_unnest_arrays(dtype: np.dtype, columns: list[str] = None) -> str:
+    """Аргументы unnest для вставки массивов: CAST(:name AS TYPE[]) по полям dtype"""
+    columns = dtype.names if columns is None else columns
+    return ',\n'.join(f'CAST(:{name} AS {SQL_TYPES[dtype[name]]}[])' for name in columns)
+
+
+def bind_arrays(states, dtype: np.dtype, columns: list[str] = None) -> dict[str, list]:
+    """Параметры запроса: значения каждого поля в виде списка Python нужного типа"""
+    columns = dtype.names if columns is None else columns
+    return {name: np.asarray(states[name], dtype=dtype[name]).tolist() for name in columns}
+
+
+def rows_to_array(rows, dtype: np.dtype) -> np.ndarray:
+    """Строки результата запроса (столбцы в порядке полей dtype) в структурированный массив
+
+    Пропуски (NULL) вещественных полей сохраняются как NaN.
+    """
+    rows = [tuple(row) for row in rows]
+    res = np.zeros(len(rows), dtype=dtype)
+    if not rows: return res
+    values = np.array(rows, dtype=np.float64)
+    for i, name in enumerate(dtype.names):
+        res[name] = values[:, i].astype(dtype[name])
+    return res
@@ -96,4 +96,12 @@ class GamePageLocators(object):
     RIGHT_TEAM_STAT = (By.XPATH, ".//div[contains(@class, 'stat-graph__value') and contains(@class, '_right')]/strong")
     STAT_TITLE = (By.XPATH, ".//div[@class='stat-graph__title']")
     
-    GAME_STATUS = (By.XPATH, "//div[@class='match-info__score']/div[@class='match-info__status']")
\ No newline at end of file
+    GAME_STATUS = (By.XPATH, "//div[@class='match-info__score']/div[@class='match-info__status']")
+    
+    # контейнеры разделов страницы (изменение раздела определяется по его отпечатку)
+    REFEREE_SECTION = (By.XPATH, "//div[@class='match-info__extra']")
+    COACHES_SECTION = (By.XPATH, "//div[contains(@class, 'swiper-slide')][.//div[contains(@class, 'tournament-title') and normalize-space()='Главные тренеры']]")
+    GOALS_SECTION = (By.XPATH, "//div[h2[contains(text(), 'Голы')]]")
+    PENALTIES_SECTION = (By.XPATH, "//div[h2[contains(text(), 'Наказания')]]")
+    LINEUP_SECTION = (By.XPATH, "//table[contains(@class, 'match-lineup__players')]")
+    STAT_SECTION = (By.XPATH, "//div[h2[contains(text(), 'Статистика')]]")
\ No newline at end of file
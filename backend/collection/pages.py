@@ -3,6 +3,7 @@ from selenium import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import NoSuchElementException, WebDriverException, TimeoutException
 from datetime import date, datetime, time
+from time import perf_counter
 
 from urllib3.exceptions import (
     ReadTimeoutError,
@@ -18,6 +19,77 @@ from collection.locators import *
 from collection.schemas import *
 
 
+# Извлечение элементов страницы одним вызовом execute_script: для каждого XPath спецификации собираются
+# все найденные узлы, их свойства ('text' - видимый текст, 'href' - полный адрес, остальные - атрибуты)
+# и вложенные узлы по XPath относительно узла
+DOM_EXTRACT_SCRIPT = """
+const visibleText = (el) => {
+    if (!el.getClientRects().length) return '';
+    return el.innerText.split('\\n').map(line => line.replace(/[\\s\\u00a0]+/g, ' ').trim()).filter(line => line).join('\\n');
+};
+const property = (el, name) => {
+    if (name === 'text') return visibleText(el);
+    if (name === 'href') return el.href || el.getAttribute('href');
+    return el.getAttribute(name);
+};
+const extract = (context, spec) => {
+    const result = {};
+    for (const [xpath, [names, children]] of Object.entries(spec)) {
+        const nodes = document.evaluate(xpath, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        result[xpath] = [];
+        for (let i = 0; i < nodes.snapshotLength; i++) {
+            const el = nodes.snapshotItem(i);
+            const node = {properties: {}, children: extract(el, children)};
+            for (const name of names) node.properties[name] = property(el, name);
+            result[xpath].push(node);
+        }
+    }
+    return result;
+};
+return extract(document, arguments[0]);
+"""
+
+
+class ScriptElement(object):
+    """Элемент страницы, извлеченный DOM_EXTRACT_SCRIPT
+
+    Повторяет используемую при разборе часть интерфейса WebElement (find_element, find_elements,
+    text, get_attribute), поэтому код разбора страниц работает без изменений, но без обращений к драйверу.
+    """
+    
+    def __init__(self, data: dict):
+        self._data = data
+    
+    @property
+    def text(self) -> str:
+        return self._data['properties']['text']
+    
+    def get_attribute(self, name: str) -> str | None:
+        return self._data['properties'][name]
+    
+    def find_elements(self, by, value) -> list['ScriptElement']:
+        return [ScriptElement(data) for data in self._data['children'][value]]
+    
+    def find_element(self, by, value) -> 'ScriptElement':
+        elements = self.find_elements(by, value)
+        if not elements: raise NoSuchElementException(f'Элемент не найден: {value}')
+        return elements[0]
+
+
+def to_script_spec(spec: dict) -> dict:
+    """Спецификация {локатор: (свойства, {вложенный локатор: ...})} в аргумент DOM_EXTRACT_SCRIPT"""
+    script_spec = {}
+    for (by, value), (names, children) in spec.items():
+        if by != By.XPATH: raise ValueError(f'Извлечение скриптом поддерживает только XPath: {by}')
+        script_spec[value] = (list(names), to_script_spec(children))
+    return script_spec
+
+
+def extract_dom(driver: webdriver.Firefox, spec: dict) -> ScriptElement:
+    """Элементы страницы по спецификации, извлеченные одним вызовом execute_script (корень - документ)"""
+    return ScriptElement({'properties': {}, 'children': driver.execute_script(DOM_EXTRACT_SCRIPT, to_script_spec(spec))})
+
+
 class BasePage(object):
     """Base class to initialize the base page that will be called from all pages"""
     
@@ -55,12 +127,26 @@ class BasePage(object):
         '''Метод для реализации в наследниках'''
         raise NotImplementedError('Must be implemented in subclass')
     
+    @retry (
+        stop=stop_after_attempt(5),
+        wait=wait_exponential(multiplier=2, min=1, max=60),
+        retry=retry_if_exception_type(_RETRY_EXCEPTIONS))
+    def get_info_in_current_tab(self):
+        # переход на страницу в текущей вкладке без открытия и закрытия отдельной вкладки на каждую страницу
+        self.go_to_page()
+        return self._read_page()
+    
+    def _read_page(self):
+        '''Разбор страницы, загруженной в текущей вкладке (для реализации в наследниках)'''
+        raise NotImplementedError('Must be implemented in subclass')
+    
 
 class SeasonPage(BasePage):
     
     
-    def __init__(self, driver, page_href = 'https://www.championat.com/football/_russiapl.html'):
+    def __init__(self, driver, page_href = 'https://www.championat.com/football/_russiapl.html', bulk: bool = True):
         super().__init__(driver, page_href)
+        self.bulk = bulk # режим извлечения страниц команд, игроков, тренеров и игр (см. TeamPage, GamePage)
         self.go_to_page()
         # при переходе по стандартной ссылке необходимо ее обновить нажав на название турнира
         # https://www.championat.com/football/_russiapl.html (ссылка на текущий турнир РПЛ)
@@ -92,13 +178,13 @@ class SeasonPage(BasePage):
         team_links_list = [link.get_attribute('href') for link in team_links]
         team_list = []
         for team_link in team_links_list:
-            tp = TeamPage(self.driver, team_link)
+            tp = TeamPage(self.driver, team_link, bulk=self.bulk)
             team = tp.get_info()
             team_list.append(team)        
         
         # получение данных игр
         calendar_href = self.page_href + 'calendar/'
-        game_list = CalendarPage(self.driver, calendar_href).get_info()
+        game_list = CalendarPage(self.driver, calendar_href, bulk=self.bulk).get_info()
         
         return Season(id=season_id,
                       start_date=start_date,
@@ -191,23 +277,62 @@ class SeasonPage(BasePage):
         self.page_href = self.driver.current_url
 
 
+# Элементы страниц команды, тренера и игрока для извлечения одним скриптом: {локатор: (свойства, {})}
+TEAM_EXTRACT_SPEC = {
+    TeamPageLocators.TEAM_COACH_LINK: (['href'], {}),
+    TeamPageLocators.TEAM_PLAYER_LINKS: (['href'], {}),
+}
+COACH_EXTRACT_SPEC = {
+    CoachPageLocators.COACH_FIRST_LAST_NAME_WITH_ABOUT: (['text'], {}),
+    CoachPageLocators.COACH_FIRST_LAST_NAME_WITH_OUT_ABOUT: (['text'], {}),
+    CoachPageLocators.COACH_BIRTH_DATE: (['text'], {}),
+}
+PLAYER_EXTRACT_SPEC = {
+    PlayerPageLocators.PLAYER_FIRST_LAST_NAME_WITH_ABOUT: (['text'], {}),
+    PlayerPageLocators.PLAYER_FIRST_LAST_NAME_WITH_OUT_ABOUT: (['text'], {}),
+    PlayerPageLocators.PLAYER_NUMBER: (['text'], {}),
+    PlayerPageLocators.PLAYER_ROLE: (['text'], {}),
+    PlayerPageLocators.PLAYER_BIRTH_DATE: (['text'], {}),
+    PlayerPageLocators.PLAYER_GROWTH: (['text'], {}),
+    PlayerPageLocators.PLAYER_WEIGHT: (['text'], {}),
+    PlayerPageLocators.PLAYER_TRANSFER_VALUE: (['text'], {}),
+}
+
+
 class TeamPage(BasePage):
     
     
-    def __init__(self, driver, page_href):
+    def __init__(self, driver, page_href, bulk: bool = True):
+        """
+        Args:
+            bulk (bool, optional): Данные каждой страницы извлекаются одним вызовом execute_script, страницы тренера
+                и игроков открываются по очереди во вкладке команды (без отдельной вкладки на каждую страницу)
+        """
         super().__init__(driver, page_href)
+        self.bulk = bulk
     
     
     def get_team_name_id(self) -> tuple[str, str]:
         original_window = self.driver.current_window_handle # запоминаем текущую страницу
         self.driver.switch_to.new_window('tab') # соаздем новую страницу
+        team_name, team_id = self._read_team_name_id()
+        self.driver.close() # закрываем страницу команды
+        self.driver.switch_to.window(original_window) # возвращаемся на начальную страницу
+        return team_name, team_id
+    
+    
+    def _read_team_name_id(self) -> tuple[str, str]:
         self.go_to_page() # переходим на страницу команды в текущем сезоне
         self.driver.find_element(*TeamPageLocators.TEAM_ABOUT_BUTTON).click() # переходим на главную страницу команды
         team_name: str = self.driver.find_element(*TeamPageLocators.TEAM_NAME).text # получаем название команды
         team_id: str = self.driver.current_url.split('/')[-2] # получаем уникальный тег команды
-        self.driver.close() # закрываем страницу команды
-        self.driver.switch_to.window(original_window) # возвращаемся на начальную страницу
         return team_name, team_id
+    
+    
+    def _get_page_info(self, page_class, page_href: str):
+        """Данные страницы тренера или игрока: во вкладке команды (bulk) или в отдельной вкладке"""
+        page = page_class(self.driver, page_href, bulk=self.bulk)
+        return page.get_info_in_current_tab() if self.bulk else page.get_info()
         
     
     def _get_info_impl(self, only_info: bool) -> Team:
@@ -223,25 +348,26 @@ class TeamPage(BasePage):
             self.go_to_page() # переходим на страницу команды в текущем сезоне
         
             season_team_id = self.driver.current_url.split('/')[-3]
+            # ссылки собираются до перехода на страницы тренера и игроков (в режиме bulk - в этой же вкладке)
+            dom = extract_dom(self.driver, TEAM_EXTRACT_SPEC) if self.bulk else self.driver
             
             try:
                 # https://www.championat.com/football/_russiapl/tournament/5980/teams/255784/result/
                 # играют без тренера) в играх указан, поэтому информацю по нему брать из игр
-                coach_link = self.driver.find_element(*TeamPageLocators.TEAM_COACH_LINK).get_attribute('href')
-                cp = CoachPage(self.driver, coach_link)
-                coach = cp.get_info()
+                coach_link = dom.find_element(*TeamPageLocators.TEAM_COACH_LINK).get_attribute('href')
             except NoSuchElementException:
-                coach = None
+                coach_link = None
             
-            player_links = self.driver.find_elements(*TeamPageLocators.TEAM_PLAYER_LINKS)
+            player_links = dom.find_elements(*TeamPageLocators.TEAM_PLAYER_LINKS)
             player_links_list = [link.get_attribute('href') for link in player_links]
+            
+            coach = None if coach_link is None else self._get_page_info(CoachPage, coach_link)
             player_list = []
             for player_link in player_links_list:
-                pp = PlayerPage(self.driver, player_link)
-                player = pp.get_info()
+                player = self._get_page_info(PlayerPage, player_link)
                 player_list.append(player)
             
-            team_name, team_id = self.get_team_name_id()
+            team_name, team_id = self._read_team_name_id() if self.bulk else self.get_team_name_id()
             
             return Team(id=team_id,
                         season_team_id=season_team_id,
@@ -262,8 +388,14 @@ class TeamPage(BasePage):
 class CoachPage(BasePage):
     
     
-    def __init__(self, driver, page_href):
+    def __init__(self, driver, page_href, bulk: bool = True):
+        """
+        Args:
+            bulk (bool, optional): Извлечение данных страницы одним вызовом execute_script (COACH_EXTRACT_SPEC)
+        """
         super().__init__(driver, page_href)
+        self.bulk = bulk
+        self.dom = driver
         
     
     def _get_info_impl(self, only_info: bool) -> Coach:
@@ -273,52 +405,63 @@ class CoachPage(BasePage):
         
         try:
             self.go_to_page() # переходим на страницу команды в текущем сезоне
-            
-            coach_id = self.driver.current_url.split('/')[-2] # получаем уникальный id тренера
-            
-            first_name = None
-            middle_name = None
-            last_name = None
-            birth_date = None
-
-            try: 
-                first_middle_last_name = self.driver.find_element(*CoachPageLocators.COACH_FIRST_LAST_NAME_WITH_ABOUT).text.strip().split()
-                if len(first_middle_last_name) == 0:
-                    first_middle_last_name = self.driver.find_element(*CoachPageLocators.COACH_FIRST_LAST_NAME_WITH_OUT_ABOUT).text.strip().split()
-                
-                if len(first_middle_last_name) == 1:
-                    first_name = first_middle_last_name[0]
-                if len(first_middle_last_name) == 2:
-                    first_name = first_middle_last_name[0]
-                    last_name = first_middle_last_name[1]
-                if len(first_middle_last_name) > 2:
-                    first_name = first_middle_last_name[0]
-                    middle_name = first_middle_last_name[1]
-                    last_name = first_middle_last_name[2]
-            except NoSuchElementException: pass
-            except IndexError:
-                raise IndexError(f'list index out of range in name: {first_middle_last_name}, url: {self.page_href}')
-            
-            try: 
-                birth_date = self.driver.find_element(*CoachPageLocators.COACH_BIRTH_DATE).text.strip()
-                birth_date = datetime.strptime(birth_date, "%d.%m.%Y").date()
-            except NoSuchElementException: pass
-            
-            return Coach(id=coach_id,
-                        first_name=first_name,
-                        middle_name=middle_name,
-                        last_name=last_name,
-                        birth_date=birth_date)
+            return self._read_page()
         finally:
             self.driver.close() # закрываем страницу команды
             self.driver.switch_to.window(original_window) # возвращаемся на начальную страницу
+    
+    
+    def _read_page(self) -> Coach:
+        self.dom = extract_dom(self.driver, COACH_EXTRACT_SPEC) if self.bulk else self.driver
+        
+        coach_id = self.driver.current_url.split('/')[-2] # получаем уникальный id тренера
         
+        first_name = None
+        middle_name = None
+        last_name = None
+        birth_date = None
+
+        try: 
+            first_middle_last_name = self.dom.find_element(*CoachPageLocators.COACH_FIRST_LAST_NAME_WITH_ABOUT).text.strip().split()
+            if len(first_middle_last_name) == 0:
+                first_middle_last_name = self.dom.find_element(*CoachPageLocators.COACH_FIRST_LAST_NAME_WITH_OUT_ABOUT).text.strip().split()
+            
+            if len(first_middle_last_name) == 1:
+                first_name = first_middle_last_name[0]
+            if len(first_middle_last_name) == 2:
+                first_name = first_middle_last_name[0]
+                last_name = first_middle_last_name[1]
+            if len(first_middle_last_name) > 2:
+                first_name = first_middle_last_name[0]
+                middle_name = first_middle_last_name[1]
+                last_name = first_middle_last_name[2]
+        except NoSuchElementException: pass
+        except IndexError:
+            raise IndexError(f'list index out of range in name: {first_middle_last_name}, url: {self.page_href}')
+        
+        try: 
+            birth_date = self.dom.find_element(*CoachPageLocators.COACH_BIRTH_DATE).text.strip()
+            birth_date = datetime.strptime(birth_date, "%d.%m.%Y").date()
+        except NoSuchElementException: pass
+        
+        return Coach(id=coach_id,
+                    first_name=first_name,
+                    middle_name=middle_name,
+                    last_name=last_name,
+                    birth_date=birth_date)
+    
 
 class PlayerPage(BasePage):
     
     
-    def __init__(self, driver, page_href):
+    def __init__(self, driver, page_href, bulk: bool = True):
+        """
+        Args:
+            bulk (bool, optional): Извлечение данных страницы одним вызовом execute_script (PLAYER_EXTRACT_SPEC)
+        """
         super().__init__(driver, page_href)
+        self.bulk = bulk
+        self.dom = driver
         
         
     def _get_info_impl(self, only_info: bool) -> Player:
@@ -329,67 +472,71 @@ class PlayerPage(BasePage):
         # заключаем в блок try для закрытия вкладки в случаи возникновения ошибки
         try:
             self.go_to_page() # переходим на страницу команды в текущем сезоне
-            
-            player_id = self.driver.current_url.split('/')[-2] # получаем уникальный id игрока
-            
-            first_name = None
-            last_name = None
-            number = None
-            role = None
-            birth_date = None
-            growth = None
-            weight = None
-            transfer_value = None
-            
-            try: 
-                first_last_name = self.driver.find_element(*PlayerPageLocators.PLAYER_FIRST_LAST_NAME_WITH_ABOUT).text.strip().split()
-                if len(first_last_name) == 0: # для игоков, которые не имеют ссылки на главную карточку игрока
-                    first_last_name = self.driver.find_element(*PlayerPageLocators.PLAYER_FIRST_LAST_NAME_WITH_OUT_ABOUT).text.strip().split()
-                    
-                if len(first_last_name) > 0:
-                    first_name = first_last_name[0]
-                if len(first_last_name) > 1:
-                    last_name = first_last_name[1]
-                    
-            except NoSuchElementException: pass
-            except IndexError:
-                raise IndexError(f'list index out of range in name: {first_last_name}, url: {self.page_href}')
-            
-            try: number = int(self.driver.find_element(*PlayerPageLocators.PLAYER_NUMBER).text.strip())
-            except NoSuchElementException: pass
-            
-            try: role = self.driver.find_element(*PlayerPageLocators.PLAYER_ROLE).text.strip()
-            except NoSuchElementException: pass
-            
-            try: 
-                birth_date = self.driver.find_element(*PlayerPageLocators.PLAYER_BIRTH_DATE).text.strip()
-                birth_date = datetime.strptime(birth_date, "%d.%m.%Y").date()
-            except NoSuchElementException: pass
-            
-            try: growth = int(self.driver.find_element(*PlayerPageLocators.PLAYER_GROWTH).text.strip().replace(' см', ''))
-            except NoSuchElementException: pass
-            
-            try: weight = int(self.driver.find_element(*PlayerPageLocators.PLAYER_WEIGHT).text.strip().replace(' кг', ''))
-            except NoSuchElementException: pass
-            
-            try: 
-                transfer_value = self.driver.find_element(*PlayerPageLocators.PLAYER_TRANSFER_VALUE).text.strip()
-                transfer_value = int(transfer_value.replace(' ', '').replace('€', ''))
-            except NoSuchElementException: pass
-            
-            return Player(id=player_id, 
-                        first_name=first_name,
-                        last_name=last_name,
-                        number=number,
-                        role=role,
-                        birth_date=birth_date,
-                        growth=growth,
-                        weight=weight,
-                        transfer_value=transfer_value)
-        
+            return self._read_page()
         finally:
             self.driver.close() # закрываем страницу команды
             self.driver.switch_to.window(original_window) # возвращаемся на начальную страницу
+    
+    
+    def _read_page(self) -> Player:
+        self.dom = extract_dom(self.driver, PLAYER_EXTRACT_SPEC) if self.bulk else self.driver
+        
+        player_id = self.driver.current_url.split('/')[-2] # получаем уникальный id игрока
+        
+        first_name = None
+        last_name = None
+        number = None
+        role = None
+        birth_date = None
+        growth = None
+        weight = None
+        transfer_value = None
+        
+        try: 
+            first_last_name = self.dom.find_element(*PlayerPageLocators.PLAYER_FIRST_LAST_NAME_WITH_ABOUT).text.strip().split()
+            if len(first_last_name) == 0: # для игоков, которые не имеют ссылки на главную карточку игрока
+                first_last_name = self.dom.find_element(*PlayerPageLocators.PLAYER_FIRST_LAST_NAME_WITH_OUT_ABOUT).text.strip().split()
+                
+            if len(first_last_name) > 0:
+                first_name = first_last_name[0]
+            if len(first_last_name) > 1:
+                last_name = first_last_name[1]
+                
+        except NoSuchElementException: pass
+        except IndexError:
+            raise IndexError(f'list index out of range in name: {first_last_name}, url: {self.page_href}')
+        
+        try: number = int(self.dom.find_element(*PlayerPageLocators.PLAYER_NUMBER).text.strip())
+        except NoSuchElementException: pass
+        
+        try: role = self.dom.find_element(*PlayerPageLocators.PLAYER_ROLE).text.strip()
+        except NoSuchElementException: pass
+        
+        try: 
+            birth_date = self.dom.find_element(*PlayerPageLocators.PLAYER_BIRTH_DATE).text.strip()
+            birth_date = datetime.strptime(birth_date, "%d.%m.%Y").date()
+        except NoSuchElementException: pass
+        
+        try: growth = int(self.dom.find_element(*PlayerPageLocators.PLAYER_GROWTH).text.strip().replace(' см', ''))
+        except NoSuchElementException: pass
+        
+        try: weight = int(self.dom.find_element(*PlayerPageLocators.PLAYER_WEIGHT).text.strip().replace(' кг', ''))
+        except NoSuchElementException: pass
+        
+        try: 
+            transfer_value = self.dom.find_element(*PlayerPageLocators.PLAYER_TRANSFER_VALUE).text.strip()
+            transfer_value = int(transfer_value.replace(' ', '').replace('€', ''))
+        except NoSuchElementException: pass
+        
+        return Player(id=player_id, 
+                    first_name=first_name,
+                    last_name=last_name,
+                    number=number,
+                    role=role,
+                    birth_date=birth_date,
+                    growth=growth,
+                    weight=weight,
+                    transfer_value=transfer_value)
             
             
     @staticmethod
@@ -400,8 +547,9 @@ class PlayerPage(BasePage):
 class CalendarPage(BasePage):
     
     
-    def __init__(self, driver, page_href):
+    def __init__(self, driver, page_href, bulk: bool = True):
         super().__init__(driver, page_href)
+        self.bulk = bulk
         
         
     def _get_info_impl(self, only_info: bool) -> list[Game]:
@@ -447,7 +595,7 @@ class CalendarPage(BasePage):
                             tour_number=tour_number,
                             is_played=is_played)
                 
-                calendar_game_add = GamePage(self.driver, game_link).get_info()
+                calendar_game_add = GamePage(self.driver, game_link, bulk=self.bulk).get_info()
                 calendar_game += calendar_game_add
                 
                 games.append(calendar_game)
@@ -459,11 +607,81 @@ class CalendarPage(BasePage):
             self.driver.switch_to.window(original_window) # возвращаемся на начальную страницу
             
             
+# Отпечатки разделов страницы: количество узлов, длина и хеш outerHTML узлов каждого XPath
+# (вычисляются в браузере одним вызовом, в Python передаются только короткие строки)
+SECTION_FINGERPRINT_SCRIPT = """
+const fingerprints = {};
+for (const [name, xpath] of Object.entries(arguments[0])) {
+    const nodes = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    let hash = 0, length = 0;
+    for (let i = 0; i < nodes.snapshotLength; i++) {
+        const html = nodes.snapshotItem(i).outerHTML;
+        for (let j = 0; j < html.length; j++) hash = (Math.imul(hash, 31) + html.charCodeAt(j)) | 0;
+        length += html.length;
+    }
+    fingerprints[name] = nodes.snapshotLength + ':' + length + ':' + hash;
+}
+return fingerprints;
+"""
+
+
+# Элементы разделов страницы игры, которые читают методы разбора GamePage:
+# раздел -> {локатор: (свойства, {вложенный локатор: (свойства, {})})}
+GAME_GOAL_SPEC = {
+    GamePageLocators.MIN_PLUS_MIN_GOAL_DIV: (['data-minute'], {}),
+    GamePageLocators.PLAYER_GOAL_A: (['href'], {}),
+    GamePageLocators.PLAYER_SUB_GOAL_A: (['href'], {}),
+    GamePageLocators.TYPE_GOAL_DIV: (['title'], {}),
+}
+GAME_PENALTY_SPEC = {
+    GamePageLocators.MIN_PLUS_MIN_PYNALTY_DIV: (['text'], {}),
+    GamePageLocators.PLAYER_PENALTY_A: (['href'], {}),
+    GamePageLocators.TYPE_PENALTY_SPAN: (['class'], {}),
+}
+GAME_LINEUP_SPEC = {
+    GamePageLocators.PLAYER_LINEUP_HREF_A: (['href'], {}),
+    GamePageLocators.PLAYER_SAVES_TD: (['text'], {}),
+    GamePageLocators.PLAYER_IN_SPAN: (['text'], {}),
+    GamePageLocators.PLAYER_OUT_SPAN: (['text'], {}),
+}
+GAME_STAT_SPEC = {
+    GamePageLocators.LEFT_TEAM_STAT: (['text'], {}),
+    GamePageLocators.RIGHT_TEAM_STAT: (['text'], {}),
+    GamePageLocators.STAT_TITLE: (['text'], {}),
+}
+GAME_EXTRACT_SPEC = {
+    'referee': {GamePageLocators.REFEREE_A: (['href', 'text'], {})},
+    'coaches': {GamePageLocators.LEFT_COACH_A: (['href'], {}), GamePageLocators.RIGHT_COACH_A: (['href'], {})},
+    'goals': {GamePageLocators.LEFT_TEAM_GOALS: ([], GAME_GOAL_SPEC), GamePageLocators.RIGHT_TEAM_GOALS: ([], GAME_GOAL_SPEC)},
+    'penalties': {GamePageLocators.LEFT_TEAM_PENALTIES: ([], GAME_PENALTY_SPEC), GamePageLocators.RIGHT_TEAM_PENALTIES: ([], GAME_PENALTY_SPEC)},
+    'lineups': {GamePageLocators.LEFT_TEAM_LINEUP_TR: ([], GAME_LINEUP_SPEC), GamePageLocators.RIGHT_TEAM_LINEUP_TR: ([], GAME_LINEUP_SPEC)},
+    'stats': {GamePageLocators.STAT_DIV: ([], GAME_STAT_SPEC)},
+    'status': {GamePageLocators.GAME_STATUS: (['text'], {})},
+}
+
+
 class GamePage(BasePage):
     
+    # Разделы страницы игры: имя -> (контейнер раздела, метод разбора, возвращающий поля Game)
+    SECTIONS = {
+        'referee': (GamePageLocators.REFEREE_SECTION, '_parse_referee'),
+        'coaches': (GamePageLocators.COACHES_SECTION, '_parse_coaches'),
+        'goals': (GamePageLocators.GOALS_SECTION, '_parse_goals'),
+        'penalties': (GamePageLocators.PENALTIES_SECTION, '_parse_penalties'),
+        'lineups': (GamePageLocators.LINEUP_SECTION, '_parse_lineups'),
+        'stats': (GamePageLocators.STAT_SECTION, '_parse_stats'),
+        'status': (GamePageLocators.GAME_STATUS, '_parse_status'),
+    }
 
-    def __init__(self, driver, page_href):
+    def __init__(self, driver, page_href, bulk: bool = True):
+        """
+        Args:
+            bulk (bool, optional): Извлечение разделов одним вызовом execute_script (GAME_EXTRACT_SPEC),
+                иначе поиск каждого элемента отдельным обращением к драйверу
+        """
         super().__init__(driver, page_href)
+        self.bulk = bulk
+        self.dom = driver
         
     
     @staticmethod
@@ -478,195 +696,289 @@ class GamePage(BasePage):
         try:
             self.go_to_page() # переходим на страницу игры
             
-            # сбор информации о главном судье
-            referee = None
-            try:
-                el_a_referee = self.driver.find_element(*GamePageLocators.REFEREE_A)
-                referee_id = el_a_referee.get_attribute('href').strip().split('/')[-2]
-                first_last_referee_name = el_a_referee.text.strip().split(' ')
-                first_name_referee = first_last_referee_name[0]
-                last_name_referee = first_last_referee_name[1]
-                
-                referee = Referee(id=referee_id, first_name=first_name_referee, last_name=last_name_referee)
-            except NoSuchElementException: pass
-            
-            left_coach_id = None
-            try:
-                left_coach_link = self.driver.find_element(*GamePageLocators.LEFT_COACH_A).get_attribute('href')
-                left_coach_id = CoachID(left_coach_link.strip().split('/')[-2])
-            except: pass
-            
-            right_coach_id = None
-            try:
-                right_coach_link = self.driver.find_element(*GamePageLocators.RIGHT_COACH_A).get_attribute('href')
-                right_coach_id = CoachID(right_coach_link.strip().split('/')[-2])
-            except: pass
-            
-            print(f'\n\n\n\n\n\n{right_coach_id.id=}\n\n\n\n\n\n')
-            
-            # сбор информации о голах
-            left_team_goals: list[Goal] = []
-            right_team_goals: list[Goal] = []
-            try:
-                el_list_left_team_goals = self.driver.find_elements(*GamePageLocators.LEFT_TEAM_GOALS)
-                for left_team_goal in el_list_left_team_goals:
-                    min_plus_min = left_team_goal.find_element(*GamePageLocators.MIN_PLUS_MIN_GOAL_DIV).get_attribute('data-minute').split('+')
-                    min = int(min_plus_min[0])
-                    plus_min = int(min_plus_min[1]) if len(min_plus_min) > 1 else None
-                    player_id = PlayerID(left_team_goal.find_element(*GamePageLocators.PLAYER_GOAL_A).get_attribute('href').strip().split('/')[-2])
-                    player_sub_id = None
-                    try:
-                        player_sub_id = PlayerID(left_team_goal.find_element(*GamePageLocators.PLAYER_SUB_GOAL_A).get_attribute('href').strip().split('/')[-2])
-                    except NoSuchElementException: pass
-                    type = left_team_goal.find_element(*GamePageLocators.TYPE_GOAL_DIV).get_attribute('title')
-                    
-                    goal = Goal(min, plus_min, player_id, player_sub_id, type)
-                    left_team_goals.append(goal)
-                    
-                el_list_right_team_goals = self.driver.find_elements(*GamePageLocators.RIGHT_TEAM_GOALS)
-                for right_team_goal in el_list_right_team_goals:
-                    
-                    min_plus_min = right_team_goal.find_element(*GamePageLocators.MIN_PLUS_MIN_GOAL_DIV).get_attribute('data-minute').split('+')
-                    min = int(min_plus_min[0])
-                    plus_min = int(min_plus_min[1]) if len(min_plus_min) > 1 else None
-                    
-                    player_id = PlayerID(right_team_goal.find_element(*GamePageLocators.PLAYER_GOAL_A).get_attribute('href').strip().split('/')[-2])
-                    player_sub_id = None
-                    try:
-                        player_sub_id = PlayerID(right_team_goal.find_element(*GamePageLocators.PLAYER_SUB_GOAL_A).get_attribute('href').strip().split('/')[-2])
-                    except NoSuchElementException: pass
-                    type = right_team_goal.find_element(*GamePageLocators.TYPE_GOAL_DIV).get_attribute('title')
-                    
-                    goal = Goal(min, plus_min, player_id, player_sub_id, type)
-                    right_team_goals.append(goal)
-                
-            except NoSuchElementException: pass
-            
-            # сбор информации о наказаниях
-            left_team_penalties: list[Penalty] = []
-            right_team_penalties: list[Penalty] = []
-            try:
-                el_list_left_team_penalties = self.driver.find_elements(*GamePageLocators.LEFT_TEAM_PENALTIES)
-                for left_team_penalty in el_list_left_team_penalties:
-                    min_plus_min = left_team_penalty.find_element(*GamePageLocators.MIN_PLUS_MIN_PYNALTY_DIV).text.strip().replace(' ', '').replace('\'', '').split('+')
-                    min = int(min_plus_min[0])
-                    plus_min = int(min_plus_min[1]) if len(min_plus_min) > 1 else None
-                    
-                    player_id = PlayerID(left_team_penalty.find_element(*GamePageLocators.PLAYER_PENALTY_A).get_attribute('href').strip().split('/')[-2])
-                    type = left_team_penalty.find_element(*GamePageLocators.TYPE_PENALTY_SPAN).get_attribute('class').split(' ')[1].replace('_', '')
-                    
-                    penalty = Penalty(min, plus_min, player_id, type)
-                    left_team_penalties.append(penalty)
-                    
-                el_list_right_team_penalties = self.driver.find_elements(*GamePageLocators.RIGHT_TEAM_PENALTIES)
-                for right_team_penalty in el_list_right_team_penalties:
-                    min_plus_min = right_team_penalty.find_element(*GamePageLocators.MIN_PLUS_MIN_PYNALTY_DIV).text.strip().replace(' ', '').replace('\'', '').split('+')
-                    min = int(min_plus_min[0])
-                    plus_min = int(min_plus_min[1]) if len(min_plus_min) > 1 else None
-                    
-                    player_id = PlayerID(right_team_penalty.find_element(*GamePageLocators.PLAYER_PENALTY_A).get_attribute('href').strip().split('/')[-2])
-                    type = right_team_penalty.find_element(*GamePageLocators.TYPE_PENALTY_SPAN).get_attribute('class').split(' ')[1].replace('_', '')
-                    
-                    penalty = Penalty(min, plus_min, player_id, type)
-                    right_team_penalties.append(penalty)
-            except NoSuchElementException: pass
-            
-            # сбор информации о составе
-            left_team_lineup: list[PlayerLineup] = []
-            right_team_lineup: list[PlayerLineup] = []
-            try:
-                el_left_team_lineup = self.driver.find_elements(*GamePageLocators.LEFT_TEAM_LINEUP_TR)
-                for left_team_line in el_left_team_lineup:
-                    player_id = PlayerID(left_team_line.find_element(*GamePageLocators.PLAYER_LINEUP_HREF_A).get_attribute('href').strip().split('/')[-2])
-                    saves_str = left_team_line.find_element(*GamePageLocators.PLAYER_SAVES_TD).text.strip()
-                    saves = int(saves_str) if len(saves_str) > 0 else None
-                    min_in, plus_min_in, min_out, plus_min_out = None, None, None, None
-                    try:
-                        min_plus_min_in = left_team_line.find_element(*GamePageLocators.PLAYER_IN_SPAN).text.strip().replace(' ', '').replace('\'', '').split('+')
-                        min_in = int(min_plus_min_in[0])
-                        plus_min_in = int(min_plus_min_in[1]) if len(min_plus_min_in) > 1 else None
-                    except NoSuchElementException: pass
-                    try:
-                        min_plus_min_out = left_team_line.find_element(*GamePageLocators.PLAYER_OUT_SPAN).text.strip().replace(' ', '').replace('\'', '').split('+')
-                        min_out = int(min_plus_min_out[0])
-                        plus_min_out = int(min_plus_min_out[1]) if len(min_plus_min_out) > 1 else None
-                    except NoSuchElementException: pass
-                    
-                    
-                    player_lineup = PlayerLineup(player_id, min_in, plus_min_in, min_out, plus_min_out, saves)
-                    left_team_lineup.append(player_lineup)
-                    
-                el_right_team_lineup = self.driver.find_elements(*GamePageLocators.RIGHT_TEAM_LINEUP_TR)
-                for right_team_line in el_right_team_lineup:
-                    player_id = PlayerID(right_team_line.find_element(*GamePageLocators.PLAYER_LINEUP_HREF_A).get_attribute('href').strip().split('/')[-2])
-                    saves_str = right_team_line.find_element(*GamePageLocators.PLAYER_SAVES_TD).text.strip()
-                    saves = int(saves_str) if len(saves_str) > 0 else None
-                    min_in, plus_min_in, min_out, plus_min_out = None, None, None, None
-                    try:
-                        min_plus_min_in = right_team_line.find_element(*GamePageLocators.PLAYER_IN_SPAN).text.strip().replace(' ', '').replace('\'', '').split('+')
-                        min_in = int(min_plus_min_in[0])
-                        plus_min_in = int(min_plus_min_in[1]) if len(min_plus_min_in) > 1 else None
-                    except NoSuchElementException: pass
-                    try:
-                        min_plus_min_out = right_team_line.find_element(*GamePageLocators.PLAYER_OUT_SPAN).text.strip().replace(' ', '').replace('\'', '').split('+')
-                        min_out = int(min_plus_min_out[0])
-                        plus_min_out = int(min_plus_min_out[1]) if len(min_plus_min_out) > 1 else None
-                    except NoSuchElementException: pass
-                    
-                    
-                    player_lineup = PlayerLineup(player_id, min_in, plus_min_in, min_out, plus_min_out, saves)
-                    right_team_lineup.append(player_lineup)
-            except NoSuchElementException: pass
-            
-            # сбор информации о статистике матча
             try:
                 self.driver.find_element(*GamePageLocators.AUTOUPDATE_SELECT_OFF_OPTION).click() # отключаем обновление статистики
             except NoSuchElementException: pass
             
-            game_stats: list[GameStatPoint] = []
-            try:
-                el_game_stats = self.driver.find_elements(*GamePageLocators.STAT_DIV)
-                for game_stat in el_game_stats:
-                    left_team_stat = int(game_stat.find_element(*GamePageLocators.LEFT_TEAM_STAT).text)
-                    right_team_stat = int(game_stat.find_element(*GamePageLocators.RIGHT_TEAM_STAT).text)
-                    stat_name = game_stat.find_element(*GamePageLocators.STAT_TITLE).text.strip()
-                    
-                    game_stat_point = GameStatPoint(stat_name, left_team_stat, right_team_stat)
-                    game_stats.append(game_stat_point)
-            except NoSuchElementException: pass
+            return Game(**self._parse_sections(self.SECTIONS))
+        finally:
+            self.driver.close() # закрываем страницу
+            self.driver.switch_to.window(original_window) # возвращаемся на начальную страницу
+    
+    
+    def _parse_sections(self, names) -> dict:
+        """Поля Game из указанных разделов страницы"""
+        if self.bulk:
+            spec = {}
+            for name in names:
+                spec.update(GAME_EXTRACT_SPEC[name])
+            self.dom = extract_dom(self.driver, spec)
+        else:
+            self.dom = self.driver
+        fields = {}
+        for name in names:
+            fields.update(getattr(self, self.SECTIONS[name][1])())
+        return fields
+    
+    
+    def _parse_referee(self) -> dict:
+        # сбор информации о главном судье
+        referee = None
+        try:
+            el_a_referee = self.dom.find_element(*GamePageLocators.REFEREE_A)
+            referee_id = el_a_referee.get_attribute('href').strip().split('/')[-2]
+            first_last_referee_name = el_a_referee.text.strip().split(' ')
+            first_name_referee = first_last_referee_name[0]
+            last_name_referee = first_last_referee_name[1]
             
-            current_game_min = None
-            current_game_plus_min = None
-            is_played = None
-            try:
-                # добавить обработку времени игры
-                game_status = self.driver.find_element(*GamePageLocators.GAME_STATUS).text.strip().lower()
+            referee = Referee(id=referee_id, first_name=first_name_referee, last_name=last_name_referee)
+        except NoSuchElementException: pass
+        return {'referee': referee}
+    
+    
+    def _parse_coaches(self) -> dict:
+        left_coach_id = None
+        try:
+            left_coach_link = self.dom.find_element(*GamePageLocators.LEFT_COACH_A).get_attribute('href')
+            left_coach_id = CoachID(left_coach_link.strip().split('/')[-2])
+        except: pass
+        
+        right_coach_id = None
+        try:
+            right_coach_link = self.dom.find_element(*GamePageLocators.RIGHT_COACH_A).get_attribute('href')
+            right_coach_id = CoachID(right_coach_link.strip().split('/')[-2])
+        except: pass
+        return {'left_coach_id': left_coach_id, 'right_coach_id': right_coach_id}
+    
+    
+    def _parse_goals(self) -> dict:
+        # сбор информации о голах
+        left_team_goals: list[Goal] = []
+        right_team_goals: list[Goal] = []
+        try:
+            el_list_left_team_goals = self.dom.find_elements(*GamePageLocators.LEFT_TEAM_GOALS)
+            for left_team_goal in el_list_left_team_goals:
+                min_plus_min = left_team_goal.find_element(*GamePageLocators.MIN_PLUS_MIN_GOAL_DIV).get_attribute('data-minute').split('+')
+                min = int(min_plus_min[0])
+                plus_min = int(min_plus_min[1]) if len(min_plus_min) > 1 else None
+                player_id = PlayerID(left_team_goal.find_element(*GamePageLocators.PLAYER_GOAL_A).get_attribute('href').strip().split('/')[-2])
+                player_sub_id = None
+                try:
+                    player_sub_id = PlayerID(left_team_goal.find_element(*GamePageLocators.PLAYER_SUB_GOAL_A).get_attribute('href').strip().split('/')[-2])
+                except NoSuchElementException: pass
+                type = left_team_goal.find_element(*GamePageLocators.TYPE_GOAL_DIV).get_attribute('title')
+                
+                goal = Goal(min, plus_min, player_id, player_sub_id, type)
+                left_team_goals.append(goal)
+                
+            el_list_right_team_goals = self.dom.find_elements(*GamePageLocators.RIGHT_TEAM_GOALS)
+            for right_team_goal in el_list_right_team_goals:
+                
+                min_plus_min = right_team_goal.find_element(*GamePageLocators.MIN_PLUS_MIN_GOAL_DIV).get_attribute('data-minute').split('+')
+                min = int(min_plus_min[0])
+                plus_min = int(min_plus_min[1]) if len(min_plus_min) > 1 else None
                 
-                if 'окончен' in game_status: is_played = 1
-                elif 'не начался' in game_status: is_played = 0
-                elif 'перерыв' in game_status: is_played = 2
-                else:
-                    is_played = 3 # игра
-                    cur_min_plus_min = game_status.replace(' ', '').split(',')[1].replace('\'', '').split('+')
-                    current_game_min = int(cur_min_plus_min[0])
-                    current_game_plus_min = int(cur_min_plus_min[1]) if len(cur_min_plus_min) > 1 else None                
+                player_id = PlayerID(right_team_goal.find_element(*GamePageLocators.PLAYER_GOAL_A).get_attribute('href').strip().split('/')[-2])
+                player_sub_id = None
+                try:
+                    player_sub_id = PlayerID(right_team_goal.find_element(*GamePageLocators.PLAYER_SUB_GOAL_A).get_attribute('href').strip().split('/')[-2])
+                except NoSuchElementException: pass
+                type = right_team_goal.find_element(*GamePageLocators.TYPE_GOAL_DIV).get_attribute('title')
                 
-            except NoSuchElementException: print(f'Некорректная обработка времени игры is_played, href: {self.page_href}')
+                goal = Goal(min, plus_min, player_id, player_sub_id, type)
+                right_team_goals.append(goal)
             
-            return Game(referee=referee,
-                        left_coach_id=left_coach_id,
-                        right_coach_id=right_coach_id,
-                        left_team_goals=left_team_goals,
-                        right_team_goals=right_team_goals,
-                        left_team_penalties=left_team_penalties,
-                        right_team_penalties=right_team_penalties,
-                        left_team_lineup=left_team_lineup,
-                        right_team_lineup=right_team_lineup,
-                        game_stats=game_stats,
-                        cur_min=current_game_min,
-                        cur_plus_min=current_game_plus_min,
-                        is_played=is_played)
+        except NoSuchElementException: pass
+        return {'left_team_goals': left_team_goals, 'right_team_goals': right_team_goals}
+    
+    
+    def _parse_penalties(self) -> dict:
+        # сбор информации о наказаниях
+        left_team_penalties: list[Penalty] = []
+        right_team_penalties: list[Penalty] = []
+        try:
+            el_list_left_team_penalties = self.dom.find_elements(*GamePageLocators.LEFT_TEAM_PENALTIES)
+            for left_team_penalty in el_list_left_team_penalties:
+                min_plus_min = left_team_penalty.find_element(*GamePageLocators.MIN_PLUS_MIN_PYNALTY_DIV).text.strip().replace(' ', '').replace('\'', '').split('+')
+                min = int(min_plus_min[0])
+                plus_min = int(min_plus_min[1]) if len(min_plus_min) > 1 else None
+                
+                player_id = PlayerID(left_team_penalty.find_element(*GamePageLocators.PLAYER_PENALTY_A).get_attribute('href').strip().split('/')[-2])
+                type = left_team_penalty.find_element(*GamePageLocators.TYPE_PENALTY_SPAN).get_attribute('class').split(' ')[1].replace('_', '')
+                
+                penalty = Penalty(min, plus_min, player_id, type)
+                left_team_penalties.append(penalty)
+                
+            el_list_right_team_penalties = self.dom.find_elements(*GamePageLocators.RIGHT_TEAM_PENALTIES)
+            for right_team_penalty in el_list_right_team_penalties:
+                min_plus_min = right_team_penalty.find_element(*GamePageLocators.MIN_PLUS_MIN_PYNALTY_DIV).text.strip().replace(' ', '').replace('\'', '').split('+')
+                min = int(min_plus_min[0])
+                plus_min = int(min_plus_min[1]) if len(min_plus_min) > 1 else None
+                
+                player_id = PlayerID(right_team_penalty.find_element(*GamePageLocators.PLAYER_PENALTY_A).get_attribute('href').strip().split('/')[-2])
+                type = right_team_penalty.find_element(*GamePageLocators.TYPE_PENALTY_SPAN).get_attribute('class').split(' ')[1].replace('_', '')
+                
+                penalty = Penalty(min, plus_min, player_id, type)
+                right_team_penalties.append(penalty)
+        except NoSuchElementException: pass
+        return {'left_team_penalties': left_team_penalties, 'right_team_penalties': right_team_penalties}
+    
+    
+    def _parse_lineups(self) -> dict:
+        # сбор информации о составе
+        left_team_lineup: list[PlayerLineup] = []
+        right_team_lineup: list[PlayerLineup] = []
+        try:
+            el_left_team_lineup = self.dom.find_elements(*GamePageLocators.LEFT_TEAM_LINEUP_TR)
+            for left_team_line in el_left_team_lineup:
+                player_id = PlayerID(left_team_line.find_element(*GamePageLocators.PLAYER_LINEUP_HREF_A).get_attribute('href').strip().split('/')[-2])
+                saves_str = left_team_line.find_element(*GamePageLocators.PLAYER_SAVES_TD).text.strip()
+                saves = int(saves_str) if len(saves_str) > 0 else None
+                min_in, plus_min_in, min_out, plus_min_out = None, None, None, None
+                try:
+                    min_plus_min_in = left_team_line.find_element(*GamePageLocators.PLAYER_IN_SPAN).text.strip().replace(' ', '').replace('\'', '').split('+')
+                    min_in = int(min_plus_min_in[0])
+                    plus_min_in = int(min_plus_min_in[1]) if len(min_plus_min_in) > 1 else None
+                except NoSuchElementException: pass
+                try:
+                    min_plus_min_out = left_team_line.find_element(*GamePageLocators.PLAYER_OUT_SPAN).text.strip().replace(' ', '').replace('\'', '').split('+')
+                    min_out = int(min_plus_min_out[0])
+                    plus_min_out = int(min_plus_min_out[1]) if len(min_plus_min_out) > 1 else None
+                except NoSuchElementException: pass
+                
+                
+                player_lineup = PlayerLineup(player_id, min_in, plus_min_in, min_out, plus_min_out, saves)
+                left_team_lineup.append(player_lineup)
+                
+            el_right_team_lineup = self.dom.find_elements(*GamePageLocators.RIGHT_TEAM_LINEUP_TR)
+            for right_team_line in el_right_team_lineup:
+                player_id = PlayerID(right_team_line.find_element(*GamePageLocators.PLAYER_LINEUP_HREF_A).get_attribute('href').strip().split('/')[-2])
+                saves_str = right_team_line.find_element(*GamePageLocators.PLAYER_SAVES_TD).text.strip()
+                saves = int(saves_str) if len(saves_str) > 0 else None
+                min_in, plus_min_in, min_out, plus_min_out = None, None, None, None
+                try:
+                    min_plus_min_in = right_team_line.find_element(*GamePageLocators.PLAYER_IN_SPAN).text.strip().replace(' ', '').replace('\'', '').split('+')
+                    min_in = int(min_plus_min_in[0])
+                    plus_min_in = int(min_plus_min_in[1]) if len(min_plus_min_in) > 1 else None
+                except NoSuchElementException: pass
+                try:
+                    min_plus_min_out = right_team_line.find_element(*GamePageLocators.PLAYER_OUT_SPAN).text.strip().replace(' ', '').replace('\'', '').split('+')
+                    min_out = int(min_plus_min_out[0])
+                    plus_min_out = int(min_plus_min_out[1]) if len(min_plus_min_out) > 1 else None
+                except NoSuchElementException: pass
+                
+                
+                player_lineup = PlayerLineup(player_id, min_in, plus_min_in, min_out, plus_min_out, saves)
+                right_team_lineup.append(player_lineup)
+        except NoSuchElementException: pass
+        return {'left_team_lineup': left_team_lineup, 'right_team_lineup': right_team_lineup}
+    
+    
+    def _parse_stats(self) -> dict:
+        # сбор информации о статистике матча
+        game_stats: list[GameStatPoint] = []
+        try:
+            el_game_stats = self.dom.find_elements(*GamePageLocators.STAT_DIV)
+            for game_stat in el_game_stats:
+                left_team_stat = int(game_stat.find_element(*GamePageLocators.LEFT_TEAM_STAT).text)
+                right_team_stat = int(game_stat.find_element(*GamePageLocators.RIGHT_TEAM_STAT).text)
+                stat_name = game_stat.find_element(*GamePageLocators.STAT_TITLE).text.strip()
+                
+                game_stat_point = GameStatPoint(stat_name, left_team_stat, right_team_stat)
+                game_stats.append(game_stat_point)
+        except NoSuchElementException: pass
+        return {'game_stats': game_stats}
+    
+    
+    def _parse_status(self) -> dict:
+        current_game_min = None
+        current_game_plus_min = None
+        is_played = None
+        try:
+            # добавить обработку времени игры
+            game_status = self.dom.find_element(*GamePageLocators.GAME_STATUS).text.strip().lower()
+            
+            if 'окончен' in game_status: is_played = 1
+            elif 'не начался' in game_status: is_played = 0
+            elif 'перерыв' in game_status: is_played = 2
+            else:
+                is_played = 3 # игра
+                cur_min_plus_min = game_status.replace(' ', '').split(',')[1].replace('\'', '').split('+')
+                current_game_min = int(cur_min_plus_min[0])
+                current_game_plus_min = int(cur_min_plus_min[1]) if len(cur_min_plus_min) > 1 else None                
+            
+        except NoSuchElementException: print(f'Некорректная обработка времени игры is_played, href: {self.page_href}')
+        return {'cur_min': current_game_min, 'cur_plus_min': current_game_plus_min, 'is_played': is_played}
+
+
+class GamePageWatcher(GamePage):
+    """Страница идущей игры в постоянно открытой вкладке
+
+    Вкладка открывается один раз, автообновление статистики на сайте остается включенным.
+    На каждом опросе отпечатки разделов страницы сравниваются с предыдущими, заново разбираются
+    только изменившиеся разделы, а снимок Game возвращается только при изменении хотя бы одного раздела.
+    Если страница не менялась дольше stale_after_s, вкладка перезагружается (автообновление могло остановиться).
+    """
+
+    def __init__(self, driver, page_href, stale_after_s: float = 180):
+        super().__init__(driver, page_href)
+        self.stale_after_s = stale_after_s
+        self.window_handle = None
+        self._fingerprints: dict[str, str] = {}
+        self._fields: dict = {}
+        self._changed_at = None
+        self.polls = self.snapshots = self.reloads = 0
+        
+    
+    def open(self):
+        """Открытие страницы игры в новой вкладке"""
+        self.driver.switch_to.new_window('tab')
+        self.window_handle = self.driver.current_window_handle
+        try:
+            self.go_to_page()
+        except BaseException:
+            self.close()
+            raise
+        self._fingerprints = {}
+        self._changed_at = perf_counter()
+    
+    
+    def invalidate(self):
+        """Следующий опрос вернет полный снимок (например, если предыдущий снимок не удалось сохранить)"""
+        self._fingerprints = {}
+    
+    
+    def poll(self) -> Game | None:
+        """Снимок игры, если страница изменилась с предыдущего опроса, иначе None"""
+        if self.window_handle is None:
+            self.open()
+        self.driver.switch_to.window(self.window_handle)
+        if perf_counter() - self._changed_at > self.stale_after_s:
+            self.driver.refresh()
+            self.reloads += 1
+            self._changed_at = perf_counter()
+        
+        self.polls += 1
+        fingerprints = self.driver.execute_script(SECTION_FINGERPRINT_SCRIPT,
+                                                  {name: locator[1] for name, (locator, _) in self.SECTIONS.items()})
+        changed = [name for name in self.SECTIONS if fingerprints.get(name) != self._fingerprints.get(name)]
+        if not changed:
+            return None
+        
+        self._fields.update(self._parse_sections(changed))
+        self._fingerprints = fingerprints
+        self._changed_at = perf_counter()
+        self.snapshots += 1
+        return Game(**self._fields)
+    
+    
+    def close(self):
+        """Закрытие вкладки игры"""
+        if self.window_handle is None: return
+        try:
+            self.driver.switch_to.window(self.window_handle)
+            self.driver.close()
+            if self.driver.window_handles:
+                self.driver.switch_to.window(self.driver.window_handles[0])
         finally:
-            self.driver.close() # закрываем страницу
-            self.driver.switch_to.window(original_window) # возвращаемся на начальную страницу   
-      
\ No newline at end of file
+            self.window_handle = None
@@ -0,0 +1,461 @@
+import numpy as np
+import pandas as pd
+
+from collection.features import FEATURE_COLUMNS, FLOAT_FEATURE_COLUMNS
+
+
+# Основание ключа времени события: min * TIME_KEY_BASE + plus_min
+# (добавленное время не превышает TIME_KEY_BASE минут)
+TIME_KEY_BASE = 1000
+
+# Значение преимущества в стоимости при нулевой стоимости соперника
+TRANSFER_VALUE_DIV_DEFAULT = 9999
+
+# Соответствие суффикса признака названию амплуа
+AMPLUA_FEATURES = (
+    ('v', 'вратарь'),
+    ('z', 'защитник'),
+    ('p', 'полузащитник'),
+    ('n', 'нападающий'),
+    ('u', 'неизвестно'),
+)
+
+# Соответствие суффикса признака названию типа гола
+GOAL_TYPE_FEATURES = (
+    ('g', 'гол'),
+    ('p', 'пенальти'),
+    ('a', 'автогол'),
+)
+
+YELLOW_PENALTY_NAMES = ('yellow',)
+Y2R_PENALTY_NAMES = ('yellow2', 'red')
+
+# Минуты окончания таймов (после них идет добавленное время) и статусы незавершенного матча (перерыв, игра)
+HALF_END_MINUTES = (45, 90)
+LIVE_GAME_STATUS_IDS = (2, 3)
+
+# Столбцы состояния матча: время события, признаки (collection.features) и игра
+MATCH_STATE_COLUMNS = [
+    'min',
+    'plus_min',
+    *FEATURE_COLUMNS,
+    'game_id',
+]
+
+# Вещественные признаки состояния матча (остальные - целочисленные)
+MATCH_STATE_FLOAT_COLUMNS = FLOAT_FEATURE_COLUMNS
+
+# Компактное представление состояний матча: структурированный массив NumPy с фиксированной схемой
+# (одна строка - одно состояние, весь матч - один массив)
+MATCH_STATE_DTYPE = np.dtype([
+    (name, np.float64 if name in MATCH_STATE_FLOAT_COLUMNS else np.int64) for name in MATCH_STATE_COLUMNS
+])
+
+
+def empty_match_states(n: int = 0) -> np.ndarray:
+    """Массив состояний матча длины n (MATCH_STATE_DTYPE)"""
+    return np.zeros(n, dtype=MATCH_STATE_DTYPE)
+
+
+def to_match_states(states) -> np.ndarray:
+    """Перевод состояний матча (pd.DataFrame или структурированный массив) в MATCH_STATE_DTYPE"""
+    if isinstance(states, np.ndarray) and states.dtype == MATCH_STATE_DTYPE: return states
+    res = empty_match_states(len(states))
+    for name in MATCH_STATE_COLUMNS:
+        res[name] = np.asarray(states[name], dtype=MATCH_STATE_DTYPE[name])
+    return res
+
+
+def match_states_frame(states: np.ndarray) -> pd.DataFrame:
+    """Состояния матча в виде pd.DataFrame (столбцы MATCH_STATE_COLUMNS)"""
+    return pd.DataFrame(states, columns=MATCH_STATE_COLUMNS)
+
+
+def time_key(min, plus_min) -> np.ndarray:
+    """Перевод времени события (min, plus_min) в единый упорядочиваемый ключ
+
+    Args:
+        min: Минута события (NaN - время неизвестно)
+        plus_min: Добавленная минута события
+
+    Returns:
+        np.ndarray: Ключи времени (NaN сохраняется)
+    """
+    min = np.asarray(min, dtype=np.float64)
+    plus_min = np.asarray(plus_min, dtype=np.float64)
+    return min * TIME_KEY_BASE + plus_min
+
+
+def split_time_key(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Обратное преобразование ключа времени в (min, plus_min)"""
+    keys = np.asarray(keys, dtype=np.int64)
+    return keys // TIME_KEY_BASE, keys % TIME_KEY_BASE
+
+
+def to_float(values, fill_value: float = None) -> np.ndarray:
+    """Перевод значений в массив float64 с заполнением пропусков fill_value"""
+    values = np.array(values, dtype=np.float64) # копия: массивы изменяются на месте
+    if fill_value is None: return values
+    return np.where(np.isnan(values), fill_value, values)
+
+
+def name_mask(names: np.ndarray, allowed_names: tuple) -> np.ndarray:
+    """Маска записей, название которых входит в allowed_names (NaN не входит)"""
+    return np.logical_or.reduce([names == name for name in allowed_names] + [np.zeros(len(names), dtype=bool)])
+
+
+def count_until(event_keys: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Количество записей, произошедших не позже каждого события (NaN не учитываются)"""
+    return np.searchsorted(np.sort(keys), event_keys, side='right')
+
+
+def interval_sums(in_keys: np.ndarray,
+                  out_keys: np.ndarray,
+                  weights: np.ndarray,
+                  event_keys: np.ndarray) -> np.ndarray:
+    """Суммы весов записей, активных в момент каждого события
+
+    Запись активна в момент t, если in_key <= t < out_key.
+    Вычисляется разностью накопленных сумм по отсортированным началам и концам интервалов.
+
+    Args:
+        in_keys (np.ndarray): Ключи начала интервалов (P)
+        out_keys (np.ndarray): Ключи окончания интервалов (P), inf - интервал не закрыт
+        weights (np.ndarray): Веса записей (P x C)
+        event_keys (np.ndarray): Ключи событий (E)
+
+    Returns:
+        np.ndarray: Суммы весов активных записей (E x C)
+    """
+    # пустые интервалы (окончание не позже начала) никогда не активны
+    valid = in_keys < out_keys
+    in_keys, out_keys, weights = in_keys[valid], out_keys[valid], weights[valid]
+
+    zero_row = np.zeros((1, weights.shape[1]), dtype=np.float64)
+    in_order = np.argsort(in_keys, kind='stable')
+    out_order = np.argsort(out_keys, kind='stable')
+    cum_in = np.vstack([zero_row, np.cumsum(weights[in_order], axis=0)])
+    cum_out = np.vstack([zero_row, np.cumsum(weights[out_order], axis=0)])
+
+    idx_in = np.searchsorted(in_keys[in_order], event_keys, side='right')
+    idx_out = np.searchsorted(out_keys[out_order], event_keys, side='right')
+    return cum_in[idx_in] - cum_out[idx_out]
+
+
+def dense_time_keys(observed_keys: np.ndarray, end_key: float) -> np.ndarray:
+    """Ключи времени каждой минуты матча не позже end_key
+
+    Добавленное время тайма продолжается до наибольшей добавленной минуты,
+    встречающейся среди observed_keys в минуте окончания тайма.
+
+    Args:
+        observed_keys (np.ndarray): Ключи времени всех известных событий матча (NaN и inf не учитываются)
+        end_key (float): Ключ времени окончания сетки (текущее время для идущего матча)
+
+    Returns:
+        np.ndarray: Отсортированные ключи времени минутной сетки
+    """
+    observed_keys = observed_keys[np.isfinite(observed_keys)]
+    observed_min, observed_plus_min = split_time_key(observed_keys)
+    last_min = max(HALF_END_MINUTES[-1], int(observed_min.max(initial=0)))
+    parts = [np.arange(last_min + 1) * TIME_KEY_BASE]
+    for half_end_min in HALF_END_MINUTES:
+        stoppage = int(observed_plus_min[observed_min == half_end_min].max(initial=0))
+        parts.append(half_end_min * TIME_KEY_BASE + np.arange(1, stoppage + 1))
+    keys = np.unique(np.concatenate(parts).astype(np.float64))
+    return keys[keys <= end_key]
+
+
+class TeamArrays:
+    """Массивы событий одной команды, подготовленные для расчета состояний матча"""
+
+    def __init__(self,
+                 goal_keys: np.ndarray,
+                 goal_type_names: np.ndarray,
+                 penalty_keys: np.ndarray,
+                 penalty_type_names: np.ndarray,
+                 lineup_in_keys: np.ndarray,
+                 lineup_out_keys: np.ndarray,
+                 lineup_min_in: np.ndarray,
+                 lineup_amplua_names: np.ndarray,
+                 lineup_transfer_value: np.ndarray,
+                 out_event_keys: np.ndarray):
+        self.goal_keys = goal_keys
+        self.goal_type_names = goal_type_names
+        self.penalty_keys = penalty_keys
+        self.penalty_type_names = penalty_type_names
+        self.lineup_in_keys = lineup_in_keys
+        self.lineup_out_keys = lineup_out_keys
+        self.lineup_min_in = lineup_min_in
+        self.lineup_amplua_names = lineup_amplua_names
+        self.lineup_transfer_value = lineup_transfer_value
+        self.out_event_keys = out_event_keys
+
+
+def prepare_team_arrays(team_id: str,
+                        df_goal: pd.DataFrame,
+                        df_goal_type: pd.DataFrame,
+                        df_penalty: pd.DataFrame,
+                        df_penalty_type: pd.DataFrame,
+                        df_lineup: pd.DataFrame,
+                        game_player_stat_amplua: pd.DataFrame) -> TeamArrays:
+    """Подготовка массивов событий команды (единожды на матч)"""
+
+    goals_df = df_goal.loc[df_goal['team_id'] == team_id]
+    goal_type_names = goals_df['goal_type_id'].map(df_goal_type.set_index('goal_type_id')['name'])
+    goal_keys = time_key(goals_df['min'], to_float(goals_df['plus_min'], 0))
+
+    penalty_df = df_penalty.loc[df_penalty['team_id'] == team_id]
+    penalty_type_names = penalty_df['penalty_type_id'].map(df_penalty_type.set_index('penalty_type_id')['name'])
+    penalty_plus_min = to_float(penalty_df['plus_min'], 0)
+    penalty_keys = time_key(penalty_df['min'], penalty_plus_min)
+
+    lineup_df = df_lineup.loc[df_lineup['team_id'] == team_id]
+    lineup_df = lineup_df.join(game_player_stat_amplua.set_index('player_id'), 'player_id')
+    min_in = to_float(lineup_df['min_in'], 0)
+    plus_min_in = to_float(lineup_df['plus_min_in'], 0)
+    min_out = to_float(lineup_df['min_out'])
+    # добавленное время ухода заполняется только для замененных игроков
+    plus_min_out = to_float(lineup_df['plus_min_out'])
+    plus_min_out = np.where(np.isnan(min_out), plus_min_out, to_float(plus_min_out, 0))
+
+    # время ухода с поля игроков, получивших yellow2 или red (последнее наказание игрока приоритетнее)
+    y2r_mask = penalty_type_names.isin(Y2R_PENALTY_NAMES).to_numpy()
+    if y2r_mask.any():
+        y2r_df = pd.DataFrame({
+            'player_id': penalty_df['player_id'].to_numpy()[y2r_mask],
+            'min': to_float(penalty_df['min'])[y2r_mask],
+            'plus_min': penalty_plus_min[y2r_mask],
+        }).drop_duplicates('player_id', keep='last').set_index('player_id')
+        player_ids = lineup_df['player_id']
+        removed = player_ids.isin(y2r_df.index).to_numpy()
+        min_out[removed] = player_ids[removed].map(y2r_df['min']).to_numpy(dtype=np.float64)
+        plus_min_out[removed] = player_ids[removed].map(y2r_df['plus_min']).to_numpy(dtype=np.float64)
+
+    out_keys = time_key(min_out, plus_min_out)
+    out_event_keys = out_keys[~np.isnan(min_out)]
+    out_keys = np.where(np.isnan(out_keys), np.inf, out_keys) # не покидавшие поле игроки
+
+    return TeamArrays(goal_keys=goal_keys,
+                      goal_type_names=goal_type_names.to_numpy(dtype=object),
+                      penalty_keys=penalty_keys,
+                      penalty_type_names=penalty_type_names.to_numpy(dtype=object),
+                      lineup_in_keys=time_key(min_in, plus_min_in),
+                      lineup_out_keys=out_keys,
+                      lineup_min_in=min_in,
+                      lineup_amplua_names=lineup_df['name'].to_numpy(dtype=object),
+                      lineup_transfer_value=to_float(lineup_df['transfer_value']),
+                      out_event_keys=out_event_keys)
+
+
+def team_state_features(team: TeamArrays, event_keys: np.ndarray, event_min: np.ndarray) -> dict[str, np.ndarray]:
+    """Признаки состояния команды для всех событий матча за один проход"""
+
+    features = {}
+
+    features['goal_score'] = count_until(event_keys, team.goal_keys)
+    for suffix, goal_type_name in GOAL_TYPE_FEATURES:
+        features[f'num_goal_{suffix}'] = count_until(event_keys, team.goal_keys[team.goal_type_names == goal_type_name])
+
+    features['num_y'] = count_until(event_keys, team.penalty_keys[name_mask(team.penalty_type_names, YELLOW_PENALTY_NAMES)])
+    features['num_y2r'] = count_until(event_keys, team.penalty_keys[name_mask(team.penalty_type_names, Y2R_PENALTY_NAMES)])
+
+    # веса игроков: индикаторы амплуа, количество, стоимость, время выхода на поле
+    transfer_value_known = ~np.isnan(team.lineup_transfer_value)
+    weights = np.column_stack(
+        [team.lineup_amplua_names == amplua_name for _, amplua_name in AMPLUA_FEATURES] +
+        [np.ones(len(team.lineup_in_keys)),
+         transfer_value_known,
+         np.where(transfer_value_known, team.lineup_transfer_value, 0),
+         team.lineup_min_in]
+    ).astype(np.float64)
+    sums = interval_sums(team.lineup_in_keys, team.lineup_out_keys, weights, event_keys)
+
+    for i, (suffix, _) in enumerate(AMPLUA_FEATURES):
+        features[f'num_{suffix}'] = sums[:, i].astype(np.int64)
+    num_players, num_transfer_value, total_transfer_value, total_min_in = sums[:, len(AMPLUA_FEATURES):].T
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        features['total_transfer_value'] = total_transfer_value
+        features['avg_transfer_value'] = np.where(num_transfer_value > 0, total_transfer_value / num_transfer_value, np.nan)
+        # средняя продолжительность нахождения на поле (без учета дополнительного времени)
+        features['avg_time_player_in_game'] = np.where(num_players > 0, (num_players * event_min - total_min_in) / num_players, np.nan)
+
+    return features
+
+
+def event_source_keys(*teams: TeamArrays) -> list[np.ndarray]:
+    """Отсортированные ключи времени исходных событий матча по командам: голы, наказания, выходы и уходы игроков"""
+    return [np.sort(keys[~np.isnan(keys)]) for team in teams
+            for keys in (team.goal_keys, team.penalty_keys, team.lineup_in_keys, team.out_event_keys)]
+
+
+def first_changed_key(old_keys: np.ndarray, new_keys: np.ndarray) -> float:
+    """Наименьший ключ, которым различаются отсортированные массивы ключей (np.inf, если массивы совпадают)"""
+    n = min(len(old_keys), len(new_keys))
+    diff = np.flatnonzero(old_keys[:n] != new_keys[:n])
+    if len(diff): return float(min(old_keys[diff[0]], new_keys[diff[0]]))
+    if len(old_keys) != len(new_keys): return float((old_keys if len(old_keys) > n else new_keys)[n])
+    return np.inf
+
+
+class MatchCheckpoint:
+    """Контрольная точка симуляции матча: уже рассчитанные события и исходные события, по которым они рассчитаны
+
+    Инкрементальна только генерация строк: данные матча загружаются и подготавливаются целиком,
+    а рассчитываются только новые события и события, начиная с самого раннего поздно поступившего
+    или измененного исходного события (гола, наказания, замены).
+    """
+
+    def __init__(self, game_id: int, event_keys: np.ndarray = None):
+        self.game_id = game_id
+        self.event_keys = np.unique(np.asarray([] if event_keys is None else event_keys, dtype=np.float64))
+        # исходные события рассчитанных состояний (None - неизвестны: контрольная точка восстановлена из БД)
+        self.source_keys: list[np.ndarray] | None = None
+        # исходные события последней симуляции, принимаются в update после сохранения ее состояний
+        self.pending_source_keys: list[np.ndarray] | None = None
+
+    @classmethod
+    def from_event_times(cls, game_id: int, event_times: list[tuple[int, int]]) -> 'MatchCheckpoint':
+        """Восстановление контрольной точки по сохраненным временам событий (min, plus_min)"""
+        event_times = list(event_times)
+        return cls(game_id, time_key([e[0] for e in event_times], [e[1] for e in event_times]))
+
+    @property
+    def last_time(self) -> tuple[int, int] | None:
+        """Время (min, plus_min) последнего рассчитанного события"""
+        if len(self.event_keys) == 0: return None
+        min, plus_min = split_time_key(self.event_keys[-1:])
+        return int(min[0]), int(plus_min[0])
+
+    def recompute_from(self, source_keys: list[np.ndarray]) -> float:
+        """Ключ, начиная с которого рассчитанные состояния устарели (-np.inf, если исходные события неизвестны)"""
+        if self.source_keys is None: return -np.inf
+        return min((first_changed_key(old_keys, new_keys) for old_keys, new_keys in zip(self.source_keys, source_keys)), default=np.inf)
+
+    def update(self, states):
+        """Добавление рассчитанных состояний матча (структурированный массив или pd.DataFrame)"""
+        if len(states) > 0:
+            states = to_match_states(states)
+            self.event_keys = np.union1d(self.event_keys, time_key(states['min'], states['plus_min']))
+        if self.pending_source_keys is not None:
+            self.source_keys, self.pending_source_keys = self.pending_source_keys, None
+
+
+def simulate_timeline(*args, **kwargs) -> pd.DataFrame:
+    """Векторизованная симуляция матча в виде pd.DataFrame (аргументы simulate_match_states)"""
+    return match_states_frame(simulate_match_states(*args, **kwargs))
+
+
+def simulate_match_states(df_game: pd.DataFrame,
+                          df_referee_game: pd.DataFrame,
+                          df_goal: pd.DataFrame,
+                          df_goal_type: pd.DataFrame,
+                          df_lineup: pd.DataFrame,
+                          df_penalty: pd.DataFrame,
+                          df_penalty_type: pd.DataFrame,
+                          game_player_stat_amplua: pd.DataFrame,
+                          time_events: set = None,
+                          checkpoint: MatchCheckpoint = None,
+                          dense: bool = False) -> np.ndarray:
+    """Векторизованная симуляция матча: состояние матча на каждое событие за один проход
+
+    События сортируются единожды, признаки вычисляются через searchsorted и накопленные суммы
+    по интервалам нахождения игроков на поле.
+
+    Args:
+        df_game (pd.DataFrame): Матч
+        df_referee_game (pd.DataFrame): Главный судья матча
+        df_goal (pd.DataFrame): Голы матча
+        df_goal_type (pd.DataFrame): Типы голов
+        df_lineup (pd.DataFrame): Составы команд
+        df_penalty (pd.DataFrame): Наказания матча
+        df_penalty_type (pd.DataFrame): Типы наказаний
+        game_player_stat_amplua (pd.DataFrame): Амплуа и стоимость игроков матча
+        time_events (set, optional): Заданное множество событий (min, plus_min). По умолчанию вычисляется по наказаниям и заменам.
+        checkpoint (MatchCheckpoint, optional): Контрольная точка - события из нее повторно не рассчитываются,
+            кроме событий не раньше самого раннего поздно поступившего или измененного исходного события.
+        dense (bool, optional): Дополнительно рассчитать состояние на каждую минуту матча, включая добавленное время
+            (для идущего матча - до текущей минуты). По умолчанию False.
+
+    Returns:
+        np.ndarray: Состояния матча, упорядоченные по времени события (MATCH_STATE_DTYPE)
+    """
+    game_id = int(df_game['game_id'].item()) # Уникальный идентификатор иргы
+    left_team_id = str(df_game['left_team_id'].item())
+    right_team_id = str(df_game['right_team_id'].item())
+    left_coach_id = int(df_game['left_coach_id'].item())
+    right_coach_id = int(df_game['right_coach_id'].item())
+    referee_id = int(df_game[['game_id']].join(df_referee_game.set_index('game_id'), 'game_id')['referee_id'].item())
+
+    df_goal = df_goal.loc[df_goal['game_id'] == game_id]
+    df_penalty = df_penalty.loc[df_penalty['game_id'] == game_id]
+    df_lineup = df_lineup.loc[df_lineup['game_id'] == game_id]
+
+    left = prepare_team_arrays(left_team_id, df_goal, df_goal_type, df_penalty, df_penalty_type, df_lineup, game_player_stat_amplua)
+    right = prepare_team_arrays(right_team_id, df_goal, df_goal_type, df_penalty, df_penalty_type, df_lineup, game_player_stat_amplua)
+
+    # текущее время матча (известно для идущего матча)
+    game_time_key = time_key(df_game['min'] if 'min' in df_game else [np.nan], to_float(df_game['plus_min'] if 'plus_min' in df_game else [np.nan], 0))
+    is_live = 'game_status_id' in df_game and int(df_game['game_status_id'].item()) in LIVE_GAME_STATUS_IDS and not np.isnan(game_time_key[0])
+
+    if time_events is None:
+        # начальное состояние матча, наказания и уходы игроков с поля
+        event_keys = np.concatenate([
+            [0.0],
+            left.penalty_keys, right.penalty_keys,
+            left.out_event_keys, right.out_event_keys,
+        ])
+    else:
+        event_keys = time_key([int(e[0]) for e in time_events], [int(e[1]) for e in time_events])
+    if dense:
+        observed_keys = np.concatenate([
+            event_keys,
+            left.goal_keys, right.goal_keys,
+            left.penalty_keys, right.penalty_keys,
+            left.lineup_in_keys, right.lineup_in_keys,
+            left.out_event_keys, right.out_event_keys,
+            game_time_key,
+        ])
+        end_key = game_time_key[0] if is_live else max(HALF_END_MINUTES[-1] * TIME_KEY_BASE, np.nanmax(observed_keys[np.isfinite(observed_keys)], initial=0))
+        event_keys = np.concatenate([event_keys, dense_time_keys(observed_keys, end_key)])
+    event_keys = np.unique(event_keys[~np.isnan(event_keys)])
+    if checkpoint is not None:
+        source_keys = event_source_keys(left, right)
+        recompute_from = checkpoint.recompute_from(source_keys)
+        event_keys = event_keys[(event_keys >= recompute_from) | ~np.isin(event_keys, checkpoint.event_keys)]
+        checkpoint.pending_source_keys = source_keys
+    event_min, event_plus_min = split_time_key(event_keys)
+
+    left_features = team_state_features(left, event_keys, event_min)
+    right_features = team_state_features(right, event_keys, event_min)
+
+    left_total = left_features['total_transfer_value']
+    right_total = right_features['total_transfer_value']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        left_right_div = np.where(right_total > 0, left_total / right_total, TRANSFER_VALUE_DIV_DEFAULT)
+        right_left_div = np.where(left_total > 0, right_total / left_total, TRANSFER_VALUE_DIV_DEFAULT)
+
+    left_score, right_score = left_features['goal_score'], right_features['goal_score']
+    res_event = np.select([left_score > right_score, left_score < right_score], [1, 2], default=0)
+
+    states = empty_match_states(len(event_keys))
+    states['min'] = event_min
+    states['plus_min'] = event_plus_min
+    states['left_coach_id'] = left_coach_id
+    states['right_coach_id'] = right_coach_id
+    states['referee_id'] = referee_id
+    for side, features in (('left', left_features), ('right', right_features)):
+        for name, values in features.items():
+            states[f'{side}_{name}'] = values
+    states['left_right_transfer_value_div'] = left_right_div
+    states['right_left_transfer_value_div'] = right_left_div
+    states['res_event'] = res_event
+    states['game_id'] = game_id
+
+    return states
+
+
+def simulate_match_bundle(match_frames: dict[str, pd.DataFrame], dense: bool = False) -> np.ndarray:
+    """Симуляция матча по набору данных get_match_bundle (точка входа для пула процессов)"""
+    return simulate_match_states(**match_frames, dense=dense)
@@ -7,10 +7,17 @@ project_root = os.path.abspath(os.path.join(current_dir, '..'))
 # Добавляем корень проекта в пути поиска модулей
 sys.path.append(project_root)
 
+from time import perf_counter
+import numpy as np
 import pandas as pd
-from collection.browser import BrowserConnection, AsyncBrowserConnection
+from collection.browser import BrowserConnection, AsyncBrowserConnection, AsyncBrowserPool
+from collection.watcher import LiveGameWatchers
 from collection.pages import *
+from collection.simulation import simulate_match_states, simulate_match_bundle, empty_match_states, MatchCheckpoint
+from collection.features import FEATURE_COLUMNS
+from concurrent.futures import ProcessPoolExecutor
 from db.queries.core import AsyncCore as AC
+from db.config import settings
 import asyncio
 
 
@@ -57,7 +64,8 @@ async def insert_unknown_season_player_into_db(season_id: str, unknown_season_pl
     async with AsyncBrowserConnection() as br:
         for player_id in unknown_season_player:
             pp = PlayerPage(br, PlayerPage.get_page_link(season_id=season_id, player_id=player_id))
-            player_info: Player = pp.get_info()
+            # страницы игроков открываются по очереди в одной вкладке
+            player_info: Player = await asyncio.to_thread(pp.get_info_in_current_tab)
             await AC.Player.update_player_data(player_id=player_id,
                                                 first_name=player_info.first_name,
                                                 last_name=player_info.last_name,
@@ -351,9 +359,9 @@ async def check_season_id_in_db(first_season:str = '2016/2017') -> list[str]:
     # Список доступных сезонов
     all_season_list = []
     async with AsyncBrowserConnection() as br:
-        season_page = SeasonPage(br)
+        season_page = await asyncio.to_thread(SeasonPage, br)
         # Получение списка доступных сезонов
-        all_season_list = season_page.get_season_list_options()
+        all_season_list = await asyncio.to_thread(season_page.get_season_list_options)
         
     # Список с рассматриваемыми сезонами
     considered_season_list = []
@@ -367,19 +375,21 @@ async def check_season_id_in_db(first_season:str = '2016/2017') -> list[str]:
     pending_season_list = []
     async with AsyncBrowserConnection() as br:
         for season in considered_season_list:
-                season_page = SeasonPage(br)
-                season_page.go_to_season(season)
-                season_id = season_page.get_info(only_info=True).id
+                season_page = await asyncio.to_thread(SeasonPage, br)
+                await asyncio.to_thread(season_page.go_to_season, season)
+                season_id = (await asyncio.to_thread(season_page.get_info, only_info=True)).id
                 if not await AC.Season.is_season_id_exist(season_id=season_id):
                     pending_season_list.append(season_id)
     return pending_season_list
 
 
-async def insert_season_into_db(season_id: str):
+async def insert_season_into_db(season_id: str, bulk: bool = True):
     """Занесения всей информации сезона в базу данных
 
     Args:
         season_id (str): Идентификатор сезона
+        bulk (bool, optional): Извлечение страниц одним вызовом execute_script на страницу,
+            страницы тренеров и игроков во вкладке команды (см. TeamPage)
     """
     
     # Полная ссылка на рассматриваемый сезон
@@ -387,14 +397,19 @@ async def insert_season_into_db(season_id: str):
     
     count_attempt = 0
     max_count_attempt = 50
-    try:
-        while count_attempt < max_count_attempt:
+    start = perf_counter()
+    while True:
+        try:
             async with AsyncBrowserConnection() as br:
-                season_page = SeasonPage(br, page_href=season_page_link)
-                season: Season = season_page.get_info()
-    except Exception as e:
-        print(f'\nПопытка#{count_attempt}\nИсключение: {e}\n')
-        count_attempt += 1
+                season_page = await asyncio.to_thread(SeasonPage, br, page_href=season_page_link, bulk=bulk)
+                season: Season = await asyncio.to_thread(season_page.get_info)
+            break
+        except Exception as e:
+            print(f'\nПопытка#{count_attempt}\nИсключение: {e}\n')
+            count_attempt += 1
+            if count_attempt >= max_count_attempt: raise
+    print(f'Сбор сезона {season_id} ({bulk=}): {perf_counter() - start:.1f} с, '
+          f'команд {len(season.teams)}, игроков {sum(len(team.players) for team in season.teams)}, игр {len(season.games)}')
     
     await AC.Season.insert_season(season_id=season.id,
                         start_date=season.start_date,
@@ -432,54 +447,51 @@ async def add_time_event(time_events: set,
             time_events.add((row[min_column_name], row[plus_min_column_name]))  
 
 
-async def simulate_match(game_id: int, time_events: set = None, is_event_exist: bool = False):
-    res_df = pd.DataFrame(columns=['min',
-                                'plus_min',
-                                'left_coach_id',
-                                'right_coach_id',
-                                'referee_id',
-                                'left_num_v',
-                                'left_num_z',
-                                'left_num_p',
-                                'left_num_n',
-                                'left_num_u',
-                                'right_num_v',
-                                'right_num_z',
-                                'right_num_p',
-                                'right_num_n',
-                                'right_num_u',
-                                'left_num_y',
-                                'left_num_y2r',
-                                'right_num_y',
-                                'right_num_y2r',
-                                'right_num_goal_g',
-                                'right_num_goal_p',
-                                'right_num_goal_a',
-                                'left_num_goal_g',
-                                'left_num_goal_p',
-                                'left_num_goal_a',
-                                'left_total_transfer_value',
-                                'right_total_transfer_value',
-                                'left_avg_transfer_value',
-                                'right_avg_transfer_value',
-                                'left_goal_score',
-                                'right_goal_score',
-                                'left_avg_time_player_in_game',
-                                'right_avg_time_player_in_game',
-                                'left_right_transfer_value_div',
-                                'right_left_transfer_value_div',
-                                'res_event'
-                                   ])
-    
-    df_game = await AC.TableToDataFrame.get_game_df(game_id=game_id)
-    df_referee_game = await AC.TableToDataFrame.get_referee_game_df(game_id=game_id)
-    df_goal = await AC.TableToDataFrame.get_goal_df(game_id=game_id)
-    df_goal_type = await AC.TableToDataFrame.get_goal_type_df()
-    df_lineup = await AC.TableToDataFrame.get_lineup_df(game_id=game_id)
-    df_penalty = await AC.TableToDataFrame.get_penalty_df(game_id=game_id)
-    df_penalty_type = await AC.TableToDataFrame.get_penalty_type_df()
-    game_player_stat_amplua = await AC.TableToDataFrame.get_lineup_player_stat_for_game(game_id=game_id) # Получаем информацию о игроках, учавствующих в данной игре (амплуа)
-    
+async def get_match_frames(game_id: int) -> dict[str, pd.DataFrame]:
+    """Загрузка наборов данных, необходимых для симуляции матча, за один запрос к БД
+
+    Args:
+        game_id (int): Уникальный идентификатор игры
+
+    Returns:
+        dict[str, pd.DataFrame]: Наборы данных в виде именованных аргументов simulate_match_states
+    """
+    return await AC.TableToDataFrame.get_match_bundle(game_id=game_id)
+
+
+async def get_match_frames_sequential(game_id: int) -> dict[str, pd.DataFrame]:
+    """Загрузка наборов данных, необходимых для симуляции матча, последовательными запросами (эталонный путь)
+
+    Args:
+        game_id (int): Уникальный идентификатор игры
+
+    Returns:
+        dict[str, pd.DataFrame]: Наборы данных в виде именованных аргументов simulate_match_states
+    """
+    return {
+        'df_game': await AC.TableToDataFrame.get_game_df(game_id=game_id),
+        'df_referee_game': await AC.TableToDataFrame.get_referee_game_df(game_id=game_id),
+        'df_goal': await AC.TableToDataFrame.get_goal_df(game_id=game_id),
+        'df_goal_type': await AC.TableToDataFrame.get_goal_type_df(),
+        'df_lineup': await AC.TableToDataFrame.get_lineup_df(game_id=game_id),
+        'df_penalty': await AC.TableToDataFrame.get_penalty_df(game_id=game_id),
+        'df_penalty_type': await AC.TableToDataFrame.get_penalty_type_df(),
+        'game_player_stat_amplua': await AC.TableToDataFrame.get_lineup_player_stat_for_game(game_id=game_id), # Получаем информацию о игроках, учавствующих в данной игре (амплуа)
+    }
+
+
+async def simulate_match_frames_reference(df_game: pd.DataFrame,
+                                          df_referee_game: pd.DataFrame,
+                                          df_goal: pd.DataFrame,
+                                          df_goal_type: pd.DataFrame,
+                                          df_lineup: pd.DataFrame,
+                                          df_penalty: pd.DataFrame,
+                                          df_penalty_type: pd.DataFrame,
+                                          game_player_stat_amplua: pd.DataFrame,
+                                          time_events: set = None,
+                                          is_event_exist: bool = False) -> pd.DataFrame:
+    """Эталонная (построчная) симуляция матча, используется для сверки с simulate_timeline"""
+    res_df = pd.DataFrame(columns=['min', 'plus_min', *FEATURE_COLUMNS])
     
     # Объединяем главного судью с матчем
     df_game = df_game.join(df_referee_game.set_index('game_id'), 'game_id')
@@ -682,56 +694,238 @@ async def simulate_match(game_id: int, time_events: set = None, is_event_exist:
         # Добавление события в результирующий набор данных
         res_df = pd.concat([res_df, new_row_df], ignore_index=True)
     
+    return res_df
+
+
+async def insert_match_states_into_db(states: np.ndarray, replace_changed: bool = False) -> tuple[int, int]:
+    """Сохранение состояний матча в таблицу prediction_draw_left_right одним запросом
+
+    Args:
+        states (np.ndarray): Состояния матча (MATCH_STATE_DTYPE, результат симуляции)
+        replace_changed (bool, optional): Перезаписать существующие состояния с другими признаками (по умолчанию False)
+
+    Returns:
+        tuple[int, int]: Количество добавленных и пропущенных (уже существующих) состояний
+    """
+    inserted, skipped = await AC.PredictionDrawLeftRight.insert_prediction_draw_left_right_bulk(states=states, replace_changed=replace_changed)
+    print(f'Состояния матча сохранены: добавлено {inserted}, пропущено {skipped}')
+    return inserted, skipped
+
+
+async def insert_match_states_into_db_row_by_row(res_df: pd.DataFrame):
+    """Построчное сохранение состояний матча (эталонный путь)"""
     for _, row in res_df.iterrows():
-        await AC.PredictionDrawLeftRight.insert_prediction_draw_left_right(
-            game_id=int(row['game_id']),
-            min=int(row['min']),
-            plus_min=int(row['plus_min']),
-            left_coach_id=int(row['left_coach_id']),
-            right_coach_id=int(row['right_coach_id']),
-            referee_id=int(row['referee_id']),
-            left_num_v=int(row['left_num_v']),
-            left_num_z=int(row['left_num_z']),
-            left_num_p=int(row['left_num_p']),
-            left_num_n=int(row['left_num_n']),
-            left_num_u=int(row['left_num_u']),
-            right_num_v=int(row['right_num_v']),
-            right_num_z=int(row['right_num_z']),
-            right_num_p=int(row['right_num_p']),
-            right_num_n=int(row['right_num_n']),
-            right_num_u=int(row['right_num_u']),
-            left_num_y=int(row['left_num_y']),
-            left_num_y2r=int(row['left_num_y2r']),
-            right_num_y=int(row['right_num_y']),
-            right_num_y2r=int(row['right_num_y2r']),
-            right_num_goal_g=int(row['right_num_goal_g']),
-            right_num_goal_p=int(row['right_num_goal_p']),
-            right_num_goal_a=int(row['right_num_goal_a']),
-            left_num_goal_g=int(row['left_num_goal_g']),
-            left_num_goal_p=int(row['left_num_goal_p']),
-            left_num_goal_a=int(row['left_num_goal_a']),
-            left_total_transfer_value=float(row['left_total_transfer_value']),
-            right_total_transfer_value=float(row['right_total_transfer_value']),
-            left_avg_transfer_value=float(row['left_avg_transfer_value']),
-            right_avg_transfer_value=float(row['right_avg_transfer_value']),
-            left_goal_score=int(row['left_goal_score']),
-            right_goal_score=int(row['right_goal_score']),
-            left_avg_time_player_in_game=float(row['left_avg_time_player_in_game']),
-            right_avg_time_player_in_game=float(row['right_avg_time_player_in_game']),
-            left_right_transfer_value_div=float(row['left_right_transfer_value_div']),
-            right_left_transfer_value_div=float(row['right_left_transfer_value_div']),
-            res_event=int(row['res_event']),
-        )
+        await AC.PredictionDrawLeftRight.insert_prediction_draw_left_right(state=row)
+
+
+async def simulate_match_reference(game_id: int, time_events: set = None, is_event_exist: bool = False):
+    """Симуляция матча эталонным построчным алгоритмом"""
+    match_frames = await get_match_frames_sequential(game_id=game_id)
+    res_df = await simulate_match_frames_reference(**match_frames, time_events=time_events, is_event_exist=is_event_exist)
+    await insert_match_states_into_db_row_by_row(res_df)
+
+
+async def compare_match_frames_latency(game_ids: list[int], repeat: int = 3) -> pd.DataFrame:
+    """Сравнение задержки загрузки данных матча: последовательные запросы и один запрос (get_match_bundle)
+
+    Args:
+        game_ids (list[int]): Уникальные идентификаторы игр
+        repeat (int, optional): Количество повторов для каждой игры (по умолчанию 3)
+
+    Returns:
+        pd.DataFrame: Медианная задержка (мс) каждого способа загрузки для каждой игры
+    """
+    loaders = {'sequential_ms': get_match_frames_sequential, 'bundle_ms': get_match_frames}
+    rows = []
+    for game_id in game_ids:
+        row = {'game_id': game_id}
+        for name, loader in loaders.items():
+            timings = []
+            for _ in range(repeat):
+                start = perf_counter()
+                await loader(game_id=game_id)
+                timings.append((perf_counter() - start) * 1000)
+            row[name] = float(np.median(timings))
+        rows.append(row)
+    res_df = pd.DataFrame(rows, columns=['game_id', *loaders])
+    res_df['speedup'] = res_df['sequential_ms'] / res_df['bundle_ms']
+    print(f'Задержка загрузки данных матча (медиана, мс):\n{res_df.to_string(index=False)}')
+    return res_df
+
+
+async def simulate_match_bundles(pool, bundles: dict, game_ids: list[int], dense: bool = False) -> tuple[np.ndarray, list[int]]:
+    """Симуляция пачки игр в пуле процессов: ошибка одной игры не прерывает симуляцию остальных
+
+    Args:
+        pool: Пул процессов (None - пул потоков цикла событий по умолчанию)
+        bundles (dict): Данные игр get_match_bundles (game_id -> наборы данных матча)
+        game_ids (list[int]): Уникальные идентификаторы игр пачки
+        dense (bool, optional): Состояние на каждую минуту матча (по умолчанию False)
+
+    Returns:
+        tuple[np.ndarray, list[int]]: Состояния успешно просимулированных игр и игры с ошибкой симуляции
+    """
+    loop = asyncio.get_running_loop()
+
+    async def simulate(game_id: int) -> np.ndarray:
+        return await loop.run_in_executor(pool, simulate_match_bundle, bundles[game_id], dense)
+
+    results = await asyncio.gather(*(simulate(game_id) for game_id in game_ids), return_exceptions=True)
+    states, failed_game_ids = [], []
+    for game_id, result in zip(game_ids, results):
+        if isinstance(result, Exception):
+            print(f'Ошибка симуляции игры {game_id=}: {result!r}')
+            failed_game_ids.append(game_id)
+        else:
+            states.append(result)
+    return (np.concatenate(states) if states else empty_match_states(0)), failed_game_ids
+
+
+async def backfill_season_simulation(season_ids: list[str],
+                                     max_workers: int = None,
+                                     chunk_size: int = 50,
+                                     only_unsimulated: bool = True,
+                                     dense: bool = False) -> int:
+    """Пакетная симуляция оконченных игр сезонов в пуле процессов
+
+    Данные игр загружаются пачками (get_match_bundles), симуляция каждой игры выполняется
+    в отдельном процессе, состояния пачки сохраняются одним запросом. Игры с уже сохраненными
+    состояниями пропускаются, поэтому прерванный запуск можно повторить. Игры с ошибкой симуляции
+    (например, без главного судьи) пропускаются и выводятся в конце запуска, остальные игры пачки сохраняются.
+
+    Args:
+        season_ids (list[str]): Уникальные идентификаторы сезонов
+        max_workers (int, optional): Количество процессов (по умолчанию os.cpu_count())
+        chunk_size (int, optional): Количество игр в одной пачке (по умолчанию 50)
+        only_unsimulated (bool, optional): Пропускать уже просимулированные игры (по умолчанию True)
+        dense (bool, optional): Состояние на каждую минуту матча (по умолчанию False)
+
+    Returns:
+        int: Количество просимулированных игр
+    """
+    game_ids = await AC.Game.get_played_game_id_for_backfill(season_ids=season_ids, only_unsimulated=only_unsimulated)
+    print(f'Игр для симуляции: {len(game_ids)} (сезоны {season_ids})')
+    if not game_ids: return 0
+
+    start = perf_counter()
+    simulated = 0
+    failed_game_ids = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for i in range(0, len(game_ids), chunk_size):
+            chunk = game_ids[i:i + chunk_size]
+            bundles = await AC.TableToDataFrame.get_match_bundles(game_ids=chunk)
+            states, chunk_failed_game_ids = await simulate_match_bundles(pool, bundles, chunk, dense=dense)
+            if len(states): await insert_match_states_into_db(states)
+            failed_game_ids.extend(chunk_failed_game_ids)
+            simulated += len(chunk) - len(chunk_failed_game_ids)
+            elapsed = perf_counter() - start
+            print(f'Просимулировано игр: {simulated}/{len(game_ids)}, ошибок {len(failed_game_ids)}, {simulated / elapsed:.2f} игр/с')
+    if failed_game_ids:
+        print(f'Игры с ошибкой симуляции ({len(failed_game_ids)}): {failed_game_ids}')
+    return simulated
+
+
+# Пул браузеров циклов опроса активных и предстоящих игр (браузеры не перезапускаются на каждую страницу)
+browser_pool = AsyncBrowserPool(size=settings.BROWSER_POOL_SIZE,
+                                max_pages=settings.BROWSER_MAX_PAGES,
+                                max_memory_mb=settings.BROWSER_MAX_MEMORY_MB)
+
+# Постоянные вкладки активных игр (браузер берется из пула на время наблюдения)
+live_watchers = LiveGameWatchers(pool=browser_pool, stale_after_s=settings.LIVE_WATCH_STALE_S)
+
+
+# Контрольные точки симуляции активных матчей (game_id -> MatchCheckpoint)
+SIMULATION_CHECKPOINTS: dict[int, MatchCheckpoint] = {}
+# Игры контрольных точек (season_game_id -> game_id)
+CHECKPOINT_GAME_IDS: dict[str, int] = {}
+
+
+async def get_match_checkpoint(game_id: int) -> MatchCheckpoint:
+    """Контрольная точка симуляции матча (восстанавливается из БД при первом обращении)
+
+    Args:
+        game_id (int): Уникальный идентификатор игры
+
+    Returns:
+        MatchCheckpoint: Контрольная точка симуляции матча
+    """
+    checkpoint = SIMULATION_CHECKPOINTS.get(game_id)
+    if checkpoint is None:
+        event_times = await AC.PredictionDrawLeftRight.get_simulated_event_time(game_id=game_id)
+        checkpoint = MatchCheckpoint.from_event_times(game_id, event_times)
+        SIMULATION_CHECKPOINTS[game_id] = checkpoint
+    return checkpoint
+
+
+def retain_match_checkpoints(season_game_ids: list[str]):
+    """Удаление контрольных точек игр, которых нет среди активных (перенесенные, прерванные и т.п.)
+
+    Если игра снова станет активной, ее контрольная точка восстановится из БД при первом обращении.
+    """
+    for season_game_id in set(CHECKPOINT_GAME_IDS) - set(season_game_ids):
+        del CHECKPOINT_GAME_IDS[season_game_id]
+    for game_id in set(SIMULATION_CHECKPOINTS) - set(CHECKPOINT_GAME_IDS.values()):
+        del SIMULATION_CHECKPOINTS[game_id]
+
+
+async def simulate_match_incremental(game_id: int, dense: bool = False):
+    """Инкрементальная симуляция активного матча: рассчитываются только события, отсутствующие в контрольной точке
+
+    Данные матча загружаются целиком, инкрементальна только генерация строк. События не раньше поздно поступившего
+    или измененного гола, наказания или замены рассчитываются заново и перезаписываются в БД.
+
+    Args:
+        game_id (int): Уникальный идентификатор игры
+        dense (bool, optional): Состояние на каждую минуту матча до текущей (по умолчанию False)
+    """
+    checkpoint = await get_match_checkpoint(game_id=game_id)
+    match_frames = await get_match_frames(game_id=game_id)
+    states = await asyncio.to_thread(simulate_match_states, **match_frames, checkpoint=checkpoint, dense=dense)
+    print(f'Новые и пересчитанные события матча {game_id=} (последнее рассчитанное {checkpoint.last_time}): {len(states)}')
+    if len(states) > 0:
+        await insert_match_states_into_db(states, replace_changed=True)
+    checkpoint.update(states)
+
+
+async def simulate_match(game_id: int, time_events: set = None, is_event_exist: bool = False, dense: bool = False):
+    """Симуляция матча: вычисление состояний матча на каждое событие и сохранение в БД
+
+    Args:
+        game_id (int): Уникальный идентификатор игры
+        time_events (set, optional): Заданное множество событий (min, plus_min)
+        is_event_exist (bool, optional): Использовать заданное множество событий (по умолчанию False)
+        dense (bool, optional): Дополнительно состояние на каждую минуту матча (по умолчанию False)
+    """
+    match_frames = await get_match_frames(game_id=game_id)
+    states = await asyncio.to_thread(simulate_match_states, **match_frames, time_events=time_events if is_event_exist else None, dense=dense)
+    await insert_match_states_into_db(states)
 
     
 async def insert_active_game_info_db(season_id: str, season_game_id: str):
     
+    if settings.LIVE_WATCH_TABS:
+        game: Game = await live_watchers.poll(season_id=season_id, season_game_id=season_game_id)
+        # страница не изменилась с предыдущего опроса - данные игры в БД актуальны
+        if game is None: return
+        try:
+            await process_active_game_info(season_id=season_id, season_game_id=season_game_id, game=game)
+        except BaseException:
+            live_watchers.invalidate(season_game_id) # снимок не сохранен, следующий опрос вернет его снова
+            raise
+        if game.is_played == 5: # окончен, не спрогнозирован
+            await live_watchers.close_game(season_game_id)
+        return
+    
     game_page_link = GamePage.get_page_link(season_id=season_id, season_game_id=season_game_id)
         
-    async with AsyncBrowserConnection() as br:
+    async with browser_pool.lease() as br:
         game_page = GamePage(br, game_page_link)
-        game: Game = game_page.get_info()
-        
+        game: Game = await asyncio.to_thread(game_page.get_info)
+    await process_active_game_info(season_id=season_id, season_game_id=season_game_id, game=game)
+
+
+async def process_active_game_info(season_id: str, season_game_id: str, game: Game):
+    """Сохранение снимка активной игры и симуляция ее новых событий"""
     game_status_id_played = 1 #
     game_status_id_pause = 2 #
     game_status_id_in_play = 3
@@ -764,12 +958,72 @@ async def insert_active_game_info_db(season_id: str, season_game_id: str):
         # print(f'{game.cur_plus_min=}')
         # print(f'\n\n\n\n{time_events=}\n\n\n\n\n')
         # await simulate_match(game_id=game_id, time_events=time_events, is_event_exist=True)
-        await simulate_match(game_id=game_id)
+        CHECKPOINT_GAME_IDS[season_game_id] = game_id
+        await simulate_match_incremental(game_id=game_id, dense=settings.DENSE_TIMELINE)
     
     if game.is_played == game_status_id_played_not_predicted:
-        await simulate_match(game_id=game_id)
+        await simulate_match(game_id=game_id, dense=settings.DENSE_TIMELINE)
+        SIMULATION_CHECKPOINTS.pop(game_id, None) # матч окончен, контрольная точка больше не нужна
+        CHECKPOINT_GAME_IDS.pop(season_game_id, None)
         
 
+async def simulate_prematch(game_id: int) -> bool:
+    """Начальное состояние матча (0 минута) по известным составам команд для прогноза до начала матча
+
+    Состояние сохраняется с ключом (0, 0), как первое событие симуляции идущего матча: после начала матча
+    контрольная точка его уже содержит и рассчитываются только новые события. При изменении составов
+    до начала матча состояние перезаписывается, прогноз для него рассчитывается заново.
+
+    Args:
+        game_id (int): Уникальный идентификатор игры
+
+    Returns:
+        bool: Составы обеих команд известны и состояние сохранено
+    """
+    match_frames = await get_match_frames(game_id=game_id)
+    df_game, df_lineup = match_frames['df_game'], match_frames['df_lineup']
+    team_ids = {str(df_game['left_team_id'].item()), str(df_game['right_team_id'].item())}
+    if df_lineup.empty or not team_ids <= set(df_lineup.loc[df_lineup['game_id'] == game_id, 'team_id'].astype(str)):
+        return False
+    # тренеры и главный судья - признаки модели, без них начальное состояние не рассчитывается
+    if df_game[['left_coach_id', 'right_coach_id']].isna().any(axis=None) or match_frames['df_referee_game'].empty:
+        return False
+    states = await asyncio.to_thread(simulate_match_states, **match_frames, time_events={(0, 0)})
+    await insert_match_states_into_db(states, replace_changed=True)
+    return True
+
+
+async def insert_prematch_game_info_db(season_id: str, season_game_id: str) -> int | None:
+    """Сбор данных не начавшейся игры (составы) и расчет ее начального состояния
+
+    Returns:
+        int | None: Уникальный идентификатор игры, если начальное состояние рассчитано
+    """
+    game_page_link = GamePage.get_page_link(season_id=season_id, season_game_id=season_game_id)
+    
+    async with browser_pool.lease() as br:
+        game_page = GamePage(br, game_page_link)
+        game: Game = await asyncio.to_thread(game_page.get_info)
+    
+    game_status_id_not_started = 0
+    if AC.GAME_STATUS_DICT[game_status_id_not_started] != 'не начался': raise Exception('Идентификатор не начавшегося матча был изменен')
+    
+    game.id = season_game_id
+    game.left_season_team_id = await AC.SeasonTeam.get_left_season_team_id_by_season_id_season_game_id(season_id=season_id, season_game_id=season_game_id)
+    game.right_season_team_id = await AC.SeasonTeam.get_right_season_team_id_by_season_id_season_game_id(season_id=season_id, season_game_id=season_game_id)
+    game_id = await insert_season_game_into_db(season_id=season_id, game=game)
+    
+    # Матч уже начался - дальше его обрабатывает manage_active_game
+    if game.is_played != game_status_id_not_started:
+        return None
+    
+    if not (game.left_team_lineup and game.right_team_lineup):
+        print(f'Составы команд матча {game_id=} еще неизвестны')
+        return None
+    
+    return game_id if await simulate_prematch(game_id=game_id) else None
+
+
 async def manage_active_season():
     pending_season_list = await check_season_id_in_db()
     print(f'Выявленные необработанные сезоны manage_active_season: {pending_season_list}')
@@ -778,14 +1032,76 @@ async def manage_active_season():
         await asyncio.gather(task)
     return
 
-#season_id: str, active_season_game_id: list[str]
+# Отчеты последнего цикла периодических задач (имя цикла -> отчет run_game_cycle)
+CYCLE_REPORTS: dict[str, dict] = {}
+
+
+async def run_game_cycle(cycle_name: str, game_ids: list, func, max_concurrency: int, timeout: float) -> dict:
+    """Обработка игр цикла с ограниченной параллельностью, тайм-аутом на игру и изоляцией ошибок
+
+    Ошибка или тайм-аут одной игры не прерывают обработку остальных, а попадают в отчет цикла.
+
+    Args:
+        cycle_name (str): Имя цикла (ключ CYCLE_REPORTS)
+        game_ids (list): Идентификаторы игр (аргумент func)
+        func: Корутинная функция обработки одной игры
+        max_concurrency (int): Максимальное количество одновременно обрабатываемых игр
+        timeout (float): Тайм-аут обработки одной игры, с
+
+    Returns:
+        dict: Отчет цикла: общее время и время, ожидание и результат по каждой игре
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    cycle_start = perf_counter()
+    
+    async def run_game(game_id) -> dict:
+        async with semaphore:
+            start = perf_counter()
+            status, error = 'ok', None
+            try:
+                await asyncio.wait_for(func(game_id), timeout=timeout)
+            except TimeoutError:
+                status, error = 'timeout', f'превышен тайм-аут {timeout} с'
+            except Exception as e:
+                status, error = 'error', repr(e)
+            return {
+                'game_id': game_id,
+                'status': status,
+                'wait_s': start - cycle_start,
+                'seconds': perf_counter() - start,
+                'error': error,
+            }
+    
+    games = await asyncio.gather(*(run_game(game_id) for game_id in game_ids))
+    report = {
+        'cycle': cycle_name,
+        'finished_at': str(await AC.get_moscow_datetime_now()),
+        'total_s': perf_counter() - cycle_start,
+        'max_concurrency': max_concurrency,
+        'ok': sum(game['status'] == 'ok' for game in games),
+        'failed': sum(game['status'] != 'ok' for game in games),
+        'games': list(games),
+    }
+    CYCLE_REPORTS[cycle_name] = report
+    
+    lines = [f"Цикл {cycle_name}: игр {len(games)}, ошибок {report['failed']}, всего {report['total_s']:.1f} с"]
+    for game in games:
+        lines.append(f"  {game['game_id']}: {game['status']} {game['seconds']:.1f} с (ожидание {game['wait_s']:.1f} с)"
+                     + (f" {game['error']}" if game['error'] else ''))
+    print('\n'.join(lines))
+    return report
+
+
 async def manage_active_game():
     season_id, active_season_game_id = await check_active_game_in_db()
     print(f'Выявленные активные игры manage_active_game: {active_season_game_id}')
-    for season_game_id in active_season_game_id:
-        task = asyncio.create_task(insert_active_game_info_db(season_id=season_id, season_game_id=season_game_id))
-        await asyncio.gather(task)
-    return
+    await live_watchers.retain(list(active_season_game_id)) # вкладки игр, которые больше не активны, закрываются
+    retain_match_checkpoints(list(active_season_game_id))
+    return await run_game_cycle(cycle_name='manage_active_game',
+                                game_ids=list(active_season_game_id),
+                                func=lambda season_game_id: insert_active_game_info_db(season_id=season_id, season_game_id=season_game_id),
+                                max_concurrency=settings.LIVE_MAX_CONCURRENCY,
+                                timeout=settings.LIVE_GAME_TIMEOUT_S)
 
 
 # asyncio.run(manage_active_game())
\ No newline at end of file
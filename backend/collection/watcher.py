@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+from collection.browser import AsyncBrowserPool, PooledBrowser
+from collection.pages import GamePage, GamePageWatcher
+from collection.schemas import Game
+
+
+class LiveGameWatchers:
+    """Постоянные вкладки идущих игр в одном браузере пула
+
+    Для каждой игры вкладка открывается при первом опросе и остается открытой до окончания игры,
+    страница не загружается заново на каждом цикле. Браузер берется из пула на все время наблюдения
+    (checkout) и возвращается, когда не остается открытых вкладок. Вкладки одного драйвера
+    переключаются последовательно: опрос вкладки выполняется в потоке под общей блокировкой драйвера,
+    поэтому отмена опроса по тайм-ауту не приводит к одновременной работе двух опросов с драйвером.
+    """
+
+    def __init__(self, pool: AsyncBrowserPool, stale_after_s: float):
+        """
+        Args:
+            pool (AsyncBrowserPool): Пул браузеров
+            stale_after_s (float): Перезагрузка вкладки, если страница не менялась дольше stale_after_s, с
+        """
+        self.pool = pool
+        self.stale_after_s = stale_after_s
+        self._pooled: PooledBrowser | None = None
+        self._watchers: dict[str, GamePageWatcher] = {}
+        self._browser_lock = asyncio.Lock()
+        self._driver_lock = threading.Lock()
+        self.opened = self.closed = self.errors = 0
+        self.snapshots = self.unchanged = 0
+
+    async def _get_browser(self):
+        async with self._browser_lock:
+            if self._pooled is None:
+                self._pooled = await self.pool.checkout()
+            return self._pooled.browser
+
+    def _close_watcher(self, season_game_id: str):
+        watcher = self._watchers.pop(season_game_id, None)
+        if watcher is None: return
+        try:
+            watcher.close()
+        except Exception as e:
+            print(f'Ошибка закрытия вкладки игры {season_game_id}: {e}')
+        self.closed += 1
+
+    async def poll(self, season_id: str, season_game_id: str) -> Game | None:
+        """Снимок игры, если ее страница изменилась с предыдущего опроса, иначе None
+
+        При ошибке вкладка закрывается, следующий опрос откроет ее заново и вернет полный снимок.
+        """
+        browser = await self._get_browser()
+
+        def poll_tab() -> Game | None:
+            with self._driver_lock:
+                watcher = self._watchers.get(season_game_id)
+                if watcher is None:
+                    watcher = GamePageWatcher(browser, GamePage.get_page_link(season_id=season_id, season_game_id=season_game_id),
+                                              stale_after_s=self.stale_after_s)
+                    self._watchers[season_game_id] = watcher
+                    self.opened += 1
+                try:
+                    return watcher.poll()
+                except Exception:
+                    self.errors += 1
+                    self._close_watcher(season_game_id)
+                    raise
+
+        game = await asyncio.to_thread(poll_tab)
+        if game is None:
+            self.unchanged += 1
+        else:
+            self.snapshots += 1
+        return game
+
+    def invalidate(self, season_game_id: str):
+        """Следующий опрос игры вернет полный снимок (предыдущий снимок не был обработан)"""
+        watcher = self._watchers.get(season_game_id)
+        if watcher is not None: watcher.invalidate()
+
+    async def close_game(self, season_game_id: str):
+        """Закрытие вкладки оконченной игры"""
+        def close_tab():
+            with self._driver_lock:
+                self._close_watcher(season_game_id)
+        await asyncio.to_thread(close_tab)
+
+    async def retain(self, season_game_ids: list[str]):
+        """Закрытие вкладок игр, которых нет среди активных, и возврат браузера в пул
+
+        Браузер возвращается в пул, если не осталось вкладок, и перезапускается, если он не отвечает
+        или его память превышает предел пула (вкладки активных игр откроются заново при следующем опросе).
+        """
+        if self._pooled is None: return
+        pooled = self._pooled
+        max_memory_bytes = self.pool.max_memory_mb * 2**20 if self.pool.max_memory_mb else None
+
+        def close_tabs() -> bool:
+            with self._driver_lock:
+                for season_game_id in set(self._watchers) - set(season_game_ids):
+                    self._close_watcher(season_game_id)
+                try:
+                    pooled.browser.execute_script('return 1')
+                except Exception:
+                    return False
+                return max_memory_bytes is None or pooled.memory_bytes() <= max_memory_bytes
+
+        healthy = await asyncio.to_thread(close_tabs)
+        if healthy and self._watchers: return
+        await self.close(failed=not healthy)
+
+    async def close(self, failed: bool = False):
+        """Закрытие всех вкладок и возврат браузера в пул"""
+        async with self._browser_lock:
+            if self._pooled is None: return
+            pooled, self._pooled = self._pooled, None
+
+            def close_tabs():
+                with self._driver_lock:
+                    for season_game_id in list(self._watchers):
+                        self._close_watcher(season_game_id)
+            if not failed:
+                await asyncio.to_thread(close_tabs)
+            else:
+                self._watchers.clear()
+            await self.pool.checkin(pooled, failed=failed)
+
+    def stats(self) -> dict:
+        return {
+            'browser': self._pooled is not None,
+            'tabs': {season_game_id: {'polls': watcher.polls, 'snapshots': watcher.snapshots, 'reloads': watcher.reloads}
+                     for season_game_id, watcher in list(self._watchers.items())},
+            'opened': self.opened,
+            'closed': self.closed,
+            'errors': self.errors,
+            'snapshots': self.snapshots,
+            'unchanged': self.unchanged,
+        }
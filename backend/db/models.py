@@ -376,5 +376,11 @@ class PredictionDrawLeftRightOrm(Base):
     right_p: Mapped[float | None]
     res_p: Mapped[int | None]
     res: Mapped[int | None]
+    model_version: Mapped[str_100 | None] # версия модели, рассчитавшей прогноз
     created_at: Mapped[datetime]
     updated_at: Mapped[datetime]
+    
+    __table_args__ = (
+        UniqueConstraint('game_id', 'min', 'plus_min', name='unique_game_id_min_plus_min'),
+        Index('index_prediction_draw_left_right_model_version', 'model_version'),
+    )
@@ -0,0 +1,83 @@
+from collections import defaultdict
+from typing import Any, Hashable
+
+
+class DimensionCache:
+    '''Внутрипроцессный кэш справочных таблиц (измерений)
+
+    Хранит соответствия ключ -> значение для небольших, почти неизменяемых таблиц:
+        amplua: name -> amplua_id
+        goal_type: name -> goal_type_id
+        penalty_type: name -> penalty_type_id
+        stat: name -> stat_id
+        game_status: game_status_id -> name
+        season_team: (season_id, season_team_id) -> team_id
+        team_season_team: (season_id, team_id) -> season_team_id
+
+    Отсутствие ключа в кэше не означает отсутствие записи в БД (записи могут добавляться
+    другими процессами), поэтому промах всегда проверяется запросом к БД.
+    '''
+
+    DIMENSIONS = ('amplua', 'goal_type', 'penalty_type', 'stat', 'game_status', 'season_team', 'team_season_team')
+
+    def __init__(self):
+        self._values: dict[str, dict[Hashable, Any]] = {dimension: {} for dimension in self.DIMENSIONS}
+        self._loaded: set[str] = set()
+        self.hits: dict[str, int] = defaultdict(int)
+        self.misses: dict[str, int] = defaultdict(int)
+
+    def get(self, dimension: str, key: Hashable) -> Any | None:
+        '''Значение из кэша (None при промахе)'''
+        value = self._values[dimension].get(key)
+        if value is None:
+            self.misses[dimension] += 1
+        else:
+            self.hits[dimension] += 1
+        return value
+
+    def set(self, dimension: str, key: Hashable, value: Any):
+        if key is None or value is None: return
+        self._values[dimension][key] = value
+
+    def load(self, dimension: str, values: dict[Hashable, Any]):
+        '''Полная загрузка измерения (прогрев)'''
+        self._values[dimension] = {key: value for key, value in values.items() if key is not None and value is not None}
+        self._loaded.add(dimension)
+
+    def is_loaded(self, dimension: str) -> bool:
+        return dimension in self._loaded
+
+    def items(self, dimension: str) -> list[tuple[Hashable, Any]]:
+        '''Все значения полностью загруженного измерения (учитывается как попадание)'''
+        self.hits[dimension] += 1
+        return list(self._values[dimension].items())
+
+    def invalidate(self, dimension: str = None, key: Hashable = None):
+        '''Сброс кэша: всего, одного измерения или одного ключа измерения'''
+        dimensions = self.DIMENSIONS if dimension is None else (dimension,)
+        for dimension in dimensions:
+            if key is None:
+                self._values[dimension] = {}
+                self._loaded.discard(dimension)
+            else:
+                self._values[dimension].pop(key, None)
+                self._loaded.discard(dimension)
+
+    def stats(self) -> dict[str, dict]:
+        '''Счетчики попаданий и промахов по измерениям'''
+        return {
+            dimension: {
+                'hits': self.hits[dimension],
+                'misses': self.misses[dimension],
+                'size': len(self._values[dimension]),
+                'loaded': self.is_loaded(dimension),
+            }
+            for dimension in self.DIMENSIONS
+        }
+
+    def reset_stats(self):
+        self.hits.clear()
+        self.misses.clear()
+
+
+dimension_cache = DimensionCache()
@@ -5,7 +5,9 @@ from sqlalchemy.orm import aliased
 from sqlalchemy.exc import IntegrityError
 from asyncpg.exceptions import UniqueViolationError
 import asyncio
+import json
 
+import numpy as np
 import pandas as pd
 from ..database import async_session_factory, sync_session_factory
 from ..schemasDto import (SeasonDto, SeasonAddDto,
@@ -13,7 +15,13 @@ from ..schemasDto import (SeasonDto, SeasonAddDto,
                           SortSeasonGameDto,
                           SeasonTeamAddDto,
                           PredictionDrawLeftRightDto, GamePredictionDrowLeftRightDto)
+from ..models import (GameOrm, RefereeGameOrm, GoalOrm,
+                      LineupOrm, PenaltyOrm)
+from .cache import dimension_cache
 from collection.pages import (SeasonPage, GamePage, TeamPage)
+from collection.simulation import MATCH_STATE_COLUMNS, MATCH_STATE_DTYPE, to_match_states
+from collection.features import (FEATURE_COLUMNS, FEATURE_DTYPE,
+                                 sql_columns, sql_unnest_arrays, bind_arrays, rows_to_array)
 
 
 class SyncCore:
@@ -41,6 +49,10 @@ class SyncCore:
       
     @staticmethod
     def get_amplua_id_for_name(name: str) -> int:
+        amplua_id = dimension_cache.get('amplua', name)
+        if amplua_id is not None:
+            return amplua_id
+        
         try:
             with sync_session_factory() as session:
                 query = text('''SELECT amplua_id FROM amplua WHERE name=:name
@@ -51,6 +63,7 @@ class SyncCore:
                 res = session.execute(query)
                 amplua = res.one_or_none()
                 existed_amplua_id = None if amplua is None else amplua.amplua_id
+                dimension_cache.set('amplua', name, existed_amplua_id)
                 return existed_amplua_id
         except Exception as e:
             session.rollback()
@@ -118,6 +131,40 @@ class AsyncCore:
             return True
         return False
     
+    class Dimension:
+        
+        @staticmethod
+        async def warm_cache():
+            '''Прогрев кэша справочных таблиц (amplua, goal_type, penalty_type, stat, game_status, season_team)'''
+            async with async_session_factory() as session:
+                try:
+                    for dimension, query, key, value in (
+                        ('amplua', 'SELECT name, amplua_id FROM amplua', 'name', 'amplua_id'),
+                        ('goal_type', 'SELECT name, goal_type_id FROM goal_type', 'name', 'goal_type_id'),
+                        ('penalty_type', 'SELECT name, penalty_type_id FROM penalty_type', 'name', 'penalty_type_id'),
+                        ('stat', 'SELECT name, stat_id FROM stat', 'name', 'stat_id'),
+                        ('game_status', 'SELECT game_status_id, name FROM game_status', 'game_status_id', 'name'),
+                    ):
+                        res = await session.execute(text(query))
+                        dimension_cache.load(dimension, {row[key]: row[value] for row in res.mappings().all()})
+                    
+                    res = await session.execute(text('SELECT season_id, season_team_id, team_id FROM season_team'))
+                    rows = res.mappings().all()
+                    dimension_cache.load('season_team', {(row['season_id'], row['season_team_id']): row['team_id'] for row in rows})
+                    dimension_cache.load('team_season_team', {(row['season_id'], row['team_id']): row['season_team_id'] for row in rows})
+                except Exception as e:
+                    await session.rollback()
+                    raise
+            print(f'Кэш справочных таблиц прогрет: {dimension_cache.stats()}')
+        
+        @staticmethod
+        async def get_cache_stats() -> dict[str, dict]:
+            return dimension_cache.stats()
+        
+        @staticmethod
+        async def invalidate_cache(dimension: str = None):
+            dimension_cache.invalidate(dimension)
+    
     class Player:
         
         @staticmethod
@@ -275,6 +322,10 @@ class AsyncCore:
             
             if name is None: name = AsyncCore.Amplua.UNDEFINED_AMPLUA_NAME
             
+            amplua_id = dimension_cache.get('amplua', name)
+            if amplua_id is not None:
+                return amplua_id
+            
             async with async_session_factory() as session:
                 try:
                     query = text('''
@@ -287,6 +338,7 @@ class AsyncCore:
                     res = await session.execute(query)
                     amplua = res.one_or_none()
                     existed_amplua_id =  None if amplua is None else amplua.amplua_id
+                    dimension_cache.set('amplua', name, existed_amplua_id)
                     return existed_amplua_id
                 except Exception as e:
                     await session.rollback()
@@ -313,6 +365,7 @@ class AsyncCore:
                     res = await session.execute(stmt)
                     amplua_id = res.scalar()
                     await session.commit()
+                    dimension_cache.set('amplua', name, amplua_id)
                     return amplua_id
                 except IntegrityError as e:
                     await session.rollback() # откатываем транзакцию
@@ -593,6 +646,9 @@ class AsyncCore:
         @staticmethod
         async def is_season_id_team_id_exist(season_id: str,
                                              team_id: str) -> bool:
+            if dimension_cache.get('team_season_team', (season_id, team_id)) is not None:
+                return True
+            
             async with async_session_factory() as session:
                 try:
                     query = text('''
@@ -633,6 +689,8 @@ class AsyncCore:
                     )
                     await session.execute(stmt)
                     await session.commit()
+                    dimension_cache.set('season_team', (season_id, season_team_id), team_id)
+                    dimension_cache.set('team_season_team', (season_id, team_id), season_team_id)
                 except IntegrityError as e:
                     await session.rollback() # откатываем транзакцию
                     raise
@@ -643,6 +701,10 @@ class AsyncCore:
         @staticmethod
         async def get_team_id_by_season_id_season_team_id(season_id: str,
                               season_team_id: str) -> str | None:
+            team_id = dimension_cache.get('season_team', (season_id, season_team_id))
+            if team_id is not None:
+                return team_id
+            
             async with async_session_factory() as session:
                 try:
                     query = text('''
@@ -656,6 +718,7 @@ class AsyncCore:
                     res = await session.execute(query)
                     team = res.one_or_none()
                     team_id = None if team is None else team.team_id
+                    dimension_cache.set('season_team', (season_id, season_team_id), team_id)
                     return team_id
                 except Exception as e:
                     await session.rollback()
@@ -664,6 +727,10 @@ class AsyncCore:
         @staticmethod
         async def get_season_team_id_by_season_id_team_id(season_id: str,
                                      team_id: str) -> str | None:
+            season_team_id = dimension_cache.get('team_season_team', (season_id, team_id))
+            if season_team_id is not None:
+                return season_team_id
+            
             async with async_session_factory() as session:
                 try:
                     query = text('''
@@ -677,6 +744,7 @@ class AsyncCore:
                     res = await session.execute(query)
                     season_team = res.one_or_none()
                     season_team_id = None if season_team is None else season_team.season_team_id
+                    dimension_cache.set('team_season_team', (season_id, team_id), season_team_id)
                     return season_team_id
                 except Exception as e:
                     await session.rollback()
@@ -973,6 +1041,9 @@ class AsyncCore:
         
         @staticmethod
         async def is_game_status_id_exist(game_status_id: int) -> bool:
+            if dimension_cache.get('game_status', game_status_id) is not None:
+                return True
+            
             async with async_session_factory() as session:
                 try:
                     query = text('''
@@ -983,7 +1054,9 @@ class AsyncCore:
                         game_status_id=game_status_id,
                     )
                     res = await session.execute(query)
-                    is_exist = False if res.one_or_none() is None else True
+                    game_status = res.one_or_none()
+                    is_exist = False if game_status is None else True
+                    if is_exist: dimension_cache.set('game_status', game_status_id, game_status.name)
                     return is_exist
                 except Exception as e:
                     await session.rollback()
@@ -1015,6 +1088,7 @@ class AsyncCore:
                     )
                     await session.execute(stmt)
                     await session.commit()
+                    dimension_cache.set('game_status', game_status_id, name)
                     return game_status_id
                 except IntegrityError as e:
                     await session.rollback() # откатываем транзакцию
@@ -1326,6 +1400,80 @@ class AsyncCore:
                     await session.rollback()
                     raise
         
+        @staticmethod
+        async def get_upcoming_season_game_id(season_id: str, window_minutes: int) -> list[tuple[int, str]]:
+            '''Не начавшиеся игры сезона, которые начнутся в ближайшие window_minutes минут (для прогноза до начала матча)
+            
+            Returns:
+                list[tuple[int, str]]: Пары (game_id, season_game_id)
+            '''
+            current_datetime = await AsyncCore.get_moscow_datetime_now()
+            
+            game_status_id_not_started = 0
+            
+            if AsyncCore.GAME_STATUS_DICT[game_status_id_not_started] != 'не начался': raise Exception('Идентификатор не начавшегося матча был изменен')
+            
+            async with async_session_factory() as session:
+                try:
+                    query = text('''
+                                 SELECT game_id, season_game_id FROM game
+                                 WHERE 
+                                 game_status_id = :game_status_id_not_started AND
+                                 start_date IS NOT NULL AND start_time IS NOT NULL AND
+                                 start_date + start_time BETWEEN :current_datetime AND :window_end AND
+                                 season_id = :season_id
+                                 ORDER BY start_date, start_time
+                                 ''')
+                    query = query.bindparams(
+                        game_status_id_not_started=game_status_id_not_started,
+                        current_datetime=current_datetime,
+                        window_end=current_datetime + timedelta(minutes=window_minutes),
+                        season_id=season_id
+                    )
+                    res = await session.execute(query)
+                    return [(row.game_id, row.season_game_id) for row in res.all()]
+                except Exception as e:
+                    await session.rollback()
+                    raise
+        
+        @staticmethod
+        async def get_played_game_id_for_backfill(season_ids: list[str], only_unsimulated: bool = True) -> list[int]:
+            '''Оконченные игры сезонов для пакетной симуляции
+            
+            При only_unsimulated пропускаются игры, для которых уже есть состояния в prediction_draw_left_right
+            (состояния игры сохраняются одним запросом, поэтому повторный запуск продолжает с места остановки)
+            '''
+            game_status_id_played = 1
+            game_status_id_played_not_predicted = 5
+            
+            if AsyncCore.GAME_STATUS_DICT[game_status_id_played_not_predicted] != 'окончен, не спрогнозирован': raise Exception('Идентификатор не спрогнозированного матча был изменен')
+            if AsyncCore.GAME_STATUS_DICT[game_status_id_played] != 'окончен': raise Exception('Идентифифактор оконченного матча был изменен')
+            
+            async with async_session_factory() as session:
+                try:
+                    query = text('''
+                                 SELECT game_id FROM game
+                                 WHERE 
+                                 game_status_id IN (:game_status_id_played, :game_status_id_played_not_predicted) AND 
+                                 season_id = ANY(:season_ids)
+                                 ''')
+                    if only_unsimulated:
+                        query = text(str(query) + ''' AND NOT EXISTS (
+                                     SELECT 1 FROM prediction_draw_left_right
+                                     WHERE prediction_draw_left_right.game_id=game.game_id
+                                     )''')
+                    query = text(str(query) + ' ORDER BY game_id')
+                    query = query.bindparams(
+                        game_status_id_played=game_status_id_played,
+                        game_status_id_played_not_predicted=game_status_id_played_not_predicted,
+                        season_ids=list(season_ids)
+                    )
+                    res = await session.execute(query)
+                    return res.scalars().all()
+                except Exception as e:
+                    await session.rollback()
+                    raise
+        
         @staticmethod
         async def is_season_game_id_season_id_exist(season_game_id: str, season_id: str) -> int | None:
             async with async_session_factory() as session:
@@ -1499,6 +1647,10 @@ class AsyncCore:
         
         @staticmethod
         async def is_goal_type_name_exist(name: str) -> int | None:
+            goal_type_id = dimension_cache.get('goal_type', name)
+            if goal_type_id is not None:
+                return goal_type_id
+            
             async with async_session_factory() as session:
                 try:
                     query = text('''
@@ -1511,6 +1663,7 @@ class AsyncCore:
                     res = await session.execute(query)
                     goal_type = res.one_or_none()
                     existed_goal_type_id =  None if goal_type is None else goal_type.goal_type_id
+                    dimension_cache.set('goal_type', name, existed_goal_type_id)
                     return existed_goal_type_id
                 except Exception as e:
                     await session.rollback()
@@ -1534,6 +1687,7 @@ class AsyncCore:
                     res = await session.execute(stmt)
                     goal_type_id = res.scalar()
                     await session.commit()
+                    dimension_cache.set('goal_type', name, goal_type_id)
                     return goal_type_id
                 except IntegrityError as e:
                     await session.rollback() # откатываем транзакцию
@@ -1812,6 +1966,10 @@ class AsyncCore:
         
         @staticmethod
         async def is_penalty_type_name_exist(name: str) -> int | None:
+            penalty_type_id = dimension_cache.get('penalty_type', name)
+            if penalty_type_id is not None:
+                return penalty_type_id
+            
             async with async_session_factory() as session:
                 try:
                     query = text('''
@@ -1824,6 +1982,7 @@ class AsyncCore:
                     res = await session.execute(query)
                     penalty_type = res.one_or_none()
                     existed_penalty_type_id =  None if penalty_type is None else penalty_type.penalty_type_id
+                    dimension_cache.set('penalty_type', name, existed_penalty_type_id)
                     return existed_penalty_type_id
                 except Exception as e:
                     await session.rollback()
@@ -1847,6 +2006,7 @@ class AsyncCore:
                     res = await session.execute(stmt)
                     penalty_type_id = res.scalar()
                     await session.commit()
+                    dimension_cache.set('penalty_type', name, penalty_type_id)
                     return penalty_type_id
                 except IntegrityError as e:
                     await session.rollback() # откатываем транзакцию
@@ -2317,6 +2477,10 @@ class AsyncCore:
         
         @staticmethod
         async def is_name_exist(name: str) -> int | None:
+            stat_id = dimension_cache.get('stat', name)
+            if stat_id is not None:
+                return stat_id
+            
             async with async_session_factory() as session:
                 try:
                     query = text('''
@@ -2329,6 +2493,7 @@ class AsyncCore:
                     res = await session.execute(query)
                     stat = res.one_or_none()
                     existed_stat_id =  None if stat is None else stat.stat_id
+                    dimension_cache.set('stat', name, existed_stat_id)
                     return existed_stat_id
                 except Exception as e:
                     await session.rollback()
@@ -2352,6 +2517,7 @@ class AsyncCore:
                     res = await session.execute(stmt)
                     stat_id = res.scalar()
                     await session.commit()
+                    dimension_cache.set('stat', name, stat_id)
                     return stat_id
                 except IntegrityError as e:
                     await session.rollback() # откатываем транзакцию
@@ -2552,11 +2718,16 @@ class AsyncCore:
         
         @staticmethod
         async def get_goal_type_df() -> pd.DataFrame:
+            if dimension_cache.is_loaded('goal_type'):
+                return pd.DataFrame([{'goal_type_id': goal_type_id, 'name': name} for name, goal_type_id in dimension_cache.items('goal_type')],
+                                    columns=['goal_type_id', 'name'])
+            
             async with async_session_factory() as session:
                 query = text('SELECT * FROM goal_type')
                 # Выполняем через async session
                 result = await session.execute(query)
                 rows = result.mappings().all()
+                dimension_cache.load('goal_type', {row['name']: row['goal_type_id'] for row in rows})
                 # Конвертируем в DataFrame
                 return pd.DataFrame(rows)
         
@@ -2599,11 +2770,16 @@ class AsyncCore:
         
         @staticmethod
         async def get_penalty_type_df() -> pd.DataFrame:
+            if dimension_cache.is_loaded('penalty_type'):
+                return pd.DataFrame([{'penalty_type_id': penalty_type_id, 'name': name} for name, penalty_type_id in dimension_cache.items('penalty_type')],
+                                    columns=['penalty_type_id', 'name'])
+            
             async with async_session_factory() as session:
                 query = text('SELECT * FROM penalty_type')
                 # Выполняем через async session
                 result = await session.execute(query)
                 rows = result.mappings().all()
+                dimension_cache.load('penalty_type', {row['name']: row['penalty_type_id'] for row in rows})
                 # Конвертируем в DataFrame
                 return pd.DataFrame(rows)
         
@@ -2639,11 +2815,105 @@ class AsyncCore:
                 df = pd.DataFrame(rows)
                 df['transfer_value'] = df['transfer_value'].fillna(0)
                 unkwn_amplua_name = 'неизвестно'
-                unkwn_amplua_id = SyncCore.get_amplua_id_for_name(unkwn_amplua_name)
+                unkwn_amplua_id = await AsyncCore.Amplua.is_amplua_name_exist(unkwn_amplua_name)
                 df['amplua_id'] = df['amplua_id'].fillna(unkwn_amplua_id)
                 df['name'] = df['name'].fillna(unkwn_amplua_name)
                 # Конвертируем в DataFrame
                 return df
+        
+        @staticmethod
+        async def get_match_bundle(game_id: int) -> dict[str, pd.DataFrame]:
+            '''Все наборы данных, необходимые для симуляции игры, за один запрос к базе данных'''
+            bundles = await AsyncCore.TableToDataFrame.get_match_bundles(game_ids=[game_id])
+            return bundles[game_id]
+        
+        @staticmethod
+        async def get_match_bundles(game_ids: list[int]) -> dict[int, dict[str, pd.DataFrame]]:
+            '''Наборы данных для симуляции нескольких игр за один запрос к базе данных
+            
+            Каждая таблица собирается на стороне PostgreSQL в JSON-массив (json_agg),
+            поэтому вместо восьми запросов на игру (и двух запросов LIMIT 0 ради имен колонок)
+            выполняется один запрос на весь список игр. Пустые таблицы получают колонки из ORM-моделей,
+            справочники goal_type и penalty_type берутся из кэша измерений.
+            '''
+            async with async_session_factory() as session:
+                query = text('''SELECT
+                                CAST((SELECT json_agg(t) FROM game t WHERE t.game_id = ANY(:game_ids)) AS TEXT) AS df_game,
+                                CAST((SELECT json_agg(t) FROM referee_game t WHERE t.game_id = ANY(:game_ids)) AS TEXT) AS df_referee_game,
+                                CAST((SELECT json_agg(t) FROM goal t WHERE t.game_id = ANY(:game_ids)) AS TEXT) AS df_goal,
+                                CAST((SELECT json_agg(t) FROM lineup t WHERE t.game_id = ANY(:game_ids)) AS TEXT) AS df_lineup,
+                                CAST((SELECT json_agg(t) FROM penalty t WHERE t.game_id = ANY(:game_ids)) AS TEXT) AS df_penalty,
+                                CAST((SELECT json_agg(t) FROM (
+                                    SELECT
+                                    game.game_id,
+                                    lineup.player_id,
+                                    player_stat.transfer_value,
+                                    player_stat.amplua_id,
+                                    amplua.name
+                                    FROM game
+                                    LEFT JOIN lineup ON game.game_id=lineup.game_id
+                                    LEFT JOIN player_stat 
+                                    ON lineup.player_id=player_stat.player_id AND 
+                                    game.season_id=player_stat.season_id AND 
+                                    player_stat.player_stat_id=(
+                                        SELECT MAX(player_stat_id) FROM player_stat WHERE player_stat.player_id=lineup.player_id AND player_stat.season_id=game.season_id
+                                    )
+                                    LEFT JOIN amplua ON player_stat.amplua_id=amplua.amplua_id
+                                    WHERE game.game_id = ANY(:game_ids)
+                                ) t) AS TEXT) AS game_player_stat_amplua,
+                                (SELECT amplua_id FROM amplua WHERE name=:unkwn_amplua_name) AS unkwn_amplua_id
+                            ''')
+                unkwn_amplua_name = 'неизвестно'
+                query = query.bindparams(
+                    game_ids=[int(game_id) for game_id in game_ids],
+                    unkwn_amplua_name=unkwn_amplua_name
+                )
+                # Выполняем через async session
+                result = await session.execute(query)
+                row = result.mappings().one()
+                
+            table_columns = {
+                'df_game': GameOrm.__table__.columns.keys(),
+                'df_referee_game': RefereeGameOrm.__table__.columns.keys(),
+                'df_goal': GoalOrm.__table__.columns.keys(),
+                'df_lineup': LineupOrm.__table__.columns.keys(),
+                'df_penalty': PenaltyOrm.__table__.columns.keys(),
+                'game_player_stat_amplua': ['game_id', 'player_id', 'transfer_value', 'amplua_id', 'name'],
+            }
+            # Конвертируем в DataFrame
+            tables = {}
+            for key, columns in table_columns.items():
+                rows = json.loads(row[key]) if row[key] is not None else []
+                tables[key] = pd.DataFrame(rows, columns=columns)
+            
+            # Справочники типов голов и нарушений берутся из кэша измерений
+            tables['df_goal_type'] = await AsyncCore.TableToDataFrame.get_goal_type_df()
+            tables['df_penalty_type'] = await AsyncCore.TableToDataFrame.get_penalty_type_df()
+            
+            df = tables['game_player_stat_amplua']
+            df['transfer_value'] = df['transfer_value'].fillna(0)
+            df['amplua_id'] = df['amplua_id'].fillna(row['unkwn_amplua_id'])
+            df['name'] = df['name'].fillna(unkwn_amplua_name)
+            
+            # Разбиваем таблицы по играм (справочники goal_type и penalty_type общие)
+            shared_tables = ('df_goal_type', 'df_penalty_type')
+            groups = {
+                key: {game_id: group for game_id, group in df.groupby('game_id')}
+                for key, df in tables.items() if key not in shared_tables
+            }
+            bundles = {}
+            for game_id in game_ids:
+                bundle = {}
+                for key, df in tables.items():
+                    if key in shared_tables:
+                        bundle[key] = df
+                        continue
+                    game_df = groups[key].get(game_id, df.iloc[:0]).reset_index(drop=True)
+                    if key == 'game_player_stat_amplua':
+                        game_df = game_df.drop(columns='game_id')
+                    bundle[key] = game_df
+                bundles[game_id] = bundle
+            return bundles
                 
              
     class PredictionDrawLeftRight:
@@ -2747,6 +3017,101 @@ class AsyncCore:
                     await session.rollback()
                     raise
         
+        @staticmethod
+        async def get_simulated_event_time(game_id: int) -> list[tuple[int, int]]:
+            '''Время (min, plus_min) событий игры, для которых уже рассчитано состояние матча'''
+            async with async_session_factory() as session:
+                try:
+                    query = text('''
+                                 SELECT min, plus_min FROM prediction_draw_left_right
+                                 WHERE game_id=:game_id
+                                 ORDER BY min, plus_min
+                                 ''')
+                    query = query.bindparams(
+                        game_id=game_id
+                    )
+                    res = await session.execute(query)
+                    return [(row.min, row.plus_min) for row in res.all()]
+                except Exception as e:
+                    await session.rollback()
+                    raise
+        
+        @staticmethod
+        async def get_storage_size() -> tuple[int, int]:
+            '''Количество строк и полный размер таблицы prediction_draw_left_right (с индексами), байт'''
+            async with async_session_factory() as session:
+                try:
+                    query = text('''
+                                 SELECT
+                                 (SELECT COUNT(*) FROM prediction_draw_left_right) AS row_count,
+                                 pg_total_relation_size('prediction_draw_left_right') AS total_size
+                                 ''')
+                    res = await session.execute(query)
+                    row = res.one()
+                    return row.row_count, row.total_size
+                except Exception as e:
+                    await session.rollback()
+                    raise
+
+        @staticmethod
+        async def get_outdated_prediction_game_id(model_version: str) -> list[int]:
+            '''Игры, в которых есть прогнозы, рассчитанные другой (устаревшей) версией модели'''
+            async with async_session_factory() as session:
+                try:
+                    query = text('''
+                                 SELECT DISTINCT game_id FROM prediction_draw_left_right
+                                 WHERE res_p IS NOT NULL AND model_version IS DISTINCT FROM :model_version
+                                 ORDER BY game_id
+                                 ''')
+                    query = query.bindparams(
+                        model_version=model_version
+                    )
+                    res = await session.execute(query)
+                    return res.scalars().all()
+                except Exception as e:
+                    await session.rollback()
+                    raise
+
+        # Столбцы выгрузки обучающего набора (stream_prediction_rows)
+        EXPORT_COLUMNS = ['prediction_id', 'season_id', *MATCH_STATE_COLUMNS,
+                          'draw_p', 'left_p', 'right_p', 'res_p', 'res', 'model_version', 'updated_at']
+        
+        @staticmethod
+        async def stream_prediction_rows(updated_since: datetime = None, chunk_size: int = 50000):
+            '''Чтение таблицы prediction_draw_left_right пачками через серверный курсор
+            
+            В памяти одновременно находится не больше chunk_size строк независимо от размера таблицы.
+            Строки упорядочены по сезону, поэтому пачки одного сезона идут подряд.
+            
+            Args:
+                updated_since (datetime, optional): Только строки, измененные начиная с этого момента (по умолчанию все)
+                chunk_size (int, optional): Количество строк в одной пачке
+            
+            Yields:
+                pd.DataFrame: Пачка строк (столбцы EXPORT_COLUMNS)
+            '''
+            columns = AsyncCore.PredictionDrawLeftRight.EXPORT_COLUMNS
+            async with async_session_factory() as session:
+                try:
+                    query = text(f'''
+                                 SELECT p.prediction_id, g.season_id,
+                                 {sql_columns(MATCH_STATE_COLUMNS, prefix='p.')},
+                                 p.draw_p, p.left_p, p.right_p, p.res_p, p.res, p.model_version, p.updated_at
+                                 FROM prediction_draw_left_right AS p
+                                 JOIN game AS g ON g.game_id = p.game_id
+                                 WHERE CAST(:updated_since AS TIMESTAMP) IS NULL OR p.updated_at >= CAST(:updated_since AS TIMESTAMP)
+                                 ORDER BY g.season_id, p.prediction_id
+                                 ''')
+                    query = query.bindparams(
+                        updated_since=updated_since
+                    )
+                    res = await session.stream(query, execution_options={'yield_per': chunk_size})
+                    async for rows in res.partitions(chunk_size):
+                        yield pd.DataFrame(rows, columns=columns)
+                except Exception as e:
+                    await session.rollback()
+                    raise
+
         @staticmethod
         async def get_unpredicted_prediction_id(game_id: int) -> list[int]:
             async with async_session_factory() as session:
@@ -2763,47 +3128,48 @@ class AsyncCore:
                 except Exception as e:
                     await session.rollback()
                     raise
+        
+        @staticmethod
+        async def get_unpredicted_states(game_ids: list[int], outdated_model_version: str = None) -> tuple[np.ndarray, np.ndarray]:
+            '''Все непрогнозированные состояния нескольких игр одним запросом
+            
+            Args:
+                game_ids (list[int]): Уникальные идентификаторы игр
+                outdated_model_version (str, optional): Текущая версия модели: дополнительно выбираются состояния,
+                    спрогнозированные другой (устаревшей) версией модели
+            
+            Returns:
+                tuple[np.ndarray, np.ndarray]: Идентификаторы прогнозов и состояния матча (MATCH_STATE_DTYPE)
+            '''
+            async with async_session_factory() as session:
+                try:
+                    query = text(f'''
+                                 SELECT prediction_id, {', '.join(MATCH_STATE_COLUMNS)}
+                                 FROM prediction_draw_left_right
+                                 WHERE game_id = ANY(:game_ids)
+                                 AND (res_p IS NULL OR (CAST(:model_version AS VARCHAR) IS NOT NULL AND model_version IS DISTINCT FROM :model_version))
+                                 ORDER BY game_id, min, plus_min
+                                 ''')
+                    query = query.bindparams(
+                        game_ids=[int(game_id) for game_id in game_ids],
+                        model_version=outdated_model_version
+                    )
+                    res = await session.execute(query)
+                    df = pd.DataFrame(res.all(), columns=['prediction_id', *MATCH_STATE_COLUMNS])
+                    # пропуски (NULL) вещественных признаков сохраняются как NaN
+                    df[MATCH_STATE_COLUMNS] = df[MATCH_STATE_COLUMNS].astype(np.float64)
+                    return df['prediction_id'].to_numpy(dtype=np.int64), to_match_states(df)
+                except Exception as e:
+                    await session.rollback()
+                    raise
              
         @staticmethod
-        async def get_attributes_prediction(prediction_id: int):
+        async def get_attributes_prediction(prediction_id: int) -> np.ndarray:
+            '''Признаки состояния матча для прогноза (одна строка FEATURE_DTYPE)'''
             async with async_session_factory() as session:
                 try:
-                    query = text('''
-                                SELECT 
-                                left_coach_id,
-                                right_coach_id,
-                                referee_id,
-                                left_num_v,
-                                left_num_z,
-                                left_num_p,
-                                left_num_n,
-                                left_num_u,
-                                right_num_v,
-                                right_num_z,
-                                right_num_p,
-                                right_num_n,
-                                right_num_u,
-                                left_num_y,
-                                left_num_y2r,
-                                right_num_y,
-                                right_num_y2r,
-                                right_num_goal_g,
-                                right_num_goal_p,
-                                right_num_goal_a,
-                                left_num_goal_g,
-                                left_num_goal_p,
-                                left_num_goal_a,
-                                left_total_transfer_value,
-                                right_total_transfer_value,
-                                left_avg_transfer_value,
-                                right_avg_transfer_value,
-                                left_goal_score,
-                                right_goal_score,
-                                left_avg_time_player_in_game,
-                                right_avg_time_player_in_game,
-                                left_right_transfer_value_div,
-                                right_left_transfer_value_div,
-                                res_event
+                    query = text(f'''
+                                SELECT {sql_columns(FEATURE_COLUMNS)}
                                 FROM prediction_draw_left_right
                                 WHERE prediction_id=:prediction_id
                                  ''')
@@ -2811,51 +3177,22 @@ class AsyncCore:
                         prediction_id=prediction_id
                     )
                     res = await session.execute(query)
-                    return res.all()[0]
+                    return rows_to_array([res.one()], FEATURE_DTYPE)
                 except Exception as e:
                     await session.rollback()
                     raise
                 
         @staticmethod
-        async def get_attributes_train(game_id: int):
+        async def get_attributes_train(game_id: int) -> tuple[np.ndarray, np.ndarray]:
+            '''Признаки состояний матча и фактический исход игры для дообучения
+            
+            Returns:
+                tuple[np.ndarray, np.ndarray]: Признаки (FEATURE_DTYPE) и исход (res) для каждого состояния
+            '''
             async with async_session_factory() as session:
                 try:
-                    query = text('''
-                                SELECT 
-                                left_coach_id,
-                                right_coach_id,
-                                referee_id,
-                                left_num_v,
-                                left_num_z,
-                                left_num_p,
-                                left_num_n,
-                                left_num_u,
-                                right_num_v,
-                                right_num_z,
-                                right_num_p,
-                                right_num_n,
-                                right_num_u,
-                                left_num_y,
-                                left_num_y2r,
-                                right_num_y,
-                                right_num_y2r,
-                                right_num_goal_g,
-                                right_num_goal_p,
-                                right_num_goal_a,
-                                left_num_goal_g,
-                                left_num_goal_p,
-                                left_num_goal_a,
-                                left_total_transfer_value,
-                                right_total_transfer_value,
-                                left_avg_transfer_value,
-                                right_avg_transfer_value,
-                                left_goal_score,
-                                right_goal_score,
-                                left_avg_time_player_in_game,
-                                right_avg_time_player_in_game,
-                                left_right_transfer_value_div,
-                                right_left_transfer_value_div,
-                                res_event,
+                    query = text(f'''
+                                SELECT {sql_columns(FEATURE_COLUMNS)},
                                 res
                                 FROM prediction_draw_left_right
                                 WHERE game_id=:game_id
@@ -2864,7 +3201,55 @@ class AsyncCore:
                         game_id=game_id
                     )
                     res = await session.execute(query)
-                    return res.all()
+                    rows = res.all()
+                    states = rows_to_array([row[:-1] for row in rows], FEATURE_DTYPE)
+                    return states, np.array([row.res for row in rows], dtype=np.float64)
+                except Exception as e:
+                    await session.rollback()
+                    raise
+        
+        @staticmethod
+        async def get_finished_prediction_game_id() -> list[int]:
+            '''Игры, для состояний которых рассчитан фактический исход (res)'''
+            async with async_session_factory() as session:
+                try:
+                    query = text('''
+                                 SELECT DISTINCT game_id FROM prediction_draw_left_right
+                                 WHERE res IS NOT NULL
+                                 ORDER BY game_id
+                                 ''')
+                    res = await session.execute(query)
+                    return res.scalars().all()
+                except Exception as e:
+                    await session.rollback()
+                    raise
+        
+        @staticmethod
+        async def get_attributes_train_bulk(game_ids: list[int]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+            '''Признаки состояний и фактический исход нескольких игр одним запросом
+            
+            Returns:
+                tuple[np.ndarray, np.ndarray, np.ndarray]: Идентификаторы игр, признаки (FEATURE_DTYPE) и исход (res) для каждого состояния
+            '''
+            async with async_session_factory() as session:
+                try:
+                    query = text(f'''
+                                SELECT game_id,
+                                {sql_columns(FEATURE_COLUMNS)},
+                                res
+                                FROM prediction_draw_left_right
+                                WHERE game_id = ANY(:game_ids) AND res IS NOT NULL
+                                ORDER BY game_id, min, plus_min
+                                 ''')
+                    query = query.bindparams(
+                        game_ids=[int(game_id) for game_id in game_ids]
+                    )
+                    res = await session.execute(query)
+                    rows = res.all()
+                    states = rows_to_array([row[1:-1] for row in rows], FEATURE_DTYPE)
+                    return (np.array([row.game_id for row in rows], dtype=np.int64),
+                            states,
+                            np.array([row.res for row in rows], dtype=np.int64))
                 except Exception as e:
                     await session.rollback()
                     raise
@@ -2902,6 +3287,66 @@ class AsyncCore:
                     await session.rollback()
                     raise
         
+        @staticmethod
+        async def update_prediction_bulk(prediction_ids: np.ndarray,
+                                         predict_proba: np.ndarray,
+                                         res_p: np.ndarray,
+                                         model_version: str = None) -> int:
+            """Сохранение результатов прогноза для набора состояний одним запросом (UPDATE ... FROM unnest)
+
+            Args:
+                prediction_ids (np.ndarray): Идентификаторы прогнозов (N)
+                predict_proba (np.ndarray): Вероятности ничьей, победы левой и правой команды (N x 3)
+                res_p (np.ndarray): Прогнозируемый исход (N)
+                model_version (str, optional): Версия модели, рассчитавшей прогноз
+
+            Returns:
+                int: Количество обновленных строк
+            """
+            if len(prediction_ids) == 0: return 0
+            
+            async with async_session_factory() as session:
+                try:
+                    stmt = text('''
+                                UPDATE prediction_draw_left_right
+                                SET updated_at=:updated_at,
+                                    model_version=:model_version,
+                                    draw_p=batch.draw_p,
+                                    left_p=batch.left_p,
+                                    right_p=batch.right_p,
+                                    res_p=batch.res_p
+                                FROM unnest(
+                                    CAST(:prediction_id AS INTEGER[]),
+                                    CAST(:draw_p AS DOUBLE PRECISION[]),
+                                    CAST(:left_p AS DOUBLE PRECISION[]),
+                                    CAST(:right_p AS DOUBLE PRECISION[]),
+                                    CAST(:res_p AS INTEGER[])
+                                ) AS batch(prediction_id, draw_p, left_p, right_p, res_p)
+                                WHERE prediction_draw_left_right.prediction_id=batch.prediction_id
+                                ''')
+                    
+                    updated_at = await AsyncCore.get_moscow_datetime_now()
+                    predict_proba = np.asarray(predict_proba, dtype=np.float64)
+                    
+                    stmt = stmt.bindparams(
+                        updated_at=updated_at,
+                        model_version=model_version,
+                        prediction_id=np.asarray(prediction_ids).astype(int).tolist(),
+                        draw_p=predict_proba[:, 0].tolist(),
+                        left_p=predict_proba[:, 1].tolist(),
+                        right_p=predict_proba[:, 2].tolist(),
+                        res_p=np.asarray(res_p).astype(int).tolist(),
+                    )
+                    res = await session.execute(stmt)
+                    await session.commit()
+                    return res.rowcount
+                except IntegrityError as e:
+                    await session.rollback() # откатываем транзакцию
+                    raise
+                except Exception as e:
+                    await session.rollback()
+                    raise
+        
         @staticmethod
         async def set_res(game_id: int):
             async with async_session_factory() as session:
@@ -2941,93 +3386,26 @@ class AsyncCore:
                     raise
         
         @staticmethod
-        async def insert_prediction_draw_left_right(game_id: int,
-                                                    min: int,
-                                                    plus_min: int,
-                                                    left_coach_id: int,
-                                                    right_coach_id: int,
-                                                    referee_id: int,
-                                                    left_num_v: int,
-                                                    left_num_z: int,
-                                                    left_num_p: int,
-                                                    left_num_n: int,
-                                                    left_num_u: int,
-                                                    right_num_v: int,
-                                                    right_num_z: int,
-                                                    right_num_p: int,
-                                                    right_num_n: int,
-                                                    right_num_u: int,
-                                                    left_num_y: int,
-                                                    left_num_y2r: int,
-                                                    right_num_y: int,
-                                                    right_num_y2r: int,
-                                                    right_num_goal_g: int,
-                                                    right_num_goal_p: int,
-                                                    right_num_goal_a: int,
-                                                    left_num_goal_g: int,
-                                                    left_num_goal_p: int,
-                                                    left_num_goal_a: int,
-                                                    left_total_transfer_value: float,
-                                                    right_total_transfer_value: float,
-                                                    left_avg_transfer_value: float,
-                                                    right_avg_transfer_value: float,
-                                                    left_goal_score: int,
-                                                    right_goal_score: int,
-                                                    left_avg_time_player_in_game: float,
-                                                    right_avg_time_player_in_game: float,
-                                                    left_right_transfer_value_div: float,
-                                                    right_left_transfer_value_div: float,
-                                                    res_event: int,
+        async def insert_prediction_draw_left_right(state,
                                                     draw_p: float = None,
                                                     left_p: float = None,
                                                     right_p: float = None,
                                                     res_p: int = None,
                                                     res: int = None):
-                        
+            """Вставка одного состояния матча (эталонный построчный путь)
+
+            Args:
+                state: Состояние матча (строка MATCH_STATE_DTYPE, pd.Series или dict со столбцами MATCH_STATE_COLUMNS)
+            """
+            game_id, min, plus_min = int(state['game_id']), int(state['min']), int(state['plus_min'])
             if await AsyncCore.PredictionDrawLeftRight.is_prediction_draw_left_right_exist(game_id, min, plus_min):
                 return
                      
             async with async_session_factory() as session:
                 try:
-                    stmt = text('''
+                    stmt = text(f'''
                                 INSERT INTO prediction_draw_left_right (
-                                    game_id,
-                                    min,
-                                    plus_min,
-                                    left_coach_id,
-                                    right_coach_id,
-                                    referee_id,
-                                    left_num_v,
-                                    left_num_z,
-                                    left_num_p,
-                                    left_num_n,
-                                    left_num_u,
-                                    right_num_v,
-                                    right_num_z,
-                                    right_num_p,
-                                    right_num_n,
-                                    right_num_u,
-                                    left_num_y,
-                                    left_num_y2r,
-                                    right_num_y,
-                                    right_num_y2r,
-                                    right_num_goal_g,
-                                    right_num_goal_p,
-                                    right_num_goal_a,
-                                    left_num_goal_g,
-                                    left_num_goal_p,
-                                    left_num_goal_a,
-                                    left_total_transfer_value,
-                                    right_total_transfer_value,
-                                    left_avg_transfer_value,
-                                    right_avg_transfer_value,
-                                    left_goal_score,
-                                    right_goal_score,
-                                    left_avg_time_player_in_game,
-                                    right_avg_time_player_in_game,
-                                    left_right_transfer_value_div,
-                                    right_left_transfer_value_div,
-                                    res_event,
+                                    {sql_columns(MATCH_STATE_COLUMNS)},
                                     created_at,
                                     updated_at,
                                     draw_p,
@@ -3037,43 +3415,7 @@ class AsyncCore:
                                     res
                                     )
                                 VALUES (
-                                    :game_id,
-                                    :min,
-                                    :plus_min,
-                                    :left_coach_id,
-                                    :right_coach_id,
-                                    :referee_id,
-                                    :left_num_v,
-                                    :left_num_z,
-                                    :left_num_p,
-                                    :left_num_n,
-                                    :left_num_u,
-                                    :right_num_v,
-                                    :right_num_z,
-                                    :right_num_p,
-                                    :right_num_n,
-                                    :right_num_u,
-                                    :left_num_y,
-                                    :left_num_y2r,
-                                    :right_num_y,
-                                    :right_num_y2r,
-                                    :right_num_goal_g,
-                                    :right_num_goal_p,
-                                    :right_num_goal_a,
-                                    :left_num_goal_g,
-                                    :left_num_goal_p,
-                                    :left_num_goal_a,
-                                    :left_total_transfer_value,
-                                    :right_total_transfer_value,
-                                    :left_avg_transfer_value,
-                                    :right_avg_transfer_value,
-                                    :left_goal_score,
-                                    :right_goal_score,
-                                    :left_avg_time_player_in_game,
-                                    :right_avg_time_player_in_game,
-                                    :left_right_transfer_value_div,
-                                    :right_left_transfer_value_div,
-                                    :res_event,
+                                    {sql_columns(MATCH_STATE_COLUMNS, prefix=':')},
                                     :created_at,
                                     :updated_at,
                                     :draw_p,
@@ -3087,43 +3429,7 @@ class AsyncCore:
                     updated_at = await AsyncCore.get_moscow_datetime_now()
                     
                     stmt = stmt.bindparams(
-                        game_id=game_id,
-                        min=min,
-                        plus_min=plus_min,
-                        left_coach_id=left_coach_id,
-                        right_coach_id=right_coach_id,
-                        referee_id=referee_id,
-                        left_num_v=left_num_v,
-                        left_num_z=left_num_z,
-                        left_num_p=left_num_p,
-                        left_num_n=left_num_n,
-                        left_num_u=left_num_u,
-                        right_num_v=right_num_v,
-                        right_num_z=right_num_z,
-                        right_num_p=right_num_p,
-                        right_num_n=right_num_n,
-                        right_num_u=right_num_u,
-                        left_num_y=left_num_y,
-                        left_num_y2r=left_num_y2r,
-                        right_num_y=right_num_y,
-                        right_num_y2r=right_num_y2r,
-                        right_num_goal_g=right_num_goal_g,
-                        right_num_goal_p=right_num_goal_p,
-                        right_num_goal_a=right_num_goal_a,
-                        left_num_goal_g=left_num_goal_g,
-                        left_num_goal_p=left_num_goal_p,
-                        left_num_goal_a=left_num_goal_a,
-                        left_total_transfer_value=left_total_transfer_value,
-                        right_total_transfer_value=right_total_transfer_value,
-                        left_avg_transfer_value=left_avg_transfer_value,
-                        right_avg_transfer_value=right_avg_transfer_value,
-                        left_goal_score=left_goal_score,
-                        right_goal_score=right_goal_score,
-                        left_avg_time_player_in_game=left_avg_time_player_in_game,
-                        right_avg_time_player_in_game=right_avg_time_player_in_game,
-                        left_right_transfer_value_div=left_right_transfer_value_div,
-                        right_left_transfer_value_div=right_left_transfer_value_div,
-                        res_event=res_event,
+                        **{name: MATCH_STATE_DTYPE[name].type(state[name]).item() for name in MATCH_STATE_COLUMNS},
                         created_at=created_at,
                         updated_at=updated_at,
                         draw_p=draw_p,
@@ -3140,4 +3446,59 @@ class AsyncCore:
                 except Exception as e:
                     await session.rollback()
                     raise
-             
\ No newline at end of file
+
+        @staticmethod
+        async def insert_prediction_draw_left_right_bulk(states: np.ndarray | pd.DataFrame, replace_changed: bool = False) -> tuple[int, int]:
+            """Вставка всех состояний матча одним запросом (дубликаты по game_id, min, plus_min пропускаются)
+
+            Args:
+                states (np.ndarray | pd.DataFrame): Состояния матча (MATCH_STATE_DTYPE или pd.DataFrame со столбцами MATCH_STATE_COLUMNS)
+                replace_changed (bool, optional): Существующие состояния с другими признаками перезаписываются,
+                    прогноз для них сбрасывается (по умолчанию False - пропускаются)
+
+            Returns:
+                tuple[int, int]: Количество добавленных (перезаписанных) и пропущенных строк
+            """
+            if len(states) == 0: return 0, 0
+            
+            on_conflict = 'ON CONFLICT (game_id, min, plus_min) DO NOTHING'
+            if replace_changed:
+                on_conflict = f'''ON CONFLICT (game_id, min, plus_min) DO UPDATE SET
+                                    {sql_columns([f'{name}=EXCLUDED.{name}' for name in FEATURE_COLUMNS])},
+                                    updated_at=EXCLUDED.updated_at,
+                                    draw_p=NULL, left_p=NULL, right_p=NULL, res_p=NULL, model_version=NULL
+                                WHERE ({sql_columns(FEATURE_COLUMNS, prefix='prediction_draw_left_right.', separator=', ')})
+                                    IS DISTINCT FROM ({sql_columns(FEATURE_COLUMNS, prefix='EXCLUDED.', separator=', ')})'''
+            
+            async with async_session_factory() as session:
+                try:
+                    stmt = text(f'''
+                                INSERT INTO prediction_draw_left_right (
+                                    {sql_columns(MATCH_STATE_COLUMNS)},
+                                    created_at,
+                                    updated_at
+                                    )
+                                SELECT *, CAST(:created_at AS TIMESTAMP), CAST(:updated_at AS TIMESTAMP) FROM unnest(
+                                    {sql_unnest_arrays(MATCH_STATE_DTYPE, MATCH_STATE_COLUMNS)}
+                                    )
+                                {on_conflict}
+                                RETURNING prediction_id''')
+                    
+                    datetime_now = await AsyncCore.get_moscow_datetime_now()
+                    created_at, updated_at = datetime_now, datetime_now
+                    
+                    stmt = stmt.bindparams(
+                        **bind_arrays(states, MATCH_STATE_DTYPE, MATCH_STATE_COLUMNS),
+                        created_at=created_at,
+                        updated_at=updated_at,
+                        )
+                    res = await session.execute(stmt)
+                    inserted = len(res.scalars().all())
+                    await session.commit()
+                    return inserted, len(states) - inserted
+                except IntegrityError as e:
+                    await session.rollback() # откатываем транзакцию
+                    raise
+                except Exception as e:
+                    await session.rollback()
+                    raise
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from collection.simulation import MATCH_STATE_COLUMNS
+from db.queries.core import AsyncCore as AC
+
+try:
+    import pyarrow
+    from prediction import export
+except ImportError:
+    pyarrow = None
+
+
+def make_prediction_rows(prediction_ids: list[int], season_id: str, updated_at: datetime, res_p=None) -> pd.DataFrame:
+    """Синтетическая пачка строк AC.PredictionDrawLeftRight.stream_prediction_rows"""
+    rnd = np.random.default_rng(prediction_ids[0])
+    df = pd.DataFrame({'prediction_id': prediction_ids, 'season_id': season_id})
+    for name in MATCH_STATE_COLUMNS:
+        df[name] = rnd.integers(0, 90, len(df))
+    df['game_id'] = df['prediction_id'] # по одной строке на игру: порядок чтения совпадает с prediction_id
+    proba = rnd.dirichlet([1, 1, 1], len(df))
+    df['draw_p'], df['left_p'], df['right_p'] = proba[:, 0], proba[:, 1], proba[:, 2]
+    df['res_p'] = res_p
+    df['res'] = None
+    df['model_version'] = 'v1'
+    df['updated_at'] = updated_at
+    return df[AC.PredictionDrawLeftRight.EXPORT_COLUMNS]
+
+
+@unittest.skipIf(pyarrow is None, 'pyarrow не установлен')
+class TestTrainingSetExport(unittest.TestCase):
+    """Выгрузка обучающего набора: запись по сезонам, чтение последней версии строк и метка инкрементальной выгрузки"""
+
+    def export(self, output_dir: str, chunks: list[pd.DataFrame], now: datetime, fmt: str = 'parquet'):
+        calls = []
+
+        async def stream_prediction_rows(updated_since=None, chunk_size=50000):
+            calls.append(updated_since)
+            for df in chunks:
+                yield df
+
+        async def get_moscow_datetime_now():
+            return now
+
+        class RunDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return now # run_id запусков различается
+
+        with mock.patch.object(AC.PredictionDrawLeftRight, 'stream_prediction_rows', stream_prediction_rows), \
+             mock.patch.object(AC, 'get_moscow_datetime_now', get_moscow_datetime_now), \
+             mock.patch.object(export, 'datetime', RunDatetime):
+            result = asyncio.run(export.export_training_set(output_dir, fmt=fmt))
+        return result, calls[0]
+
+    def test_round_trip(self):
+        for fmt in export.FILE_EXTENSIONS:
+            with self.subTest(fmt=fmt), tempfile.TemporaryDirectory() as output_dir:
+                first_at = datetime(2026, 5, 1, 12, 0)
+                chunks = [make_prediction_rows([1, 2, 3], '2025', first_at),
+                          make_prediction_rows([4, 5], '2026', first_at)]
+                result, updated_since = self.export(output_dir, chunks, now=first_at, fmt=fmt)
+                self.assertIsNone(updated_since)
+                self.assertEqual(result['rows'], 5)
+                self.assertEqual(sorted(result['files']), ['2025', '2026'])
+                self.assertFalse([name for _, _, names in os.walk(output_dir) for name in names if name.endswith('.tmp')])
+
+                # повторная выгрузка с метки предыдущего запуска: строка 2 спрогнозирована позже
+                second_at = first_at + timedelta(hours=1)
+                updated = make_prediction_rows([2], '2025', second_at, res_p=1)
+                _, updated_since = self.export(output_dir, [updated], now=second_at, fmt=fmt)
+                self.assertEqual(updated_since, first_at - export.WATERMARK_SAFETY_MARGIN)
+
+                df = export.read_training_set(output_dir, fmt=fmt)
+                expected = pd.concat([chunks[0][chunks[0]['prediction_id'] != 2], updated, chunks[1]])
+                self.assertEqual(df['prediction_id'].tolist(), [1, 2, 3, 4, 5])
+                self.assertEqual(df['season_id'].astype(str).tolist(), ['2025', '2025', '2025', '2026', '2026'])
+                self.assertEqual(df.loc[df['prediction_id'] == 2, 'res_p'].tolist(), [1])
+                self.assertTrue(df.loc[df['prediction_id'] != 2, 'res_p'].isna().all())
+                np.testing.assert_allclose(df['draw_p'], expected.sort_values('prediction_id')['draw_p'])
+                for name in MATCH_STATE_COLUMNS:
+                    np.testing.assert_array_equal(df[name], expected.sort_values('prediction_id')[name])
+
+                state = export.load_export_state(output_dir)
+                self.assertEqual(state['last_updated_at'], (second_at - export.WATERMARK_SAFETY_MARGIN).isoformat())
+                self.assertEqual(len(state['runs']), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
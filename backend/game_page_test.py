@@ -0,0 +1,117 @@
+import os
+import unittest
+from time import perf_counter
+
+from collection.pages import GamePage, GamePageWatcher
+from collection.browser import start_chrome
+from collection.locators import GamePageLocators
+
+
+TEST_PAGES = ['active_match_page.html', 'pause_math_page.html']
+
+
+class TestGamePageBulkExtraction(unittest.TestCase):
+    """Извлечение страницы игры одним скриптом совпадает с поэлементным разбором (сохраненные страницы test_pages)"""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.browser = start_chrome()
+        except Exception as e:
+            raise unittest.SkipTest(f'Браузер Chrome недоступен: {e}')
+        # подсчет обращений к драйверу
+        cls.commands = 0
+        execute = cls.browser.execute
+        def counting_execute(*args, **kwargs):
+            cls.commands += 1
+            return execute(*args, **kwargs)
+        cls.browser.execute = counting_execute
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.browser.quit()
+
+    def get_info(self, page_href: str, bulk: bool):
+        self.__class__.commands = 0
+        start = perf_counter()
+        game = GamePage(self.browser, page_href, bulk=bulk).get_info()
+        return game, perf_counter() - start, self.commands
+
+    def test_bulk_matches_elements(self):
+        for page in TEST_PAGES:
+            with self.subTest(page=page):
+                page_href = 'file://' + os.path.abspath(os.path.join('test_pages', page))
+                self.get_info(page_href, bulk=True) # прогрев кэша страницы
+                game_elements, elements_s, elements_commands = self.get_info(page_href, bulk=False)
+                game_bulk, bulk_s, bulk_commands = self.get_info(page_href, bulk=True)
+                print(f'{page}: поэлементно {elements_s:.2f} с ({elements_commands} обращений), '
+                      f'одним скриптом {bulk_s:.2f} с ({bulk_commands} обращений), ускорение {elements_s / bulk_s:.1f}x')
+
+                self.assertEqual(game_elements, game_bulk)
+                self.assertLess(bulk_commands, elements_commands)
+
+
+class TestGamePageWatcher(unittest.TestCase):
+    """Опрос страницы игры в постоянной вкладке: снимок только при изменении разделов (сохраненная страница test_pages)"""
+
+    STATUS_SCRIPT = "document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue.textContent = arguments[1];"
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.browser = start_chrome()
+        except Exception as e:
+            raise unittest.SkipTest(f'Браузер Chrome недоступен: {e}')
+        cls.page_href = 'file://' + os.path.abspath(os.path.join('test_pages', 'active_match_page.html'))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.browser.quit()
+
+    def set_status(self, watcher: GamePageWatcher, status: str):
+        self.browser.switch_to.window(watcher.window_handle)
+        self.browser.execute_script(self.STATUS_SCRIPT, GamePageLocators.GAME_STATUS[1], status)
+
+    def test_poll_returns_changed_snapshots(self):
+        expected = GamePage(self.browser, self.page_href).get_info()
+        handles = len(self.browser.window_handles)
+        watcher = GamePageWatcher(self.browser, self.page_href)
+        try:
+            game = watcher.poll()
+            self.assertIsNotNone(game)
+            self.assertEqual(game, expected)
+            self.assertEqual((game.is_played, game.cur_min), (3, 46))
+            self.assertIsNone(watcher.poll())
+
+            # изменение раздела страницы (автообновление статистики на сайте)
+            self.set_status(watcher, "2-й тайм, 47'")
+            changed = watcher.poll()
+            self.assertIsNotNone(changed)
+            self.assertEqual((changed.is_played, changed.cur_min), (3, 47))
+            self.assertEqual(changed.left_team_lineup, game.left_team_lineup)
+            self.assertIsNone(watcher.poll())
+
+            # снимок не сохранен: следующий опрос возвращает полный снимок без изменений страницы
+            watcher.invalidate()
+            self.assertEqual(watcher.poll(), changed)
+            self.assertEqual((watcher.polls, watcher.snapshots, watcher.reloads), (5, 3, 0))
+        finally:
+            watcher.close()
+        self.assertIsNone(watcher.window_handle)
+        self.assertEqual(len(self.browser.window_handles), handles)
+
+    def test_stale_page_reloaded(self):
+        watcher = GamePageWatcher(self.browser, self.page_href, stale_after_s=0)
+        try:
+            self.assertIsNotNone(watcher.poll())
+            self.set_status(watcher, "2-й тайм, 47'")
+            # страница не менялась дольше stale_after_s: вкладка перезагружается, изменение DOM сбрасывается
+            game = watcher.poll()
+            self.assertEqual(watcher.reloads, 1)
+            self.assertIsNone(game)
+        finally:
+            watcher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import asyncio
+import sys
+import threading
+import traceback
+from time import perf_counter
+
+
+class LoopWatchdog:
+    """Сторожевой поток, фиксирующий блокировки цикла событий asyncio
+
+    Задача в цикле событий обновляет отметку времени каждые interval секунд.
+    Если отметка не обновлялась дольше threshold секунд, отдельный поток выводит
+    стек потока цикла событий (код, который блокирует цикл) и длительность блокировки.
+    """
+
+    def __init__(self, threshold: float, interval: float = None):
+        """
+        Args:
+            threshold (float): Порог блокировки цикла событий, с
+            interval (float, optional): Период обновления отметки времени, с (по умолчанию threshold / 4)
+        """
+        self.threshold = threshold
+        self.interval = interval if interval is not None else threshold / 4
+        self.stall_count = 0
+        self._last_beat = perf_counter()
+        self._loop_thread_id = None
+        self._heartbeat_task = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Запуск сторожевого потока (вызывается из работающего цикла событий)"""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = perf_counter()
+        self._stop_event.clear()
+        self._heartbeat_task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._thread.start()
+        print(f'Сторожевой поток цикла событий запущен: порог {self.threshold * 1000:.0f} мс')
+
+    def stop(self):
+        self._stop_event.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=self.threshold)
+
+    async def _heartbeat(self):
+        while True:
+            self._last_beat = perf_counter()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self):
+        stalled_since = None
+        while not self._stop_event.wait(self.interval):
+            last_beat = self._last_beat
+            stall = perf_counter() - last_beat - self.interval
+            if stall > self.threshold and stalled_since != last_beat:
+                # Блокировка обнаружена: выводим стек потока цикла событий один раз
+                stalled_since = last_beat
+                self.stall_count += 1
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = ''.join(traceback.format_stack(frame)) if frame is not None else 'стек недоступен\n'
+                print(f'Цикл событий заблокирован более {stall * 1000:.0f} мс, стек:\n{stack}')
+            elif stalled_since is not None and stalled_since != last_beat:
+                # Цикл событий снова обрабатывает задачи
+                print(f'Цикл событий разблокирован после {(last_beat - stalled_since) * 1000:.0f} мс')
+                stalled_since = None
@@ -1,3 +1,4 @@
+import asyncio
 import uvicorn
 from fastapi import FastAPI, Query, BackgroundTasks
 
@@ -12,14 +13,54 @@ from typing import List, Optional
 from enum import Enum
 
 
-from collection.utils import (manage_active_season, manage_active_game)
-from prediction.utils import (manage_predict_game)
+from collection.utils import (manage_active_season, manage_active_game, CYCLE_REPORTS, browser_pool, live_watchers)
+from prediction.utils import (manage_predict_game, manage_prematch_game)
 from db.queries.core import AsyncCore as AC
+from prediction.registry import model_registry
+from prediction.executor import inference_executor
+from prediction.memo import prediction_memo
+from prediction.retrain import retrain_model, retrain_periodically, load_retrain_state
+from db.config import settings
+from loop_watchdog import LoopWatchdog
 from db.schemasDto import * # noqa
 
 
+@asynccontextmanager
+async def app_lifespan(app: FastAPI):
+    # Сторожевой поток блокировок цикла событий (включается через LOOP_STALL_THRESHOLD_MS)
+    watchdog = None
+    if settings.LOOP_STALL_THRESHOLD_MS:
+        watchdog = LoopWatchdog(threshold=settings.LOOP_STALL_THRESHOLD_MS / 1000)
+        watchdog.start()
+    # Прогрев кэша справочных таблиц при запуске приложения
+    try:
+        await AC.Dimension.warm_cache()
+    except Exception as e:
+        print(e)
+    # Перезагрузка моделей прогноза при изменении файлов
+    model_watch_task = None
+    if settings.MODEL_WATCH_INTERVAL_S:
+        model_watch_task = asyncio.create_task(model_registry.watch(interval=settings.MODEL_WATCH_INTERVAL_S))
+    # Дообучение модели по расписанию
+    retrain_task = None
+    if settings.RETRAIN_INTERVAL_H:
+        retrain_task = asyncio.create_task(retrain_periodically(interval=settings.RETRAIN_INTERVAL_H * 3600))
+    yield
+    if model_watch_task is not None:
+        model_watch_task.cancel()
+    if retrain_task is not None:
+        retrain_task.cancel()
+    inference_executor.shutdown()
+    await live_watchers.close()
+    await browser_pool.close()
+    if watchdog is not None:
+        watchdog.stop()
+
+
 # @asynccontextmanager
 # async def lifespan(app: FastAPI):
+#     # Прогрев кэша справочных таблиц при запуске приложения
+#     await AC.Dimension.warm_cache()
 #     # Выполнение manage_active_season при первом запуске приложения
 #     await manage_active_season()
 #     # Запуск задач при старте приложения
@@ -30,6 +71,8 @@ from db.schemasDto import * # noqa
 #     scheduler.add_job(manage_active_game, IntervalTrigger(seconds=30))
 #     # Запуск manage_predict_game каждые 180 секунд
 #     scheduler.add_job(manage_predict_game, IntervalTrigger(seconds=30))
+#     # Запуск manage_prematch_game каждые 5 минут (прогноз до начала матча)
+#     scheduler.add_job(manage_prematch_game, IntervalTrigger(minutes=5))
 #     scheduler.start()
 #     yield
 #     # Остановка задач при завершении приложения
@@ -37,7 +80,7 @@ from db.schemasDto import * # noqa
     
 
 # app = FastAPI(lifespan=lifespan)
-app = FastAPI()
+app = FastAPI(lifespan=app_lifespan)
 
 
 origins = [
@@ -119,5 +162,70 @@ async def get_prediction(game_id: int, sort_type: SortName):
         print(e)
 
 
+@app.get('/service/dimension_cache', response_class=JSONResponse, summary='Счетчики кэша справочных таблиц', tags=['Сервис'])
+async def get_dimension_cache_stats():
+    try:
+        return await AC.Dimension.get_cache_stats()
+    except Exception as e:
+        print(e)
+
+
+@app.get('/service/model_registry', response_class=JSONResponse, summary='Загруженные модели прогноза', tags=['Сервис'])
+async def get_model_registry_stats():
+    try:
+        return model_registry.stats()
+    except Exception as e:
+        print(e)
+
+
+@app.get('/service/inference', response_class=JSONResponse, summary='Очередь и задержка прогноза', tags=['Сервис'])
+async def get_inference_stats():
+    try:
+        return {**inference_executor.stats(), 'memo': prediction_memo.stats()}
+    except Exception as e:
+        print(e)
+
+
+@app.get('/service/browser_pool', response_class=JSONResponse, summary='Пул браузеров сбора данных', tags=['Сервис'])
+async def get_browser_pool_stats():
+    try:
+        return browser_pool.stats()
+    except Exception as e:
+        print(e)
+
+
+@app.get('/service/live_watchers', response_class=JSONResponse, summary='Постоянные вкладки активных игр', tags=['Сервис'])
+async def get_live_watchers_stats():
+    try:
+        return live_watchers.stats()
+    except Exception as e:
+        print(e)
+
+
+@app.get('/service/cycles', response_class=JSONResponse, summary='Отчеты последних циклов сбора и прогноза активных игр', tags=['Сервис'])
+async def get_cycle_reports():
+    try:
+        return CYCLE_REPORTS
+    except Exception as e:
+        print(e)
+
+
+@app.post('/service/retrain', response_class=JSONResponse, summary='Запуск дообучения модели прогноза', tags=['Сервис'])
+async def start_retrain(background_tasks: BackgroundTasks, force: bool = False):
+    try:
+        background_tasks.add_task(retrain_model, force=force)
+        return {'started': True}
+    except Exception as e:
+        print(e)
+
+
+@app.get('/service/retrain', response_class=JSONResponse, summary='Результат последнего дообучения модели', tags=['Сервис'])
+async def get_retrain_state():
+    try:
+        return load_retrain_state()['last_run']
+    except Exception as e:
+        print(e)
+
+
 if __name__=='__main__':
     uvicorn.run(app, host='0.0.0.0', port=8000)
\ No newline at end of file
@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from prediction.memo import PredictionMemo
+
+
+class StubModel:
+    """Модель с детерминированным прогнозом по строке признаков и учетом спрогнозированных строк"""
+
+    def __init__(self, version: str = 'v1'):
+        self.version = version
+        self.model = SimpleNamespace(classes_=[0, 1, 2])
+        self.predicted_rows = []
+
+    def _predict_proba(self, data: pd.DataFrame) -> np.ndarray:
+        self.predicted_rows.extend(map(tuple, data.to_numpy()))
+        weights = np.column_stack([data['a'] + 1, data['b'] + 1, data['a'] * data['b'] + 1]).astype(np.float64)
+        return weights / weights.sum(axis=1, keepdims=True)
+
+
+def make_features(rows: list[tuple[int, float]]) -> pd.DataFrame:
+    return pd.DataFrame({'a': np.array([row[0] for row in rows], dtype=np.int64),
+                         'b': np.array([row[1] for row in rows], dtype=np.float64)})
+
+
+class TestPredictionMemo(unittest.TestCase):
+    """Кэш прогноза: повторы строк, порядок результата, версия модели, порядок столбцов и вытеснение LRU"""
+
+    def predict(self, memo: PredictionMemo, model: StubModel, data: pd.DataFrame) -> np.ndarray:
+        predict_proba = asyncio.run(memo.predict_proba(model, data))
+        # результат совпадает с прогнозом модели для каждой строки пачки в исходном порядке
+        np.testing.assert_array_equal(predict_proba, StubModel()._predict_proba(data))
+        return predict_proba
+
+    def test_repeated_rows_scored_once(self):
+        memo, model = PredictionMemo(max_size=100), StubModel()
+        data = make_features([(1, 0.5), (2, 1.5), (1, 0.5), (3, 2.5), (2, 1.5), (1, 0.5)])
+        self.predict(memo, model, data) # порядок строк восстанавливается через inverse
+        self.assertEqual(sorted(model.predicted_rows), [(1, 0.5), (2, 1.5), (3, 2.5)])
+        self.assertEqual((memo.misses, memo.hits), (3, 3))
+
+        # повторная пачка целиком из кэша, новая строка прогнозируется одна
+        model.predicted_rows.clear()
+        self.predict(memo, model, make_features([(3, 2.5), (4, 3.5), (1, 0.5)]))
+        self.assertEqual(model.predicted_rows, [(4, 3.5)])
+        self.assertEqual((memo.misses, memo.hits), (4, 5))
+        self.assertEqual(memo.stats()['size'], 4)
+
+    def test_large_batch_matches_model(self):
+        memo, model = PredictionMemo(max_size=10000), StubModel()
+        rnd = np.random.default_rng(0)
+        rows = list(zip(rnd.integers(0, 20, PredictionMemo.OFFLOAD_ROWS * 2).tolist(), rnd.integers(0, 5, PredictionMemo.OFFLOAD_ROWS * 2) / 2))
+        data = make_features(rows)
+        self.predict(memo, model, data)
+        self.assertEqual(len(model.predicted_rows), len(set(rows)))
+
+    def test_model_version_misses_cache(self):
+        memo = PredictionMemo(max_size=100)
+        data = make_features([(1, 0.5), (2, 1.5)])
+        self.predict(memo, StubModel('v1'), data)
+        model = StubModel('v2')
+        self.predict(memo, model, data)
+        self.assertEqual(len(model.predicted_rows), 2)
+        self.assertEqual((memo.misses, memo.hits), (4, 0))
+
+    def test_column_order_in_key(self):
+        data = make_features([(1, 0.5)])
+        swapped = pd.DataFrame({'b': data['a'].to_numpy().view(np.float64), 'a': data['b'].to_numpy().view(np.int64)})
+        self.assertEqual(data.to_records(index=False).tobytes(), swapped.to_records(index=False).tobytes())
+        self.assertNotEqual(PredictionMemo.get_keys('v1', data)[0], PredictionMemo.get_keys('v1', swapped)[0])
+
+    def test_lru_eviction(self):
+        memo, model = PredictionMemo(max_size=2), StubModel()
+        self.predict(memo, model, make_features([(1, 0.5)]))
+        self.predict(memo, model, make_features([(2, 1.5)]))
+        self.predict(memo, model, make_features([(1, 0.5)])) # 1 - недавно запрошенная строка
+        self.predict(memo, model, make_features([(3, 2.5)])) # вытесняется давно не запрошенная строка 2
+        self.assertEqual(memo.evictions, 1)
+
+        model.predicted_rows.clear()
+        self.predict(memo, model, make_features([(1, 0.5), (3, 2.5), (2, 1.5)]))
+        self.assertEqual(model.predicted_rows, [(2, 1.5)])
+        self.assertEqual(memo.stats(), {
+            'enabled': True,
+            'max_size': 2,
+            'size': 2,
+            'hits': 3,
+            'misses': 4,
+            'evictions': 2,
+            'hit_rate': 3 / 7,
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
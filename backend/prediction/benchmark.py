@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import platform
+import asyncio
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import catboost
+
+from collection.simulation import empty_match_states
+from prediction.model import ModelDrawLeftRight
+from prediction.memo import prediction_memo
+
+
+BATCH_SIZES = (1, 10, 100, 1000, 10000)
+THREAD_COUNTS = (1, 2, 4, -1)
+
+# Метрики, по которым сравнивается с эталонным запуском: путь в результате и направление (больше - лучше или хуже)
+REGRESSION_METRICS = {
+    'cold_load.median_s': 'lower',
+    'single_row.p50_ms': 'lower',
+    'single_row.p99_ms': 'lower',
+    'batch.rows_per_s': 'higher',
+}
+
+
+def synthetic_states(n: int, seed: int = 0) -> np.ndarray:
+    """Синтетические состояния матча с распределениями, близкими к prediction_draw_left_right
+
+    Returns:
+        np.ndarray: Состояния матча (MATCH_STATE_DTYPE)
+    """
+    rng = np.random.default_rng(seed)
+    states = empty_match_states(n)
+    states['game_id'] = rng.integers(1, 3000, n)
+    states['min'] = rng.integers(0, 91, n)
+    states['plus_min'] = np.where(np.isin(states['min'], (45, 90)), rng.integers(0, 8, n), 0)
+    for side in ('left', 'right'):
+        states[f'{side}_coach_id'] = rng.integers(1, 200, n)
+        states[f'{side}_num_v'] = 1
+        states[f'{side}_num_z'] = rng.integers(2, 6, n)
+        states[f'{side}_num_p'] = rng.integers(2, 6, n)
+        states[f'{side}_num_n'] = rng.integers(0, 4, n)
+        states[f'{side}_num_u'] = rng.integers(0, 2, n)
+        states[f'{side}_num_y'] = rng.poisson(1.0, n)
+        states[f'{side}_num_y2r'] = rng.binomial(1, 0.05, n)
+        for goal_type in ('g', 'p', 'a'):
+            states[f'{side}_num_goal_{goal_type}'] = rng.poisson(0.4 if goal_type == 'g' else 0.05, n)
+        states[f'{side}_goal_score'] = (states[f'{side}_num_goal_g'] + states[f'{side}_num_goal_p'] + states[f'{side}_num_goal_a'])
+        states[f'{side}_total_transfer_value'] = rng.lognormal(17, 1, n)
+        states[f'{side}_avg_transfer_value'] = states[f'{side}_total_transfer_value'] / 11
+        states[f'{side}_avg_time_player_in_game'] = rng.uniform(0, 90, n)
+    states['referee_id'] = rng.integers(1, 60, n)
+    states['left_right_transfer_value_div'] = states['left_total_transfer_value'] / states['right_total_transfer_value']
+    states['right_left_transfer_value_div'] = states['right_total_transfer_value'] / states['left_total_transfer_value']
+    states['res_event'] = np.sign(states['left_goal_score'] - states['right_goal_score']) % 3
+    return states
+
+
+def percentiles_ms(latencies_s: list[float]) -> dict:
+    latencies_ms = np.asarray(latencies_s) * 1000
+    return {
+        'n': len(latencies_ms),
+        'mean_ms': float(latencies_ms.mean()),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p90_ms': float(np.percentile(latencies_ms, 90)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'max_ms': float(latencies_ms.max()),
+    }
+
+
+def measure_cold_load(model_path: str, repeat: int) -> dict:
+    """Время загрузки модели из файла (первая загрузка - холодная, с чтением файла с диска)"""
+    load_s = []
+    for _ in range(repeat):
+        start = perf_counter()
+        ModelDrawLeftRight(model_path)
+        load_s.append(perf_counter() - start)
+    return {
+        'first_s': load_s[0],
+        'median_s': float(np.median(load_s)),
+        'file_bytes': os.path.getsize(model_path),
+    }
+
+
+async def measure_single_row(model: ModelDrawLeftRight, states: np.ndarray, warmup: int = 10) -> dict:
+    """Задержка прогноза одной строки через ModelDrawLeftRight.predict (пул прогноза, как в приложении)"""
+    for state in states[:warmup]:
+        await model.predict(state)
+    latencies = []
+    for state in states:
+        start = perf_counter()
+        await model.predict(state)
+        latencies.append(perf_counter() - start)
+    return percentiles_ms(latencies)
+
+
+async def measure_batch(model: ModelDrawLeftRight,
+                        states: np.ndarray,
+                        batch_sizes: tuple[int],
+                        thread_counts: tuple[int],
+                        repeat: int) -> list[dict]:
+    """Пропускная способность пакетного прогноза для каждого размера пачки и числа потоков CatBoost
+
+    Для каждого сочетания измеряется прямой вызов predict_proba; для числа потоков пула прогноза
+    дополнительно измеряется путь приложения predict_states (пул прогноза и отбор признаков).
+    """
+    results = []
+    for batch_size in batch_sizes:
+        batch = states[:batch_size]
+        data = pd.DataFrame({name: batch[name] for name in model.feature_columns})
+        paths = [('predict_proba', thread_count) for thread_count in thread_counts]
+        paths.append(('predict_states', None))
+        for path, thread_count in paths:
+            run_s = []
+            for _ in range(repeat + 1): # первый запуск - прогрев
+                start = perf_counter()
+                if path == 'predict_proba':
+                    model.model.predict_proba(data, thread_count=thread_count)
+                else:
+                    await model.predict_states(batch)
+                run_s.append(perf_counter() - start)
+            median_s = float(np.median(run_s[1:]))
+            results.append({
+                'path': path,
+                'batch_size': batch_size,
+                'thread_count': thread_count,
+                'median_ms': median_s * 1000,
+                'rows_per_s': batch_size / median_s,
+            })
+    return results
+
+
+async def run_benchmark(model_path: str,
+                        batch_sizes: tuple[int] = BATCH_SIZES,
+                        thread_counts: tuple[int] = THREAD_COUNTS,
+                        single_rows: int = 500,
+                        repeat: int = 5,
+                        seed: int = 0) -> dict:
+    """Офлайн-замер скорости прогноза ModelDrawLeftRight на синтетических данных (без БД)
+
+    Args:
+        model_path (str): Путь к файлу модели
+        batch_sizes (tuple[int], optional): Размеры пачек
+        thread_counts (tuple[int], optional): Количество потоков CatBoost (-1 - все ядра)
+        single_rows (int, optional): Количество строк для замера задержки одной строки
+        repeat (int, optional): Количество повторов каждого замера
+        seed (int, optional): Зерно генератора синтетических данных
+
+    Returns:
+        dict: Окружение, время загрузки, задержка одной строки и пропускная способность пачек
+    """
+    memo_max_size, prediction_memo.max_size = prediction_memo.max_size, 0 # замер без кэша прогноза
+    try:
+        cold_load = measure_cold_load(model_path, repeat=repeat)
+        model = ModelDrawLeftRight(model_path)
+        states = synthetic_states(max(max(batch_sizes), single_rows), seed=seed)
+        single_row = await measure_single_row(model, states[:single_rows])
+        batch = await measure_batch(model, states, batch_sizes, thread_counts, repeat=repeat)
+    finally:
+        prediction_memo.max_size = memo_max_size
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'model_version': model.version,
+            'feature_count': len(model.feature_columns),
+            'python': sys.version.split()[0],
+            'catboost': catboost.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': seed,
+        },
+        'cold_load': cold_load,
+        'single_row': single_row,
+        'batch': batch,
+    }
+
+
+def flatten_metrics(result: dict) -> dict[str, tuple[float, str]]:
+    """Метрики для сравнения запусков: имя -> (значение, направление)"""
+    metrics = {}
+    for name, direction in REGRESSION_METRICS.items():
+        section, key = name.split('.')
+        if section == 'batch':
+            for row in result['batch']:
+                metrics[f"batch.{row['path']}.{row['batch_size']}.{row['thread_count']}.{key}"] = (row[key], direction)
+        else:
+            metrics[name] = (result[section][key], direction)
+    return metrics
+
+
+def compare_with_baseline(result: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Ухудшения относительно эталонного запуска больше tolerance (доля)"""
+    current_metrics = flatten_metrics(result)
+    regressions = []
+    for name, (baseline_value, direction) in flatten_metrics(baseline).items():
+        if name not in current_metrics or not baseline_value: continue
+        value = current_metrics[name][0]
+        change = (value - baseline_value) / baseline_value
+        if (direction == 'lower' and change > tolerance) or (direction == 'higher' and change < -tolerance):
+            regressions.append({'metric': name, 'baseline': baseline_value, 'value': value, 'change': change})
+    return regressions
+
+
+def save_result(result: dict, path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+def load_result(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
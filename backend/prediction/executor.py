@@ -0,0 +1,75 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from db.config import settings
+
+
+class InferenceExecutor:
+    """Выделенный пул потоков для прогноза CatBoost
+
+    Прогноз выполняется вне цикла событий и вне общего исполнителя по умолчанию,
+    поэтому пакетный прогноз сезона не занимает потоки, нужные обработчикам API.
+    CatBoost освобождает GIL во время прогноза, поэтому пул потоков (а не процессов)
+    не требует копирования модели в каждый процесс.
+    """
+
+    def __init__(self, max_workers: int, thread_count: int):
+        """
+        Args:
+            max_workers (int): Количество потоков пула
+            thread_count (int): Количество потоков CatBoost на один прогноз (-1 - все ядра)
+        """
+        self.max_workers = max_workers
+        self.thread_count = thread_count
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='inference')
+        self.pending = 0 # задачи в очереди и в работе
+        self.completed = 0
+        self.total_wait_s = 0.0
+        self.total_run_s = 0.0
+        self.max_latency_s = 0.0
+        self.last_latency_s = None
+
+    async def run(self, func, *args):
+        """Выполнение func(*args) в пуле с учетом ожидания в очереди и времени выполнения"""
+        submitted = perf_counter()
+        started = None
+
+        def job():
+            nonlocal started
+            started = perf_counter()
+            return func(*args)
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            finished = perf_counter()
+            self.pending -= 1
+            self.completed += 1
+            if started is not None:
+                self.total_wait_s += started - submitted
+                self.total_run_s += finished - started
+            self.last_latency_s = finished - submitted
+            self.max_latency_s = max(self.max_latency_s, self.last_latency_s)
+
+    def stats(self) -> dict:
+        """Глубина очереди и задержка прогноза"""
+        completed = max(self.completed, 1)
+        return {
+            'max_workers': self.max_workers,
+            'thread_count': self.thread_count,
+            'queue_depth': self.pending,
+            'completed': self.completed,
+            'avg_wait_ms': self.total_wait_s / completed * 1000,
+            'avg_run_ms': self.total_run_s / completed * 1000,
+            'last_latency_ms': None if self.last_latency_s is None else self.last_latency_s * 1000,
+            'max_latency_ms': self.max_latency_s * 1000,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+inference_executor = InferenceExecutor(max_workers=settings.INFERENCE_POOL_SIZE,
+                                       thread_count=settings.INFERENCE_THREAD_COUNT)
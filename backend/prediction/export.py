@@ -0,0 +1,175 @@
+import os
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from db.queries.core import AsyncCore as AC
+from collection.simulation import MATCH_STATE_DTYPE
+
+
+# Состояние выгрузки (файлы с префиксом '_' не читаются как данные набора)
+EXPORT_STATE_FILE = '_export_state.json'
+
+# Запас метки выгрузки: updated_at задается до фиксации транзакции, поэтому строка, зафиксированная
+# после чтения, может иметь более раннее время (повторно выгруженные строки устраняет read_training_set)
+WATERMARK_SAFETY_MARGIN = timedelta(minutes=5)
+
+# Схема файлов выгрузки (season_id - ключ каталога season_id=<...>, в файлы не записывается)
+EXPORT_SCHEMA = pa.schema([
+    ('prediction_id', pa.int64()),
+    *[(name, pa.from_numpy_dtype(MATCH_STATE_DTYPE[name])) for name in MATCH_STATE_DTYPE.names],
+    ('draw_p', pa.float64()),
+    ('left_p', pa.float64()),
+    ('right_p', pa.float64()),
+    ('res_p', pa.int64()),
+    ('res', pa.int64()),
+    ('model_version', pa.string()),
+    ('updated_at', pa.timestamp('us')),
+])
+
+SEASON_PARTITIONING = ds.partitioning(pa.schema([('season_id', pa.string())]), flavor='hive')
+
+FILE_EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrow'}
+
+
+def load_export_state(output_dir: str) -> dict:
+    path = os.path.join(output_dir, EXPORT_STATE_FILE)
+    if not os.path.isfile(path):
+        return {'last_updated_at': None, 'runs': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_export_state(output_dir: str, state: dict):
+    path = os.path.join(output_dir, EXPORT_STATE_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """Пачка строк выгрузки в таблицу Arrow со схемой EXPORT_SCHEMA (NULL сохраняются как пропуски)"""
+    df = df.drop(columns='season_id')
+    for field in EXPORT_SCHEMA:
+        if pa.types.is_integer(field.type):
+            df[field.name] = df[field.name].astype('Int64')
+        elif pa.types.is_floating(field.type):
+            df[field.name] = df[field.name].astype(np.float64)
+    return pa.Table.from_pandas(df, schema=EXPORT_SCHEMA, preserve_index=False)
+
+
+class PartitionWriter:
+    """Запись пачек одного сезона в файл season_id=<season_id>/part-<run_id>.<ext>"""
+
+    def __init__(self, output_dir: str, season_id: str, run_id: str, fmt: str):
+        self.season_id = season_id
+        partition_dir = os.path.join(output_dir, f'season_id={season_id}')
+        os.makedirs(partition_dir, exist_ok=True)
+        self.path = os.path.join(partition_dir, f'part-{run_id}.{FILE_EXTENSIONS[fmt]}')
+        # префикс '_': незавершенный файл не читается как часть набора
+        self.tmp_path = os.path.join(partition_dir, f'_part-{run_id}.tmp')
+        self.rows = 0
+        if fmt == 'parquet':
+            self._writer = pq.ParquetWriter(self.tmp_path, EXPORT_SCHEMA, compression='zstd')
+        else:
+            self._sink = pa.OSFile(self.tmp_path, 'wb')
+            self._writer = pa.ipc.new_file(self._sink, EXPORT_SCHEMA)
+
+    def write(self, table: pa.Table):
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        self._writer.close()
+        if hasattr(self, '_sink'): self._sink.close()
+        os.replace(self.tmp_path, self.path) # файл появляется в наборе только после полной записи
+
+
+async def export_training_set(output_dir: str,
+                              fmt: str = 'parquet',
+                              incremental: bool = True,
+                              chunk_size: int = 50000) -> dict:
+    """Выгрузка prediction_draw_left_right в колоночные файлы по сезонам
+
+    Таблица читается пачками через серверный курсор, каждая пачка сразу дописывается в файл сезона,
+    поэтому потребление памяти не зависит от размера таблицы. При инкрементальной выгрузке читаются
+    только строки, измененные начиная с метки предыдущего запуска (время его начала за вычетом
+    WATERMARK_SAFETY_MARGIN), и записываются новые файлы part-<run_id>; повторно выгруженные строки
+    (например, после прогноза или пересчета) устраняет read_training_set.
+
+    Args:
+        output_dir (str): Каталог выгрузки
+        fmt (str, optional): Формат файлов: 'parquet' или 'arrow' (Arrow IPC)
+        incremental (bool, optional): Выгружать только строки, измененные после предыдущего запуска
+        chunk_size (int, optional): Количество строк в одной пачке
+
+    Returns:
+        dict: Результат запуска (строки и файлы по сезонам)
+    """
+    if fmt not in FILE_EXTENSIONS: raise ValueError(f'Неизвестный формат выгрузки: {fmt}')
+    os.makedirs(output_dir, exist_ok=True)
+    state = load_export_state(output_dir)
+    updated_since = datetime.fromisoformat(state['last_updated_at']) if incremental and state['last_updated_at'] else None
+    run_id = datetime.now().strftime('%Y%m%dT%H%M%S')
+    # метка следующего запуска: время начала чтения по часам, которыми задается updated_at
+    last_updated_at = await AC.get_moscow_datetime_now() - WATERMARK_SAFETY_MARGIN
+
+    writer = None
+    files = {}
+    try:
+        async for df in AC.PredictionDrawLeftRight.stream_prediction_rows(updated_since=updated_since, chunk_size=chunk_size):
+            # строки упорядочены по сезону: одновременно открыт не больше чем один файл
+            for season_id, season_df in df.groupby('season_id', sort=False):
+                if writer is None or writer.season_id != season_id:
+                    if writer is not None:
+                        writer.close()
+                        files[writer.season_id] = {'path': writer.path, 'rows': writer.rows}
+                    writer = PartitionWriter(output_dir, season_id, run_id, fmt)
+                writer.write(to_arrow_table(season_df))
+        if writer is not None:
+            writer.close()
+            files[writer.season_id] = {'path': writer.path, 'rows': writer.rows}
+            writer = None
+    finally:
+        if writer is not None and os.path.exists(writer.tmp_path):
+            os.remove(writer.tmp_path) # незавершенный файл не попадает в набор
+
+    result = {
+        'run_id': run_id,
+        'format': fmt,
+        'updated_since': None if updated_since is None else updated_since.isoformat(),
+        'rows': sum(file['rows'] for file in files.values()),
+        'files': files,
+    }
+    state['last_updated_at'] = last_updated_at.isoformat()
+    state['runs'].append({key: value for key, value in result.items() if key != 'files'})
+    save_export_state(output_dir, state)
+    print(f'Выгрузка обучающего набора: {result["rows"]} строк, сезонов {len(files)}, каталог {output_dir}')
+    return result
+
+
+def read_training_set(output_dir: str, fmt: str = 'parquet', season_ids: list[str] = None, columns: list[str] = None) -> pd.DataFrame:
+    """Чтение выгрузки из локальных файлов (последняя версия каждой строки по prediction_id)
+
+    Args:
+        output_dir (str): Каталог выгрузки
+        fmt (str, optional): Формат файлов: 'parquet' или 'arrow'
+        season_ids (list[str], optional): Только указанные сезоны (читаются только их каталоги)
+        columns (list[str], optional): Только указанные столбцы
+
+    Returns:
+        pd.DataFrame: Строки prediction_draw_left_right со столбцом season_id
+    """
+    dataset = ds.dataset(output_dir, format='ipc' if fmt == 'arrow' else fmt, partitioning=SEASON_PARTITIONING)
+    read_columns = None if columns is None else list(dict.fromkeys([*columns, 'prediction_id', 'updated_at']))
+    filter = None if season_ids is None else ds.field('season_id').isin([str(season_id) for season_id in season_ids])
+    df = dataset.to_table(columns=read_columns, filter=filter).to_pandas()
+    df = df.sort_values('updated_at').drop_duplicates('prediction_id', keep='last')
+    df = df.sort_values(['game_id', 'min', 'plus_min'] if 'game_id' in df else 'prediction_id', ignore_index=True)
+    return df if columns is None else df[columns]
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from prediction.executor import inference_executor
+from db.config import settings
+
+
+class PredictionMemo:
+    """LRU-кэш результатов прогноза по точному вектору признаков
+
+    Ключ - хеш версии модели, имен и байтов строки признаков, поэтому после перезагрузки модели
+    старые результаты не используются (и вытесняются как давно не запрошенные).
+    В пул прогноза передаются только отсутствующие в кэше уникальные строки: одинаковые состояния
+    не прогнозируются повторно ни внутри пачки, ни между пачками.
+    """
+
+    # Количество строк пачки, начиная с которого ключи вычисляются вне цикла событий
+    OFFLOAD_ROWS = 1000
+
+    def __init__(self, max_size: int):
+        """
+        Args:
+            max_size (int): Максимальное количество результатов в кэше (0 - кэш отключен)
+        """
+        self.max_size = max_size
+        self._values: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def get_keys(model_version: str, data: pd.DataFrame) -> tuple[list[bytes], np.ndarray, np.ndarray]:
+        """Ключи уникальных строк признаков: хеш версии модели, имен признаков и байтов строки
+
+        Одинаковые строки пачки объединяются векторно (np.unique), хешируются только уникальные строки.
+
+        Returns:
+            tuple[list[bytes], np.ndarray, np.ndarray]: Ключи уникальных строк, номер первой строки пачки
+                для каждой уникальной строки и номер уникальной строки для каждой строки пачки
+        """
+        records = np.ascontiguousarray(data.to_records(index=False))
+        rows = records.view(np.dtype((np.void, records.dtype.itemsize)))
+        unique_rows, first_rows, inverse = np.unique(rows, return_index=True, return_inverse=True)
+        version_hash = hashlib.blake2b(model_version.encode(), digest_size=16)
+        # имена признаков в ключе: строки с одинаковыми байтами при другом порядке столбцов не совпадают
+        version_hash.update('\x1f'.join(map(str, data.columns)).encode())
+        keys = []
+        for row in unique_rows:
+            row_hash = version_hash.copy()
+            row_hash.update(row.tobytes())
+            keys.append(row_hash.digest())
+        return keys, first_rows, inverse.reshape(-1)
+
+    def _set(self, key: bytes, value: np.ndarray):
+        self._values[key] = value
+        if len(self._values) > self.max_size:
+            self._values.popitem(last=False)
+            self.evictions += 1
+
+    async def predict_proba(self, model, data: pd.DataFrame) -> np.ndarray:
+        """Вероятности исходов для строк data: из кэша или одним вызовом модели для новых строк
+
+        Ключи больших пачек (от OFFLOAD_ROWS строк) вычисляются в отдельном потоке, в цикле событий
+        выполняется только поиск уникальных ключей в кэше.
+
+        Args:
+            model (ModelDrawLeftRight): Модель прогноза
+            data (pd.DataFrame): Признаки в порядке модели
+
+        Returns:
+            np.ndarray: Вероятности (N x число классов)
+        """
+        if len(data) >= self.OFFLOAD_ROWS:
+            keys, first_rows, inverse = await asyncio.to_thread(self.get_keys, model.version, data)
+        else:
+            keys, first_rows, inverse = self.get_keys(model.version, data)
+        unique_proba = np.empty((len(keys), len(model.model.classes_)), dtype=np.float64)
+        missing = [] # уникальные строки, отсутствующие в кэше
+        for i, key in enumerate(keys):
+            value = self._values.get(key)
+            if value is None:
+                missing.append(i)
+            else:
+                self._values.move_to_end(key)
+                unique_proba[i] = value
+        # повтор строки внутри пачки прогнозируется один раз и считается попаданием
+        self.misses += len(missing)
+        self.hits += len(data) - len(missing)
+
+        if missing:
+            missing_proba = await inference_executor.run(model._predict_proba, data.iloc[first_rows[missing]])
+            unique_proba[missing] = missing_proba
+            for i, value in zip(missing, missing_proba):
+                self._set(keys[i], value)
+        return unique_proba[inverse]
+
+    def clear(self):
+        self._values.clear()
+
+    def stats(self) -> dict:
+        """Размер кэша и доля попаданий"""
+        requests = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'max_size': self.max_size,
+            'size': len(self._values),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / requests if requests else None,
+        }
+
+
+prediction_memo = PredictionMemo(max_size=settings.PREDICTION_MEMO_SIZE)
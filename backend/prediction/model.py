@@ -8,10 +8,18 @@ project_root = os.path.abspath(os.path.join(current_dir, '..'))
 sys.path.append(project_root)
 
 
+import hashlib
+
 import numpy as np
-from catboost import CatBoostClassifier, Pool
+import pandas as pd
+from catboost import CatBoostClassifier
 import asyncio
 
+from collection.features import FEATURE_COLUMNS, MODEL_FEATURE_COLUMNS
+from prediction.executor import inference_executor
+from prediction.memo import prediction_memo
+
+
 class ModelDrawLeftRight:
     
     def __init__(self, model_path: str = os.path.join(current_dir, 'model_cbc_without_goals')):
@@ -25,6 +33,7 @@ class ModelDrawLeftRight:
         }
         self.model_path = model_path
         self.model = self._load_model()
+        self.version = self._get_version()
 
     def _load_model(self):
         """Загрузка модели из файла"""
@@ -32,206 +41,59 @@ class ModelDrawLeftRight:
         model.load_model(self.model_path)
         return model
     
-    async def predict(self,
-                    left_coach_id: int,
-                    right_coach_id: int,
-                    referee_id: int,
-                    left_num_v: int,
-                    left_num_z: int,
-                    left_num_p: int,
-                    left_num_n: int,
-                    left_num_u: int,
-                    right_num_v: int,
-                    right_num_z: int,
-                    right_num_p: int,
-                    right_num_n: int,
-                    right_num_u: int,
-                    left_num_y: int,
-                    left_num_y2r: int,
-                    right_num_y: int,
-                    right_num_y2r: int,
-                    right_num_goal_g: int,
-                    right_num_goal_p: int,
-                    right_num_goal_a: int,
-                    left_num_goal_g: int,
-                    left_num_goal_p: int,
-                    left_num_goal_a: int,
-                    left_total_transfer_value: float,
-                    right_total_transfer_value: float,
-                    left_avg_transfer_value: float,
-                    right_avg_transfer_value: float,
-                    left_goal_score: int,
-                    right_goal_score: int,
-                    left_avg_time_player_in_game: float,
-                    right_avg_time_player_in_game: float,
-                    left_right_transfer_value_div: float,
-                    right_left_transfer_value_div: float,
-                    res_event: int):
-        data = [
-            #left_coach_id,
-            #right_coach_id,
-            #referee_id,
-            #left_num_v,
-            left_num_z,
-            left_num_p,
-            left_num_n,
-            #left_num_u,
-            #right_num_v,
-            right_num_z,
-            right_num_p,
-            right_num_n,
-            #right_num_u,
-            left_num_y,
-            left_num_y2r,
-            right_num_y,
-            right_num_y2r,
-            #right_num_goal_g,
-            #right_num_goal_p,
-            #right_num_goal_a,
-            #left_num_goal_g,
-            #left_num_goal_p,
-            #left_num_goal_a,
-            left_total_transfer_value,
-            right_total_transfer_value,
-            left_avg_transfer_value,
-            right_avg_transfer_value,
-            #left_goal_score,
-            #right_goal_score,
-            left_avg_time_player_in_game,
-            right_avg_time_player_in_game,
-            left_right_transfer_value_div,
-            right_left_transfer_value_div,
-            #res_event
-        ]
-        predict_proba = self.model.predict_proba(data)
-        draw_p, left_p, right_p = predict_proba[0], predict_proba[1], predict_proba[2]
-        res_p = self.model.predict(data)
-        print(draw_p, left_p, right_p, res_p[0])
-        return float(draw_p), float(left_p), float(right_p), int(res_p[0])
+    def _get_version(self) -> str:
+        """Версия модели: имя файла и начало хеша его содержимого"""
+        with open(self.model_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        return f'{os.path.basename(self.model_path)}:{digest[:12]}'
     
-    async def train(self,
-                    left_coach_id: int,
-                    right_coach_id: int,
-                    referee_id: int,
-                    left_num_v: int,
-                    left_num_z: int,
-                    left_num_p: int,
-                    left_num_n: int,
-                    left_num_u: int,
-                    right_num_v: int,
-                    right_num_z: int,
-                    right_num_p: int,
-                    right_num_n: int,
-                    right_num_u: int,
-                    left_num_y: int,
-                    left_num_y2r: int,
-                    right_num_y: int,
-                    right_num_y2r: int,
-                    right_num_goal_g: int,
-                    right_num_goal_p: int,
-                    right_num_goal_a: int,
-                    left_num_goal_g: int,
-                    left_num_goal_p: int,
-                    left_num_goal_a: int,
-                    left_total_transfer_value: float,
-                    right_total_transfer_value: float,
-                    left_avg_transfer_value: float,
-                    right_avg_transfer_value: float,
-                    left_goal_score: int,
-                    right_goal_score: int,
-                    left_avg_time_player_in_game: float,
-                    right_avg_time_player_in_game: float,
-                    left_right_transfer_value_div: float,
-                    right_left_transfer_value_div: float,
-                    res_event: int,
-                    res: int):
-        
-        train_data = [
-            [
-                left_coach_id,
-                right_coach_id,
-                referee_id,
-                left_num_v,
-                left_num_z,
-                left_num_p,
-                left_num_n,
-                left_num_u,
-                right_num_v,
-                right_num_z,
-                right_num_p,
-                right_num_n,
-                right_num_u,
-                left_num_y,
-                left_num_y2r,
-                right_num_y,
-                right_num_y2r,
-                right_num_goal_g,
-                right_num_goal_p,
-                right_num_goal_a,
-                left_num_goal_g,
-                left_num_goal_p,
-                left_num_goal_a,
-                left_total_transfer_value,
-                right_total_transfer_value,
-                left_avg_transfer_value,
-                right_avg_transfer_value,
-                left_goal_score,
-                right_goal_score,
-                left_avg_time_player_in_game,
-                right_avg_time_player_in_game,
-                left_right_transfer_value_div,
-                right_left_transfer_value_div,
-                res_event
-            ]
-        ]
-        target = [[res]]
-
-        # Асинхронное выполнение обучения
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None, 
-            self._train_model, 
-            train_data, 
-            target
-        )
-
+    @property
+    def feature_columns(self) -> list[str]:
+        """Порядок признаков модели (имена признаков состояния матча)"""
+        feature_names = list(self.model.feature_names_ or [])
+        if feature_names and all(name in FEATURE_COLUMNS for name in feature_names):
+            return feature_names
+        return MODEL_FEATURE_COLUMNS
+    
+    async def predict(self, state) -> tuple[float, float, float, int]:
+        """Прогноз для одного состояния матча
 
-    def _validate_data(self, X, y):
-        if len(X) == 0 or len(y) == 0:
-            raise ValueError("Empty training data")
-        if np.isnan(X).any() or np.isnan(y).any():
-            raise ValueError("NaN values in data")
+        Args:
+            state: Состояние матча (строка структурированного массива или dict с признаками модели)
 
+        Returns:
+            tuple[float, float, float, int]: Вероятности ничьей, победы левой и правой команды и прогнозируемый исход
+        """
+        data = pd.DataFrame({name: [state[name]] for name in self.feature_columns})
+        predict_proba, res_p = await self._predict_frame(data)
+        draw_p, left_p, right_p = predict_proba[0]
+        return float(draw_p), float(left_p), float(right_p), int(res_p[0])
+    
+    async def predict_states(self, states: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Прогноз для всех состояний матча одним вызовом модели
 
-    def _train_model(self, X, y):
-        """Синхронное выполнение дообучения модели"""
-        try:
-            train_pool = Pool(
-                data=X,
-                label=y
-            )
-            
-            self._validate_data(X, y)
+        Args:
+            states (np.ndarray): Состояния матча (MATCH_STATE_DTYPE)
 
-            print('model X', X)
-            print('model y', y)
-            
-            # Продолжаем обучение существующей модели
-            self.model.fit(
-                train_pool,
-                eval_set=(X, y),
-                init_model=self.model,  # Используем текущую модель как базовую
-                use_best_model=False,            # Отключаем вывод логов
-            )
-            # Анализ результатов
-            print("Feature importances:", self.model.get_feature_importance())
-            print("Feature names:", self.model.feature_names_)
-            
-            # Сохраняем обновленную модель
-            self.model.save_model(self.model_path+'123')
-                        
-            
-        except Exception as e:
-            print(f"Ошибка при дообучении модели: {str(e)}")
-            # Восстанавливаем исходную модель в случае ошибки
-            self._load_model()
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Вероятности (N x 3: ничья, победа левой, победа правой) и прогнозируемый исход (N)
+        """
+        # признаки выбираются по именам в порядке модели (целочисленные признаки остаются целочисленными)
+        data = pd.DataFrame({name: states[name] for name in self.feature_columns})
+        return await self._predict_frame(data)
+    
+    async def _predict_frame(self, data: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        """Прогноз в пуле прогноза (не блокирует цикл событий), при включенном кэше - только для новых векторов признаков"""
+        if prediction_memo.enabled:
+            predict_proba = await prediction_memo.predict_proba(self, data)
+        else:
+            predict_proba = await inference_executor.run(self._predict_proba, data)
+        return predict_proba, self._get_res_p(predict_proba)
+    
+    def _predict_proba(self, data: pd.DataFrame) -> np.ndarray:
+        """Синхронное выполнение прогноза для матрицы признаков (один вызов predict_proba)"""
+        return self.model.predict_proba(data, thread_count=inference_executor.thread_count)
+    
+    def _get_res_p(self, predict_proba: np.ndarray) -> np.ndarray:
+        """Прогнозируемый исход - класс с наибольшей вероятностью"""
+        return np.asarray(self.model.classes_)[np.argmax(predict_proba, axis=1)].astype(np.int64)
@@ -0,0 +1,119 @@
+import os
+import asyncio
+from time import perf_counter
+
+import psutil
+
+from prediction.model import ModelDrawLeftRight
+from db.config import settings
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+class ModelRegistry:
+    """Реестр моделей процесса: каждая модель загружается из файла один раз и используется всеми корутинами
+
+    Прогноз CatBoost не изменяет модель, поэтому один экземпляр безопасно использовать
+    из нескольких корутин (и потоков исполнителя). Для дообучения берется отдельная копия (load_private).
+    
+    При изменении файла загруженной модели (watch) новая модель загружается в фоне и подменяет
+    старую одной операцией присваивания: прогнозы, уже получившие старый экземпляр, завершаются на нем.
+    """
+
+    def __init__(self, active_model_name: str, models_dir: str = current_dir):
+        self.models_dir = models_dir
+        self.active_model_name = active_model_name
+        self._paths: dict[str, str] = {}
+        self._models: dict[str, ModelDrawLeftRight] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._mtimes: dict[str, float] = {}
+        self.load_stats: dict[str, dict] = {}
+
+    def register(self, name: str, model_path: str):
+        """Регистрация модели с явным путем к файлу (по умолчанию файл name в каталоге models_dir)"""
+        self._paths[name] = model_path
+
+    def get_model_path(self, name: str) -> str:
+        return self._paths.get(name, os.path.join(self.models_dir, name))
+
+    def set_active(self, name: str):
+        """Выбор активной модели (используется get без имени)"""
+        if not os.path.isfile(self.get_model_path(name)):
+            raise FileNotFoundError(f'Файл модели {name} не найден: {self.get_model_path(name)}')
+        self.active_model_name = name
+
+    async def get(self, name: str = None) -> ModelDrawLeftRight:
+        """Модель по имени (по умолчанию активная), загружается при первом обращении"""
+        name = name or self.active_model_name
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        # одна загрузка на модель, даже если к ней одновременно обращаются несколько корутин
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            model = self._models.get(name)
+            if model is None:
+                model = await asyncio.to_thread(self._load, name)
+                self._models[name] = model
+        return model
+
+    async def load_private(self, name: str = None) -> ModelDrawLeftRight:
+        """Отдельный (не разделяемый) экземпляр модели, например для дообучения"""
+        return await asyncio.to_thread(ModelDrawLeftRight, self.get_model_path(name or self.active_model_name))
+
+    def unload(self, name: str = None):
+        self._models.pop(name or self.active_model_name, None)
+
+    async def reload(self, name: str = None) -> ModelDrawLeftRight:
+        """Загрузка новой версии модели в фоне и атомарная подмена загруженной"""
+        name = name or self.active_model_name
+        model = await asyncio.to_thread(self._load, name)
+        self._models[name] = model
+        return model
+
+    async def watch(self, interval: float):
+        """Отслеживание изменения файлов активной и загруженных моделей (перезагрузка при изменении)"""
+        print(f'Отслеживание файлов моделей запущено: каталог {self.models_dir}, период {interval} с')
+        while True:
+            await asyncio.sleep(interval)
+            for name in {self.active_model_name, *self._models}:
+                if name not in self._models: continue
+                try:
+                    if os.path.getmtime(self.get_model_path(name)) == self._mtimes.get(name): continue
+                    previous_version = self._models[name].version
+                    model = await self.reload(name)
+                    print(f'Модель {name} перезагружена: {previous_version} -> {model.version}')
+                except Exception as e:
+                    # файл может быть еще не дописан - старая модель остается, повтор на следующей проверке
+                    print(f'Ошибка перезагрузки модели {name}: {e}')
+
+    def _load(self, name: str) -> ModelDrawLeftRight:
+        model_path = self.get_model_path(name)
+        mtime = os.path.getmtime(model_path)
+        process = psutil.Process()
+        rss_before = process.memory_info().rss
+        start = perf_counter()
+        model = ModelDrawLeftRight(model_path)
+        self._mtimes[name] = mtime
+        self.load_stats[name] = {
+            'model_path': model_path,
+            'version': model.version,
+            'load_s': perf_counter() - start,
+            'memory_bytes': max(process.memory_info().rss - rss_before, 0),
+            'file_bytes': os.path.getsize(model_path),
+        }
+        print(f'Модель {name} загружена: {self.load_stats[name]}')
+        return model
+
+    def stats(self) -> dict:
+        """Активная модель, загруженные модели, время загрузки и занимаемая память"""
+        return {
+            'active_model_name': self.active_model_name,
+            'loaded': list(self._models),
+            'models': self.load_stats,
+        }
+
+
+model_registry = ModelRegistry(active_model_name=settings.ACTIVE_MODEL_NAME)
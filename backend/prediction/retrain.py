@@ -0,0 +1,202 @@
+import os
+import json
+import shutil
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostClassifier, Pool
+
+from db.queries.core import AsyncCore as AC
+from db.config import settings
+from prediction.registry import model_registry, current_dir
+
+
+# Состояние дообучения: игры, уже рассмотренные запусками (и вошедшие в принятую модель),
+# постоянная проверочная выборка и результат последнего запуска
+RETRAIN_STATE_PATH = os.path.join(current_dir, 'retrain_state.json')
+
+# Один запуск дообучения на процесс (по расписанию и по запросу)
+retrain_lock = asyncio.Lock()
+
+
+def load_retrain_state(path: str = RETRAIN_STATE_PATH) -> dict:
+    state = {'trained_game_ids': [], 'evaluated_game_ids': [], 'holdout_game_ids': [], 'last_run': None}
+    if os.path.isfile(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            state.update(json.load(f))
+    return state
+
+
+def save_retrain_state(state: dict, path: str = RETRAIN_STATE_PATH):
+    # запись во временный файл и замена: состояние не повреждается при прерывании
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def split_holdout(game_ids: np.ndarray, holdout_share: float, seed: int = 0) -> np.ndarray:
+    """Маска проверочных строк: в проверку попадают игры целиком (состояния одной игры не разделяются)"""
+    unique_game_ids = np.unique(game_ids)
+    rng = np.random.default_rng(seed)
+    holdout_count = max(1, int(round(len(unique_game_ids) * holdout_share)))
+    holdout_game_ids = rng.choice(unique_game_ids, size=holdout_count, replace=False)
+    return np.isin(game_ids, holdout_game_ids)
+
+
+def evaluate(model: CatBoostClassifier, X: pd.DataFrame, y: np.ndarray) -> dict:
+    """Качество модели на проверочной выборке: мультиклассовая логистическая функция потерь и точность"""
+    predict_proba = model.predict_proba(X)
+    classes = np.asarray(model.classes_).astype(np.int64)
+    true_index = np.searchsorted(classes, y)
+    p = np.clip(predict_proba[np.arange(len(y)), true_index], 1e-15, 1)
+    return {
+        'log_loss': float(-np.log(p).mean()),
+        'accuracy': float((classes[np.argmax(predict_proba, axis=1)] == y).mean()),
+    }
+
+
+def fit_candidate(model_path: str,
+                  candidate_path: str,
+                  X_train: pd.DataFrame,
+                  y_train: np.ndarray,
+                  X_holdout: pd.DataFrame,
+                  y_holdout: np.ndarray,
+                  iterations: int) -> dict:
+    """Дообучение модели одним вызовом fit и проверка на отложенных играх (выполняется в отдельном процессе)
+
+    Новая модель сохраняется в candidate_path, исходный файл модели не изменяется.
+
+    Returns:
+        dict: Качество текущей и новой модели на проверочной выборке, время обучения
+    """
+    base_model = CatBoostClassifier()
+    base_model.load_model(model_path)
+    cat_features = base_model.get_cat_feature_indices()
+
+    candidate_model = CatBoostClassifier(
+        iterations=iterations,
+        loss_function='MultiClass',
+        class_names=list(base_model.classes_),
+        verbose=False,
+    )
+    start = perf_counter()
+    candidate_model.fit(
+        Pool(data=X_train, label=y_train, cat_features=cat_features),
+        init_model=base_model, # продолжение обучения текущей модели
+    )
+    fit_s = perf_counter() - start
+    candidate_model.save_model(candidate_path)
+
+    return {
+        'current': evaluate(base_model, X_holdout, y_holdout),
+        'candidate': evaluate(candidate_model, X_holdout, y_holdout),
+        'fit_s': fit_s,
+    }
+
+
+async def retrain_model(game_ids: list[int] = None, force: bool = False) -> dict:
+    """Дообучение активной модели на новых оконченных играх
+
+    Все состояния новых игр загружаются одним запросом и образуют один обучающий набор,
+    модель обучается один раз в отдельном процессе. Каждая игра рассматривается одним запуском
+    независимо от того, принята ли новая модель, поэтому стоимость обучения платится один раз на пачку
+    новых игр. Часть новых игр навсегда добавляется в постоянную проверочную выборку (на ней не обучается
+    ни одна модель), новая модель сравнивается с текущей на всей проверочной выборке. Новая модель заменяет
+    файл активной модели (предыдущая версия сохраняется рядом с суффиксом .prev) только если
+    логистическая функция потерь ниже, чем у текущей модели; замена файла подхватывается
+    перезагрузкой модели в реестре.
+
+    Args:
+        game_ids (list[int], optional): Игры для обучения (по умолчанию - все оконченные игры, еще не рассмотренные запусками)
+        force (bool, optional): Запуск даже при количестве новых игр меньше RETRAIN_MIN_GAMES (но не меньше двух)
+
+    Returns:
+        dict: Результат запуска (игры, строки, качество моделей, принята ли новая модель;
+            для пропущенного запуска - skipped и причина). Сохраняется в состоянии дообучения как last_run
+    """
+    async with retrain_lock:
+        state = load_retrain_state()
+        holdout_game_ids = set(state['holdout_game_ids'])
+        if game_ids is None:
+            evaluated_game_ids = set(state['evaluated_game_ids']) | set(state['trained_game_ids']) | holdout_game_ids
+            game_ids = [game_id for game_id in await AC.PredictionDrawLeftRight.get_finished_prediction_game_id()
+                        if game_id not in evaluated_game_ids]
+        else:
+            game_ids = [game_id for game_id in game_ids if game_id not in holdout_game_ids]
+        # для проверки нужна хотя бы одна отложенная игра, поэтому меньше двух игр не обучается даже при force
+        if len(game_ids) < 2 or (len(game_ids) < settings.RETRAIN_MIN_GAMES and not force):
+            result = {
+                'games': len(game_ids),
+                'accepted': False,
+                'skipped': True,
+                'reason': f'новых игр {len(game_ids)}, минимум {2 if force else settings.RETRAIN_MIN_GAMES}',
+                'finished_at': str(await AC.get_moscow_datetime_now()),
+            }
+            state['last_run'] = result
+            save_retrain_state(state)
+            print(f'Дообучение пропущено: {result["reason"]}')
+            return result
+
+        # часть новых игр пополняет постоянную проверочную выборку, остальные - обучающий набор
+        new_game_ids = np.asarray(game_ids, dtype=np.int64)
+        new_holdout = split_holdout(new_game_ids, settings.RETRAIN_HOLDOUT_SHARE)
+        holdout_game_ids |= {int(game_id) for game_id in new_game_ids[new_holdout]}
+        train_game_ids = [int(game_id) for game_id in new_game_ids[~new_holdout]]
+
+        row_game_ids, states, res = await AC.PredictionDrawLeftRight.get_attributes_train_bulk(game_ids=train_game_ids + sorted(holdout_game_ids))
+        model_left_draw_right = await model_registry.get()
+        X = pd.DataFrame({name: states[name] for name in model_left_draw_right.feature_columns})
+        holdout = np.isin(row_game_ids, list(holdout_game_ids))
+
+        model_path = model_left_draw_right.model_path
+        candidate_path = model_path + '.candidate'
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            metrics = await loop.run_in_executor(executor, fit_candidate,
+                                                 model_path, candidate_path,
+                                                 X[~holdout], res[~holdout],
+                                                 X[holdout], res[holdout],
+                                                 settings.RETRAIN_ITERATIONS)
+
+        accepted = metrics['candidate']['log_loss'] < metrics['current']['log_loss']
+        if accepted:
+            shutil.copy2(model_path, model_path + '.prev')
+            os.replace(candidate_path, model_path) # атомарная замена файла модели
+            model = await model_registry.reload()
+            state['trained_game_ids'] = sorted(set(state['trained_game_ids']) | set(train_game_ids))
+        else:
+            os.remove(candidate_path)
+            model = model_left_draw_right
+        # игры запуска рассмотрены и при отклонении новой модели: следующий запуск обучается только на новых играх
+        state['evaluated_game_ids'] = sorted(set(state['evaluated_game_ids']) | set(train_game_ids))
+        state['holdout_game_ids'] = sorted(holdout_game_ids)
+
+        result = {
+            'games': len(game_ids),
+            'games_train': len(train_game_ids),
+            'games_holdout': len(holdout_game_ids),
+            'rows_train': int((~holdout).sum()),
+            'rows_holdout': int(holdout.sum()),
+            **metrics,
+            'accepted': accepted,
+            'model_version': model.version,
+            'finished_at': str(await AC.get_moscow_datetime_now()),
+        }
+        state['last_run'] = result
+        save_retrain_state(state)
+        print(f'Дообучение модели: {result}')
+        return result
+
+
+async def retrain_periodically(interval: float):
+    """Дообучение модели по расписанию (interval, с)"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await retrain_model()
+        except Exception as e:
+            print(f'Ошибка дообучения модели: {e}')
@@ -8,9 +8,16 @@ project_root = os.path.abspath(os.path.join(current_dir, '..'))
 sys.path.append(project_root)
 
 import asyncio
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
 
 from db.queries.core import AsyncCore as AC
-from prediction.model import ModelDrawLeftRight #from model import ModelDrawLeftRight
+from prediction.registry import model_registry
+from collection.simulation import simulate_match_bundle, empty_match_states
+from collection.utils import insert_prematch_game_info_db, run_game_cycle
+from db.config import settings
 
 
 async def check_predict_game_in_db():
@@ -21,28 +28,69 @@ async def check_predict_game_in_db():
     return predict_game_id
 
 
+async def predict_games_batch(game_ids: list[int], rescore_outdated: bool = False) -> tuple[np.ndarray, np.ndarray, np.ndarray, str]:
+    """Прогноз всех непрогнозированных состояний нескольких игр: один запрос, одна матрица признаков, один вызов модели
+
+    Модель берется из реестра один раз на пачку: при перезагрузке модели во время прогноза
+    пачка целиком рассчитывается и помечается одной версией.
+
+    Args:
+        game_ids (list[int]): Уникальные идентификаторы игр
+        rescore_outdated (bool, optional): Дополнительно пересчитать состояния, спрогнозированные устаревшей версией модели
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, str]: Идентификаторы прогнозов, вероятности (N x 3: ничья, левая, правая),
+            прогнозируемый исход и версия модели
+    """
+    model_left_draw_right = await model_registry.get() # модель загружается один раз на процесс
+    prediction_ids, states = await AC.PredictionDrawLeftRight.get_unpredicted_states(
+        game_ids=game_ids,
+        outdated_model_version=model_left_draw_right.version if rescore_outdated else None
+    )
+    if len(states) == 0:
+        return prediction_ids, np.empty((0, 3)), np.empty(0, dtype=np.int64), model_left_draw_right.version
+    predict_proba, res_p = await model_left_draw_right.predict_states(states)
+    return prediction_ids, predict_proba, res_p, model_left_draw_right.version
+
+
+async def predict_games(game_ids: list[int], chunk_size: int = 200, rescore_outdated: bool = False) -> int:
+    """Прогноз и сохранение всех непрогнозированных состояний игр (по два запроса на пачку игр)
+
+    Args:
+        game_ids (list[int]): Уникальные идентификаторы игр
+        chunk_size (int, optional): Количество игр в одной пачке (по умолчанию 200)
+        rescore_outdated (bool, optional): Дополнительно пересчитать состояния, спрогнозированные устаревшей версией модели
+
+    Returns:
+        int: Количество сохраненных прогнозов
+    """
+    updated = 0
+    for i in range(0, len(game_ids), chunk_size):
+        prediction_ids, predict_proba, res_p, model_version = await predict_games_batch(game_ids=game_ids[i:i + chunk_size],
+                                                                                        rescore_outdated=rescore_outdated)
+        updated += await AC.PredictionDrawLeftRight.update_prediction_bulk(prediction_ids=prediction_ids,
+                                                                           predict_proba=predict_proba,
+                                                                           res_p=res_p,
+                                                                           model_version=model_version)
+    print(f'Сохранено прогнозов для {len(game_ids)} игр: {updated}')
+    return updated
+
+
+async def rescore_outdated_predictions(chunk_size: int = 200) -> int:
+    """Пересчет только тех прогнозов, которые рассчитаны не текущей версией активной модели
+
+    Returns:
+        int: Количество пересчитанных прогнозов
+    """
+    model_left_draw_right = await model_registry.get()
+    game_ids = await AC.PredictionDrawLeftRight.get_outdated_prediction_game_id(model_version=model_left_draw_right.version)
+    print(f'Игры с прогнозами устаревших версий модели (текущая {model_left_draw_right.version}): {len(game_ids)}')
+    return await predict_games(game_ids=list(game_ids), chunk_size=chunk_size, rescore_outdated=True)
+
+
 async def predict_game(game_id: int):
-    prediction_id_list = await AC.PredictionDrawLeftRight.get_unpredicted_prediction_id(game_id=game_id)
-    print(f'get_unpredicted_prediction_id {prediction_id_list}')
-    for prediction_id in prediction_id_list:
-        print(f'{prediction_id=}')
-        model_left_draw_right = ModelDrawLeftRight()
-        attributes = await AC.PredictionDrawLeftRight.get_attributes_prediction(prediction_id=prediction_id)
-        draw_p, left_p, right_p, res_p = await model_left_draw_right.predict(*attributes)
-        await AC.PredictionDrawLeftRight.update_prediction(prediction_id=prediction_id,
-                                                           draw_p=draw_p,
-                                                           left_p=left_p,
-                                                           right_p=right_p,
-                                                           res_p=res_p)        
+    await predict_games(game_ids=[game_id])
     
-async def train_model(game_id: int):
-    
-    attributes_list = await AC.PredictionDrawLeftRight.get_attributes_train(game_id=game_id)
-    for attributes in attributes_list:
-        model_left_draw_right = ModelDrawLeftRight()
-        print(*attributes, 'Атрибуты для обучения')
-        await model_left_draw_right.train(*attributes)
-
 async def insert_predict_game_into_db(game_id: int):
     
     game_status_id = await AC.Game.get_game_status_id_by_game_id(game_id=game_id)
@@ -53,21 +101,162 @@ async def insert_predict_game_into_db(game_id: int):
     if AC.GAME_STATUS_DICT[game_status_id_played_not_predicted] != 'окончен, не спрогнозирован': raise Exception('Идентификатор не спрогнозированного матча был изменен')
     
     await predict_game(game_id=game_id)
+    await finish_predicted_game(game_id=game_id, game_status_id=game_status_id)
+
+async def finish_predicted_game(game_id: int, game_status_id: int):
+    """Завершение обработки оконченной игры после прогноза (статус определяется до прогноза)"""
+    game_status_id_played_not_predicted = 5
+    if AC.GAME_STATUS_DICT[game_status_id_played_not_predicted] != 'окончен, не спрогнозирован': raise Exception('Идентификатор не спрогнозированного матча был изменен')
     
     if game_status_id == game_status_id_played_not_predicted:
         await AC.PredictionDrawLeftRight.set_res(game_id=game_id) # Расчитываем результат игры по всем событиям
-        # await train_model(game_id=game_id)
         await AC.Game.set_game_status_id_played_by_game_id(game_id=game_id) # Обновляем статус игры как "окончена (проанализирована)"
 
+async def predict_and_finish_game(game_id: int, game_status_id: int):
+    """Прогноз одной игры и завершение ее обработки (если пакетный прогноз цикла не удался)"""
+    await predict_games(game_ids=[game_id])
+    await finish_predicted_game(game_id=game_id, game_status_id=game_status_id)
+
 async def manage_predict_game():
     predict_game_id = await check_predict_game_in_db()    
-    tasks = []
     print(f'Выявленные игры для прогноза manage_predict_game: {predict_game_id}')
-    for game_id in predict_game_id:
-        task = asyncio.create_task(insert_predict_game_into_db(game_id=game_id))
-        tasks.append(task)
-    res = await asyncio.gather(*tasks)
-    return res
+    # статусы фиксируются до прогноза: игра, оконченная во время прогноза, завершается в следующем цикле
+    game_status_ids = await asyncio.gather(*(AC.Game.get_game_status_id_by_game_id(game_id=game_id) for game_id in predict_game_id))
+    game_status_id_by_game_id = dict(zip(predict_game_id, game_status_ids))
+    # все игры прогнозируются пакетно: один запрос чтения и один запрос записи на пачку игр
+    start = perf_counter()
+    batch_status, batch_error = 'ok', None
+    try:
+        await asyncio.wait_for(predict_games(game_ids=list(predict_game_id)), timeout=settings.LIVE_GAME_TIMEOUT_S)
+    except TimeoutError:
+        batch_status, batch_error = 'timeout', f'превышен тайм-аут {settings.LIVE_GAME_TIMEOUT_S} с'
+    except Exception as e:
+        batch_status, batch_error = 'error', repr(e)
+    predict_s = perf_counter() - start
+    if batch_status == 'ok':
+        finish_game = lambda game_id: finish_predicted_game(game_id=game_id, game_status_id=game_status_id_by_game_id[game_id])
+    else:
+        # ошибка одной игры не должна останавливать остальные: каждая игра прогнозируется отдельно
+        # (уже сохраненные пачкой прогнозы повторно не рассчитываются)
+        print(f'Ошибка пакетного прогноза manage_predict_game ({batch_status}): {batch_error}, прогноз по играм')
+        finish_game = lambda game_id: predict_and_finish_game(game_id=game_id, game_status_id=game_status_id_by_game_id[game_id])
+    report = await run_game_cycle(cycle_name='manage_predict_game',
+                                  game_ids=list(predict_game_id),
+                                  func=finish_game,
+                                  max_concurrency=settings.LIVE_MAX_CONCURRENCY,
+                                  timeout=settings.LIVE_GAME_TIMEOUT_S)
+    report['predict_s'] = predict_s
+    report['total_s'] += predict_s
+    report['batch'] = {'status': batch_status, 'seconds': predict_s, 'error': batch_error}
+    print(f'Пакетный прогноз manage_predict_game: {batch_status} {predict_s:.1f} с')
+    return report
+
+
+async def manage_prematch_game():
+    """Прогноз до начала матча: начальное состояние и его прогноз для игр, которые скоро начнутся и составы которых известны"""
+    current_season_id: str = await AC.Season.get_current_season_id()
+    upcoming_games = await AC.Game.get_upcoming_season_game_id(season_id=current_season_id,
+                                                               window_minutes=settings.PREMATCH_WINDOW_MIN)
+    print(f'Выявленные игры для прогноза до начала матча manage_prematch_game: {upcoming_games}')
+    prematch_game_ids = {}
+    async def insert_prematch_game(season_game_id: str):
+        prematch_game_ids[season_game_id] = await insert_prematch_game_info_db(season_id=current_season_id, season_game_id=season_game_id)
+    report = await run_game_cycle(cycle_name='manage_prematch_game',
+                                  game_ids=[season_game_id for _, season_game_id in upcoming_games],
+                                  func=insert_prematch_game,
+                                  max_concurrency=settings.LIVE_MAX_CONCURRENCY,
+                                  timeout=settings.LIVE_GAME_TIMEOUT_S)
+    
+    game_ids = [game_id for game_id in prematch_game_ids.values() if game_id is not None]
+    # начальные состояния всех игр прогнозируются одной пачкой
+    start = perf_counter()
+    await predict_games(game_ids=game_ids)
+    predict_s = perf_counter() - start
+    report['predict_s'] = predict_s
+    report['total_s'] += predict_s
+    return game_ids
+
+
+async def measure_dense_timeline_cost(season_id: str, sample_size: int = 200) -> pd.DataFrame:
+    """Оценка стоимости хранения и прогноза состояний матча по событиям и по минутам за сезон
+
+    Размер строки берется из текущего размера таблицы prediction_draw_left_right (с индексами),
+    время прогноза одной строки измеряется на sample_size строках минутного режима.
+
+    Args:
+        season_id (str): Уникальный идентификатор сезона
+        sample_size (int, optional): Количество строк для измерения времени прогноза (по умолчанию 200)
+
+    Returns:
+        pd.DataFrame: Количество строк, объем хранения (МБ) и время прогноза (с) для каждого режима
+    """
+    game_ids = await AC.Game.get_played_game_id_for_backfill(season_ids=[season_id], only_unsimulated=False)
+    bundles = await AC.TableToDataFrame.get_match_bundles(game_ids=game_ids)
+    
+    states = {}
+    for mode, dense in (('events', False), ('dense', True)):
+        start = perf_counter()
+        # пустой массив в начале: сезон без сыгранных игр дает ноль строк
+        states[mode] = await asyncio.to_thread(lambda: np.concatenate([empty_match_states(0), *(simulate_match_bundle(bundles[game_id], dense) for game_id in game_ids)]))
+        print(f'Симуляция сезона {season_id} ({mode}): {perf_counter() - start:.2f} с')
+    
+    row_count, total_size = await AC.PredictionDrawLeftRight.get_storage_size()
+    row_size = total_size / row_count if row_count else None
+    
+    sample = states['dense'][:sample_size]
+    predict_row_s = 0.0
+    if len(sample) > 0:
+        model_left_draw_right = await model_registry.get()
+        start = perf_counter()
+        await model_left_draw_right.predict_states(sample)
+        predict_row_s = (perf_counter() - start) / len(sample)
+    
+    res_df = pd.DataFrame([{
+        'mode': mode,
+        'games': len(game_ids),
+        'rows': len(df),
+        'rows_per_game': len(df) / max(len(game_ids), 1),
+        'storage_mb': None if row_size is None else len(df) * row_size / 2**20,
+        'predict_s': len(df) * predict_row_s,
+    } for mode, df in states.items()])
+    print(f'Стоимость режимов симуляции сезона {season_id}:\n{res_df.to_string(index=False)}')
+    return res_df
+
+
+async def benchmark_predict_rows(game_ids: list[int]) -> pd.DataFrame:
+    """Сравнение скорости прогноза (строк/с): построчный путь и пакетный predict_games_batch
+
+    Построчный путь: запрос признаков и вызов модели для каждого прогноза (как до пакетного прогноза).
+    Результаты прогноза в БД не сохраняются.
+
+    Args:
+        game_ids (list[int]): Уникальные идентификаторы игр с непрогнозированными состояниями
+
+    Returns:
+        pd.DataFrame: Количество строк, время и строк/с для каждого пути
+    """
+    model_left_draw_right = await model_registry.get()
+    
+    start = perf_counter()
+    rows = 0
+    for game_id in game_ids:
+        for prediction_id in await AC.PredictionDrawLeftRight.get_unpredicted_prediction_id(game_id=game_id):
+            state = await AC.PredictionDrawLeftRight.get_attributes_prediction(prediction_id=prediction_id)
+            await model_left_draw_right.predict(state[0])
+            rows += 1
+    row_by_row_s = perf_counter() - start
+    
+    start = perf_counter()
+    prediction_ids, _, _, _ = await predict_games_batch(game_ids=game_ids)
+    batch_s = perf_counter() - start
+    
+    res_df = pd.DataFrame([
+        {'path': 'row_by_row', 'rows': rows, 'seconds': row_by_row_s},
+        {'path': 'batch', 'rows': len(prediction_ids), 'seconds': batch_s},
+    ])
+    res_df['rows_per_s'] = res_df['rows'] / res_df['seconds']
+    print(f'Скорость прогноза:\n{res_df.to_string(index=False)}')
+    return res_df
 
 
 # asyncio.run(manage_predict_game())
\ No newline at end of file
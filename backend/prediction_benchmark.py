@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+
+import asyncio
+from prediction.benchmark import (run_benchmark, compare_with_baseline, save_result, load_result,
+                                  BATCH_SIZES, THREAD_COUNTS)
+from prediction.registry import model_registry
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description='Офлайн-замер скорости прогноза ModelDrawLeftRight на синтетических данных')
+    parser.add_argument('--model', default=None, help='Путь к файлу модели (по умолчанию активная модель)')
+    parser.add_argument('--output', default='./prediction/benchmark.json', help='Файл результатов (JSON)')
+    parser.add_argument('--baseline', default=None, help='Файл результатов эталонного запуска для сравнения')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Допустимое ухудшение метрики относительно эталона (доля)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=list(BATCH_SIZES), help='Размеры пачек')
+    parser.add_argument('--thread-counts', type=int, nargs='+', default=list(THREAD_COUNTS), help='Количество потоков CatBoost')
+    parser.add_argument('--single-rows', type=int, default=500, help='Количество строк для замера задержки одной строки')
+    parser.add_argument('--repeat', type=int, default=5, help='Количество повторов каждого замера')
+    args = parser.parse_args()
+
+    model_path = args.model or model_registry.get_model_path(model_registry.active_model_name)
+    result = await run_benchmark(model_path=model_path,
+                                 batch_sizes=tuple(args.batch_sizes),
+                                 thread_counts=tuple(args.thread_counts),
+                                 single_rows=args.single_rows,
+                                 repeat=args.repeat)
+    save_result(result, args.output)
+
+    print(f"Загрузка модели: {result['cold_load']}")
+    print(f"Одна строка: {result['single_row']}")
+    for row in result['batch']:
+        print(f"{row['path']:>15} пачка {row['batch_size']:>6} потоков {str(row['thread_count']):>4}: {row['rows_per_s']:>12.0f} строк/с")
+    print(f'Результаты сохранены: {args.output}')
+
+    if args.baseline:
+        regressions = compare_with_baseline(result, load_result(args.baseline), tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"Ухудшение {regression['metric']}: {regression['baseline']:.4g} -> {regression['value']:.4g} ({regression['change']:+.0%})")
+        if regressions: return 1
+        print('Ухудшений относительно эталона нет')
+    return 0
+
+
+if __name__ == "__main__":
+    if os.name == 'nt':
+        from asyncio import WindowsSelectorEventLoopPolicy
+        asyncio.set_event_loop_policy(WindowsSelectorEventLoopPolicy())
+
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,27 @@
+import argparse
+import os
+
+import asyncio
+from prediction.export import export_training_set
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Выгрузка prediction_draw_left_right в колоночные файлы по сезонам (обучающий набор)')
+    parser.add_argument('output_dir', nargs='?', default='./prediction/train_data/export', help='Каталог выгрузки')
+    parser.add_argument('--format', choices=['parquet', 'arrow'], default='parquet', help='Формат файлов')
+    parser.add_argument('--full', action='store_true', help='Полная выгрузка (по умолчанию - только строки, измененные после предыдущего запуска)')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='Количество строк в одной пачке')
+    args = parser.parse_args()
+    
+    await export_training_set(output_dir=args.output_dir,
+                              fmt=args.format,
+                              incremental=not args.full,
+                              chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    if os.name == 'nt':
+        from asyncio import WindowsSelectorEventLoopPolicy
+        asyncio.set_event_loop_policy(WindowsSelectorEventLoopPolicy())
+    
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+import argparse
+import os
+import pickle
+
+import asyncio
+from collection.schemas import *
+from collection.utils import backfill_season_simulation
+
+
+def get_filled_schemas_season_ids(path) -> list[str]:
+    '''Идентификаторы сезонов, сохраненных в collection/filled_schemas'''
+    season_ids = []
+    for file in sorted(os.listdir(path)):
+        if not file.endswith('.pkl'): continue
+        with open(os.path.join(path, file), 'rb') as f:
+            loaded_season: Season = pickle.load(f)
+        season_ids.append(loaded_season.id)
+    return season_ids
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Пакетная симуляция оконченных игр сезонов (prediction_draw_left_right)')
+    parser.add_argument('season_ids', nargs='*', help='Идентификаторы сезонов (по умолчанию все сезоны из collection/filled_schemas)')
+    parser.add_argument('--workers', type=int, default=None, help='Количество процессов')
+    parser.add_argument('--chunk-size', type=int, default=50, help='Количество игр в одной пачке')
+    parser.add_argument('--all', action='store_true', help='Повторно симулировать уже просимулированные игры')
+    parser.add_argument('--dense', action='store_true', help='Состояние на каждую минуту матча')
+    args = parser.parse_args()
+    
+    season_ids = args.season_ids or get_filled_schemas_season_ids('./collection/filled_schemas')
+    await backfill_season_simulation(season_ids=season_ids,
+                                     max_workers=args.workers,
+                                     chunk_size=args.chunk_size,
+                                     only_unsimulated=not args.all,
+                                     dense=args.dense)
+
+
+if __name__ == "__main__":
+    if os.name == 'nt':
+        from asyncio import WindowsSelectorEventLoopPolicy
+        asyncio.set_event_loop_policy(WindowsSelectorEventLoopPolicy())
+    
+    asyncio.run(main())
@@ -0,0 +1,177 @@
+import asyncio
+import random
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from collection.simulation import simulate_timeline, MatchCheckpoint, MATCH_STATE_COLUMNS
+from collection.utils import (simulate_match_frames_reference, simulate_match_bundles, retain_match_checkpoints,
+                              SIMULATION_CHECKPOINTS, CHECKPOINT_GAME_IDS)
+
+
+AMPLUA_NAMES = ['вратарь', 'защитник', 'полузащитник', 'нападающий', 'неизвестно']
+
+
+def make_match_frames(seed: int, game_id: int = 1) -> dict[str, pd.DataFrame]:
+    """Синтетический матч в формате наборов данных AsyncCore.TableToDataFrame"""
+    rnd = random.Random(seed)
+    left_team_id, right_team_id = 'left-team', 'right-team'
+
+    df_game = pd.DataFrame([{
+        'game_id': game_id,
+        'left_team_id': left_team_id,
+        'right_team_id': right_team_id,
+        'left_coach_id': '101',
+        'right_coach_id': '202',
+    }])
+    df_referee_game = pd.DataFrame([{'referee_id': '303', 'game_id': game_id}])
+    df_goal_type = pd.DataFrame([{'goal_type_id': 1, 'name': 'гол'},
+                                 {'goal_type_id': 2, 'name': 'пенальти'},
+                                 {'goal_type_id': 3, 'name': 'автогол'}])
+    df_penalty_type = pd.DataFrame([{'penalty_type_id': 1, 'name': 'yellow'},
+                                    {'penalty_type_id': 2, 'name': 'yellow2'},
+                                    {'penalty_type_id': 3, 'name': 'red'}])
+
+    lineup_rows, stat_rows, goal_rows, penalty_rows = [], [], [], []
+    for team_id in (left_team_id, right_team_id):
+        players = [f'{team_id}-{i}' for i in range(rnd.randint(14, 18))]
+        for i, player_id in enumerate(players):
+            row = {'game_id': game_id, 'team_id': team_id, 'player_id': player_id,
+                   'min_in': None, 'plus_min_in': None, 'min_out': None, 'plus_min_out': None}
+            if i >= 11: # выход на замену
+                row['min_in'] = rnd.randint(30, 90)
+                row['plus_min_in'] = rnd.choice([None, None, rnd.randint(1, 5)])
+            elif rnd.random() < 0.3: # замена
+                row['min_out'] = rnd.choice([45, rnd.randint(20, 90)])
+                row['plus_min_out'] = rnd.choice([None, None, rnd.randint(1, 5)])
+            lineup_rows.append(row)
+            stat_rows.append({'player_id': player_id,
+                              'transfer_value': float(rnd.choice([0, rnd.randint(1, 50) * 100000])),
+                              'amplua_id': 1,
+                              'name': AMPLUA_NAMES[0] if i == 0 else rnd.choice(AMPLUA_NAMES)})
+
+        for _ in range(rnd.randint(0, 4)):
+            goal_rows.append({'goal_id': len(goal_rows) + 1, 'game_id': game_id, 'team_id': team_id,
+                              'player_id': rnd.choice(players), 'player_sub_id': None,
+                              'goal_type_id': rnd.choice([1, 1, 2, 3]),
+                              'min': rnd.randint(1, 90), 'plus_min': rnd.choice([None, None, rnd.randint(1, 5)])})
+
+        penalty_players = rnd.sample(players[:11], rnd.randint(0, 4))
+        for player_id in penalty_players:
+            penalty_rows.append({'game_id': game_id, 'team_id': team_id, 'player_id': player_id,
+                                 'penalty_type_id': rnd.choice([1, 1, 1, 2, 3]),
+                                 'min': rnd.randint(1, 90), 'plus_min': rnd.choice([None, None, rnd.randint(1, 5)])})
+
+    goal_columns = ['goal_id', 'game_id', 'team_id', 'player_id', 'player_sub_id', 'goal_type_id', 'min', 'plus_min']
+    penalty_columns = ['game_id', 'team_id', 'player_id', 'penalty_type_id', 'min', 'plus_min']
+    return {
+        'df_game': df_game,
+        'df_referee_game': df_referee_game,
+        'df_goal': pd.DataFrame(goal_rows, columns=goal_columns),
+        'df_goal_type': df_goal_type,
+        'df_lineup': pd.DataFrame(lineup_rows),
+        'df_penalty': pd.DataFrame(penalty_rows, columns=penalty_columns),
+        'df_penalty_type': df_penalty_type,
+        'game_player_stat_amplua': pd.DataFrame(stat_rows),
+    }
+
+
+class TestSimulateTimeline(unittest.TestCase):
+
+    def assert_same_states(self, expected: pd.DataFrame, actual: pd.DataFrame):
+        expected = expected[MATCH_STATE_COLUMNS].astype(np.float64).sort_values(['min', 'plus_min']).reset_index(drop=True)
+        actual = actual[MATCH_STATE_COLUMNS].astype(np.float64).reset_index(drop=True)
+        pd.testing.assert_frame_equal(expected, actual, check_exact=True)
+
+    def test_vectorized_equals_reference(self):
+        for seed in range(50):
+            with self.subTest(seed=seed):
+                frames = make_match_frames(seed)
+                expected = asyncio.run(simulate_match_frames_reference(**frames))
+                actual = simulate_timeline(**frames)
+                self.assert_same_states(expected, actual)
+
+    def test_given_time_events(self):
+        frames = make_match_frames(seed=7)
+        time_events = {(0, 0), (45, 2), (60, 0), (90, 4)}
+        expected = asyncio.run(simulate_match_frames_reference(**frames, time_events=set(time_events), is_event_exist=True))
+        actual = simulate_timeline(**frames, time_events=time_events)
+        self.assert_same_states(expected, actual)
+
+    def test_incremental_checkpoint(self):
+        for seed in range(10):
+            for dense in (False, True):
+                with self.subTest(seed=seed, dense=dense):
+                    frames = make_match_frames(seed)
+                    full = simulate_timeline(**frames, dense=dense)
+                    
+                    # контрольная точка восстановлена из БД: исходные события неизвестны, матч рассчитывается заново
+                    half = full.iloc[:len(full) // 2]
+                    checkpoint = MatchCheckpoint.from_event_times(1, zip(half['min'], half['plus_min']))
+                    states = simulate_timeline(**frames, checkpoint=checkpoint, dense=dense)
+                    self.assert_same_states(full, states)
+                    
+                    checkpoint.update(states)
+                    self.assertEqual(checkpoint.last_time, (int(full['min'].iloc[-1]), int(full['plus_min'].iloc[-1])))
+                    self.assertEqual(len(simulate_timeline(**frames, checkpoint=checkpoint, dense=dense)), 0)
+                    
+                    # гол на 30-й минуте поступил поздно: состояния с 30-й минуты рассчитываются заново
+                    late_goal = {'goal_id': 100, 'game_id': 1, 'team_id': 'left-team', 'player_id': 'left-team-0',
+                                 'player_sub_id': None, 'goal_type_id': 1, 'min': 30, 'plus_min': None}
+                    frames['df_goal'] = pd.concat([frames['df_goal'], pd.DataFrame([late_goal])], ignore_index=True)
+                    late_full = simulate_timeline(**frames, dense=dense)
+                    states = simulate_timeline(**frames, checkpoint=checkpoint, dense=dense)
+                    self.assert_same_states(late_full.loc[late_full['min'] >= 30], states)
+                    
+                    checkpoint.update(states)
+                    self.assertEqual(len(simulate_timeline(**frames, checkpoint=checkpoint, dense=dense)), 0)
+
+    def test_dense_timeline(self):
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                frames = make_match_frames(seed)
+                sparse = simulate_timeline(**frames)
+                dense = simulate_timeline(**frames, dense=True)
+                
+                # состояния в моменты событий совпадают с обычным режимом
+                event_rows = dense.merge(sparse[['min', 'plus_min']], on=['min', 'plus_min'])
+                self.assert_same_states(sparse, event_rows)
+                # каждая минута основного времени присутствует
+                self.assertTrue(set(range(91)) <= set(dense.loc[dense['plus_min'] == 0, 'min']))
+        
+        # идущий матч: сетка до текущей минуты
+        frames = make_match_frames(seed=1)
+        frames['df_game'] = frames['df_game'].assign(game_status_id=3, min=45, plus_min=2)
+        sparse = simulate_timeline(**frames)
+        dense = simulate_timeline(**frames, dense=True)
+        grid = dense.merge(sparse[['min', 'plus_min']], on=['min', 'plus_min'], how='left', indicator=True)
+        grid = grid.loc[grid['_merge'] == 'left_only']
+        self.assertEqual((int(grid['min'].iloc[-1]), int(grid['plus_min'].iloc[-1])), (45, 2))
+        self.assertTrue({1, 2} <= set(dense.loc[dense['min'] == 45, 'plus_min']))
+
+    def test_backfill_skips_failed_game(self):
+        bundles = {game_id: make_match_frames(seed=game_id, game_id=game_id) for game_id in (1, 2, 3)}
+        # игра без главного судьи: симуляция завершается ошибкой
+        bundles[2]['df_referee_game'] = bundles[2]['df_referee_game'].iloc[0:0]
+        states, failed_game_ids = asyncio.run(simulate_match_bundles(None, bundles, [1, 2, 3, 4]))
+        self.assertEqual(failed_game_ids, [2, 4]) # 4 - нет данных игры
+        self.assertEqual(set(np.unique(states['game_id'])), {1, 3})
+        expected = sum(len(simulate_timeline(**bundles[game_id])) for game_id in (1, 3))
+        self.assertEqual(len(states), expected)
+
+    def test_retain_match_checkpoints(self):
+        self.addCleanup(SIMULATION_CHECKPOINTS.clear)
+        self.addCleanup(CHECKPOINT_GAME_IDS.clear)
+        for game_id, season_game_id in ((1, '101'), (2, '102'), (3, '103')):
+            SIMULATION_CHECKPOINTS[game_id] = MatchCheckpoint.from_event_times(game_id, [])
+            CHECKPOINT_GAME_IDS[season_game_id] = game_id
+        SIMULATION_CHECKPOINTS[4] = MatchCheckpoint.from_event_times(4, []) # игра без season_game_id
+        # игра 102 перенесена и больше не активна
+        retain_match_checkpoints(['101', '103', '104'])
+        self.assertEqual(set(SIMULATION_CHECKPOINTS), {1, 3})
+        self.assertEqual(CHECKPOINT_GAME_IDS, {'101': 1, '103': 3})
+
+
+if __name__ == '__main__':
+    unittest.main()